@@ -1,207 +1,800 @@
 import os
+import base64
 import json
 import anyio
-import click
-import pyodbc
 import hashlib
+import random
 import sys
-from datetime import datetime, date
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from itertools import islice
 from mcp.server.fastmcp import FastMCP
+from backends import BACKENDS, DB_ERRORS, backend_for, backend_for_path
+from connection_pool import ConnectionPool, PoolExhaustedError
+from catalog_cache import CatalogCache, file_signature, is_ddl_statement
+from result_cache import ResultCache, normalize_sql
+from bulk_load import detect_format, read_rows
+from pagination import (HeldCursors, PageTokenError, decode_page_token,
+                        encode_page_token, keyset_predicate)
+from schema_snapshot import SchemaStore
+from formatting import OUTPUT_FORMATS, format_rows, format_value
+from metrics import Metrics
+from executor import PRIORITY_METADATA, PRIORITY_QUERY, DBExecutor
+from mirror import Mirror, mirror_compatible, referenced_tables
+from sampling import MIN_KEY_DENSITY, key_range_sample, reservoir_sample
+from schema_search import TrigramIndex
+from statement_cache import StatementCache
+from value_search import matching_columns, plan_probes
+from startup import load_startup_databases
+from jobs import FINISHED, JobScheduler, ResultFile
+from export import EXPORT_FORMATS, export_cursor, export_file_name
+from rowset import RowSet
+from large_values import compact_value, lazy_select, row_converter
+from table_filter import TableQuery, build_table_query
 
-# Create the FastMCP server
-mcp = FastMCP("MS Access Connector")
+# Create the FastMCP server; server_lifespan opens the startup databases in the background
+mcp = FastMCP("MS Access Connector", lifespan=lambda server: server_lifespan(server))
 
-# Store connections in a dictionary: {conn_id: {'conn': pyodbc.Connection, 'writable': bool}}
+# Store connections in a dictionary:
+# {conn_id: {'pool': ConnectionPool, 'catalog': CatalogCache, 'held_cursors': HeldCursors,
+#            'writable': bool, 'db_path': str, 'mirror': Mirror}}
 connections = {}
 
+# Connection pools keyed by (absolute db_path, writable)
+pools = {}
+
+# Locks serializing the creation of each pool, with the same keys as pools
+pool_locks = {}
+
+# Table catalog caches keyed by absolute db_path (shared by both modes)
+catalogs = {}
+
+# Local SQLite mirrors keyed by absolute db_path
+mirrors = {}
+
+# Trigram indexes of schema names keyed by (absolute db_path, include_columns)
+search_indexes = {}
+
+# conn_ids of startup databases still being opened -> Event set once they are
+startup_connects = {}
+
 # Configuration constants
 EXECUTE_QUERY_MAX_CHARS = int(os.environ.get('EXECUTE_QUERY_MAX_CHARS', 4000))
 CLAUDE_FILES_PATH = os.environ.get('CLAUDE_LOCAL_FILES_PATH')
+FETCH_BATCH_SIZE = int(os.environ.get('FETCH_BATCH_SIZE', 500))
+# Maximum rows shown inline by the query tools
+DISPLAY_ROWS = 10
+# Text longer than this in Memo columns (and any OLE Object value) is shown as a
+# placeholder with its length; read_cell_tool reads such cells in ranges
+LARGE_VALUE_CHARS = int(os.environ.get('LARGE_VALUE_CHARS', 500))
+# Characters of each matching row shown by find_value_tool
+FIND_VALUE_ROW_CHARS = 300
+RESULT_CACHE_MAX_BYTES = int(os.environ.get('RESULT_CACHE_MAX_BYTES', 16 * 1024 * 1024))
+RESULT_CACHE_TTL = float(os.environ.get('RESULT_CACHE_TTL', 300))
+BULK_INSERT_BATCH_SIZE = int(os.environ.get('BULK_INSERT_BATCH_SIZE', 1000))
+PAGE_CURSOR_TTL = float(os.environ.get('PAGE_CURSOR_TTL', 300))
+PAGE_CURSOR_MAX = int(os.environ.get('PAGE_CURSOR_MAX', 4))
+# Schema snapshots are kept next to the results directory (or in the temp directory)
+SCHEMA_SNAPSHOT_PATH = os.environ.get('SCHEMA_SNAPSHOT_PATH') or os.path.join(
+    os.path.dirname(os.path.abspath(CLAUDE_FILES_PATH)) if CLAUDE_FILES_PATH else tempfile.gettempdir(),
+    'mcp_access_schemas',
+)
+# Local mirrors of tables (see mirror_tool) are kept next to the schema snapshots
+MIRROR_PATH = os.environ.get('MIRROR_PATH') or os.path.join(os.path.dirname(SCHEMA_SNAPSHOT_PATH), 'mcp_access_mirrors')
+# Files written by export_tool and export_database_tool (unless a path is given)
+EXPORT_PATH = os.environ.get('EXPORT_PATH') or os.path.join(os.path.dirname(SCHEMA_SNAPSHOT_PATH), 'mcp_access_exports')
+# Tables exported at once by export_database_tool (also bounded by the pool size)
+EXPORT_WORKERS = int(os.environ.get('EXPORT_WORKERS', 4))
+# Seconds a mirror may lag behind a changed database file and still serve queries (0: never)
+MIRROR_MAX_AGE = float(os.environ.get('MIRROR_MAX_AGE', 0))
+POOL_MIN_SIZE = int(os.environ.get('ACCESS_POOL_MIN_SIZE', 1))
+POOL_MAX_SIZE = int(os.environ.get('ACCESS_POOL_MAX_SIZE', 4))
+POOL_IDLE_TIMEOUT = float(os.environ.get('ACCESS_POOL_IDLE_TIMEOUT', 300))
+POOL_ACQUIRE_TIMEOUT = float(os.environ.get('ACCESS_POOL_ACQUIRE_TIMEOUT', 30))
+# Seconds before a query is cancelled (0 disables the timeout)
+QUERY_TIMEOUT = float(os.environ.get('QUERY_TIMEOUT', 120))
+# Prepared statements (cursors) kept open per connection for reuse (0 disables the cache)
+STATEMENT_CACHE_SIZE = int(os.environ.get('STATEMENT_CACHE_SIZE', 32))
+# Driver calls running at once across all connections
+ACCESS_MAX_CONCURRENCY = int(os.environ.get('ACCESS_MAX_CONCURRENCY', 8))
+# Background query jobs: concurrent jobs, finished jobs kept, and where their results are written
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 2))
+JOB_HISTORY = int(os.environ.get('JOB_HISTORY', 50))
+JOBS_PATH = os.environ.get('JOBS_PATH') or CLAUDE_FILES_PATH or os.path.join(tempfile.gettempdir(), 'mcp_access_jobs')
+# Databases opened in the background when the server starts: a JSON config file
+# and/or a list of paths separated by os.pathsep (see startup.py)
+STARTUP_CONFIG = os.environ.get('ACCESS_STARTUP_CONFIG')
+STARTUP_DATABASES = os.environ.get('ACCESS_STARTUP_DATABASES')
+# Optional Prometheus text file with the server metrics, rewritten every METRICS_INTERVAL seconds
+METRICS_FILE = os.environ.get('METRICS_FILE')
+METRICS_INTERVAL = float(os.environ.get('METRICS_INTERVAL', 15))
+
+# Cache of read-only query results shared by all connections
+result_cache = ResultCache(max_bytes=RESULT_CACHE_MAX_BYTES, ttl=RESULT_CACHE_TTL)
+
+# Table schemas per database file, persisted as snapshots by describe_database_tool
+schema_store = SchemaStore(SCHEMA_SNAPSHOT_PATH)
+
+# Latency, row and byte histograms of every tool call (see server_stats)
+metrics = Metrics()
+
+# Runs each connection's blocking calls on its own worker thread
+executor = DBExecutor(ACCESS_MAX_CONCURRENCY)
+
+# Long-running queries submitted by submit_query_tool, run while the server runs (see server_lifespan)
+jobs = JobScheduler(JOB_WORKERS, JOB_HISTORY)
 
 async def connect_to_access_db(
     db_path: str,
-    writable: bool = False # Default to read-only
-) -> pyodbc.Connection:
-    """Connect to an Access database using the 32-bit ODBC driver."""
-    # Note: Must be running on Windows with 32-bit Access ODBC driver installed
-    base_conn_string = f"DRIVER={{Microsoft Access Driver (*.mdb, *.accdb)}};DBQ={db_path};"
-    
-    if writable:
-        # Use Share Deny None for better concurrency when writes might be needed
-        connection_string = base_conn_string + "Mode=Share Deny None;"
-        print(f"Connecting to {os.path.basename(db_path)} in SHARED Writable mode.", file=sys.stderr)
-    else:
-        # Default to ReadOnly to prevent locking
-        connection_string = base_conn_string + "ReadOnly=True;"
-        print(f"Connecting to {os.path.basename(db_path)} in ReadOnly mode.", file=sys.stderr)
+    writable: bool = False, # Default to read-only
+    backend=None,
+):
+    """Connect to a database file through its backend (Access ODBC, or SQLite for testing)."""
+    backend = backend or backend_for_path(db_path)
+    mode_text = "SHARED Writable" if writable else "ReadOnly"
+    print(f"Connecting to {os.path.basename(db_path)} in {mode_text} mode ({backend.name} backend).", file=sys.stderr)
         
-    # Use a thread pool to run ODBC operations asynchronously
-    # since pyodbc operations are blocking
-    connection = await anyio.to_thread.run_sync(
-        lambda: pyodbc.connect(connection_string)
+    # Driver operations are blocking; the connection gets its own worker thread,
+    # which runs every later call on it
+    connection = await metrics.run_sync(
+        lambda: backend.connect(db_path, writable=writable), stage="connect", runner=executor.connect
     )
     return connection
 
 
-async def list_tables(
-    connection: pyodbc.Connection,
-) -> list[str]:
-    """List all tables in the Access database, including linked tables."""
-    def _get_tables():
-        cursor = connection.cursor()
-        # First, let's log all available table types for diagnostic purposes
-        table_types = set()
-        all_tables = []
-        for table in cursor.tables():
-            table_types.add(table.table_type)
-            all_tables.append((table.table_name, table.table_type))
-            
-        print(f"Available table types: {table_types}")
-            
-        # Print detected table types for debugging
-        print(f"Detected table types: {table_types}")
-        
+async def run_on_connection(connection, func, stage: str = None, priority: int = PRIORITY_QUERY, cancel=None):
+    """Run a blocking call on the worker thread of connection, recording it in the metrics.
+
+    cancel, if given, is called to interrupt func when the caller is cancelled.
+    """
+    return await metrics.run_sync(
+        func, stage, runner=lambda call: executor.run(connection, call, priority, cancel)
+    )
+
+
+async def run_statement(connection, work, timeout: float = None, statement: str = None):
+    """Run work(cursor) with a cursor on the worker thread of connection.
+
+    The statement is cancelled through the driver if the calling task is cancelled
+    (e.g. the MCP request was cancelled) or after timeout seconds, in which case
+    TimeoutError is raised. timeout=None uses QUERY_TIMEOUT; 0 means no timeout.
+    The driver call always finishes before this returns, so the connection is
+    free to be rolled back and reused.
+
+    If statement (the SQL text work executes) is given, the cursor comes from the
+    connection's statement cache, so a statement executed again reuses its
+    prepared form; otherwise a new cursor is opened and closed.
+    """
+    if timeout is None:
+        timeout = QUERY_TIMEOUT
+    backend = backend_for(connection)
+    state = {"cursor": None, "cancelled": False}
+    statements = None
+    if statement is not None and backend.caches_statements and STATEMENT_CACHE_SIZE > 0:
+        statements = executor.local(connection).setdefault("statements", StatementCache(STATEMENT_CACHE_SIZE))
+
+    def _run():
+        if state["cancelled"]:
+            raise RuntimeError("Statement cancelled before it started")
+        # The driver enforces the timeout too, where it supports one. Cursors take
+        # it when they are opened, so cached cursors are kept per timeout as well
+        backend.set_timeout(connection, timeout)
+        key = (statement, timeout)
+        cursor = statements.checkout(key, connection.cursor) if statements is not None else connection.cursor()
+        state["cursor"] = cursor
+        reusable = False
+        try:
+            result = work(cursor)
+            reusable = statements is not None
+            return result
+        finally:
+            state["cursor"] = None
+            if reusable and backend.release_cursor(cursor):
+                statements.checkin(key, cursor)
+            else:
+                cursor.close()
+            backend.set_timeout(connection, None)
+
+    def _cancel():
+        state["cancelled"] = True
+        backend.cancel(connection, state["cursor"])
+
+    if not timeout:
+        return await run_on_connection(connection, _run, cancel=_cancel)
+    with anyio.fail_after(timeout):
+        return await run_on_connection(connection, _run, cancel=_cancel)
+
+
+async def get_pool(db_path: str, writable: bool = False, backend=None) -> ConnectionPool:
+    """Return the connection pool for a database file and mode, opening it if needed."""
+    key = (os.path.abspath(db_path), writable)
+    pool = pools.get(key)
+    if pool is not None and not pool.closed:
+        return pool
+    # Concurrent first callers wait for one pool instead of each opening their own
+    lock = pool_locks.setdefault(key, anyio.Lock())
+    async with lock:
+        pool = pools.get(key)
+        if pool is not None and not pool.closed:
+            return pool
+        pool = ConnectionPool(
+            lambda: connect_to_access_db(key[0], writable=writable, backend=backend),
+            min_size=POOL_MIN_SIZE,
+            max_size=POOL_MAX_SIZE,
+            idle_timeout=POOL_IDLE_TIMEOUT,
+            acquire_timeout=POOL_ACQUIRE_TIMEOUT,
+            on_checkout=lambda seconds: metrics.observe_stage("pool_wait", seconds),
+            executor=executor,
+        )
+        # Open the initial connections now so connection errors surface in `connect`
+        try:
+            await pool.open()
+        except BaseException:
+            with anyio.CancelScope(shield=True):
+                await pool.close()
+            raise
+        pools[key] = pool
+        return pool
+
+
+async def close_pool(pool: ConnectionPool):
+    """Close a connection pool and drop it from the registry."""
+    for key, registered in list(pools.items()):
+        if registered is pool:
+            del pools[key]
+    await pool.close()
+
+
+async def read_catalog(
+    connection,
+) -> dict:
+    """Read the table catalog: table names, linked tables and each table's type."""
+    backend = backend_for(connection)
+
+    def _get_catalog():
+        # Walk the catalog once, recording every table and its type
+        table_types = dict(backend.table_entries(connection))
+
+        print(f"Detected table types: {set(table_types.values())}", file=sys.stderr)
+
         # Access can use different designations for different types of tables
         # Let's capture all actual tables excluding internal metadata tables
         system_table_prefixes = ('MSys', '~TMP')
-        tables = [table.table_name for table in cursor.tables() 
-                 if not any(table.table_name.startswith(prefix) for prefix in system_table_prefixes)
-                 or table.table_type == 'SYSTEM TABLE']  # Include system tables explicitly marked
-        
+        tables = [name for name, table_type in table_types.items()
+                  if not any(name.startswith(prefix) for prefix in system_table_prefixes)
+                  or table_type == 'SYSTEM TABLE']  # Include system tables explicitly marked
+
         # Also try to get linked tables using a special query for Access
+        linked_tables = []
+        linked_sources = {}
         try:
-            linked_tables_cursor = connection.cursor()
-            # Query MSysObjects which contains information about all database objects including linked tables
-            linked_tables_cursor.execute("SELECT Name FROM MSysObjects WHERE Type=6")
-            linked_table_names = [row.Name for row in linked_tables_cursor.fetchall()]
-            linked_tables_cursor.close()
-            
+            linked_tables = backend.linked_tables(connection)
+
             # Add linked tables to our list if they're not already included
-            for linked_table in linked_table_names:
-                if linked_table not in tables:
+            for linked_table in linked_tables:
+                if linked_table not in table_types:
                     tables.append(linked_table)
-                    print(f"Added linked table from MSysObjects: {linked_table}")
+                    table_types[linked_table] = 'LINKED TABLE'
+            # Where each linked table comes from, for search_schema_tool
+            linked_sources = backend.linked_table_sources(connection)
         except Exception as e:
-            print(f"Note: Could not retrieve linked tables from MSysObjects: {e}")
-        cursor.close()
-        return tables
-    
-    tables = await anyio.to_thread.run_sync(_get_tables)
-    return tables
+            print(f"Note: Could not retrieve linked tables from MSysObjects: {e}", file=sys.stderr)
+
+        return {"tables": tables, "linked_tables": linked_tables, "table_types": table_types,
+                "linked_sources": linked_sources}
+
+    catalog = await run_on_connection(connection, _get_catalog, "metadata", PRIORITY_METADATA)
+    return catalog
+
+
+async def list_tables(
+    connection,
+) -> list[str]:
+    """List all tables in the Access database, including linked tables."""
+    catalog = await read_catalog(connection)
+    return catalog["tables"]
+
+
+async def get_catalog(conn_id: str) -> dict:
+    """Return the catalog for a connection, reading it only if the cached copy is stale."""
+    info = connections[conn_id]
+    cache = info['catalog']
+    catalog = cache.get()
+    if catalog is not None:
+        return catalog
+    # Only one caller reloads; concurrent callers wait and reuse its result
+    async with cache.lock:
+        catalog = cache.get()
+        if catalog is None:
+            signature = file_signature(info['db_path'])
+            async with info['pool'].connection() as connection:
+                catalog = await read_catalog(connection)
+            cache.set(catalog, signature)
+    return catalog
+
+
+def is_read_query(sql_query: str) -> bool:
+    """Check whether a statement only reads data (SELECT, but not SELECT ... INTO)"""
+    return sql_query.strip().lower().startswith('select') and not is_ddl_statement(sql_query)
+
+
+def result_cache_key(conn_id: str, *parts):
+    """Build a result cache key for conn_id's database file in its current version.
+
+    Returns None (don't cache) if the file's version cannot be determined.
+    """
+    db_path = connections[conn_id]['db_path']
+    signature = file_signature(db_path)
+    if signature is None:
+        return None
+    return (db_path, signature) + parts
+
+
+def note_sql_executed(conn_id: str, sql_query: str):
+    """Invalidate cached state that a statement run on conn_id may have made stale."""
+    if conn_id not in connections:
+        return
+    info = connections[conn_id]
+    if is_ddl_statement(sql_query):
+        info['catalog'].invalidate()
+        schema_store.invalidate(info['db_path'])
+    if info['writable'] and not is_read_query(sql_query):
+        result_cache.invalidate(info['db_path'])
+
+
+def fetch_rows(cursor, max_rows: int = None, count_rows: bool = False, columns: list = None, convert=None):
+    """Fetch at most max_rows rows (all rows if None) from a cursor, in fetchmany() batches.
+
+    Returns (rows, row_count, more_rows), rows being a RowSet. Once more than
+    max_rows rows have been seen no further batches are pulled, unless count_rows
+    is set, in which case the remaining rows are counted batch by batch without
+    being converted or kept. row_count is the exact number of rows in the result
+    when known, else None. Rows are converted by convert (default: large values
+    replaced by placeholders, see row_converter) and named by columns (default:
+    the cursor's columns).
+    """
+    rows = RowSet(columns) if columns is not None else RowSet.from_cursor(cursor)
+    convert = convert or row_converter(cursor.description, LARGE_VALUE_CHARS)
+    if max_rows is None:
+        while True:
+            batch = cursor.fetchmany(FETCH_BATCH_SIZE)
+            if not batch:
+                break
+            rows.extend(batch, convert)
+        metrics.add_rows(len(rows))
+        return rows, len(rows), False
+
+    seen = 0
+    # The first batch asks for one row beyond the budget to learn whether more exist
+    batch_size = min(FETCH_BATCH_SIZE, max_rows + 1)
+    while True:
+        batch = cursor.fetchmany(batch_size)
+        if not batch:
+            break
+        seen += len(batch)
+        metrics.add_rows(len(batch))
+        if len(rows) < max_rows:
+            rows.extend(batch[:max_rows - len(rows)], convert)
+        if seen > max_rows and not count_rows:
+            return rows, None, True
+        batch_size = FETCH_BATCH_SIZE
+    return rows, seen, seen > max_rows
+
+
+async def select_table_rows(connection, columns: list, body: str, build_query, params: list = None,
+                            max_rows: int = None, projected: bool = False) -> RowSet:
+    """Run build_query(select list) for "SELECT <select list> <body>" and fetch at most max_rows rows.
+
+    Given the table's columns (from get_cached_schema), large-object columns are
+    read lazily (see lazy_select): the rows carry placeholders with the length of
+    long Memo and OLE Object values instead of the values. If the driver rejects
+    the lazy select list, the columns are read whole. Unless projected (columns
+    being a selection of the table's columns), they are read with SELECT *.
+    """
+    async def _query(select_list, convert):
+        sql_query = build_query(f"{select_list} {body}")
+
+        def _run_query(cursor):
+            with metrics.timed("execute"):
+                cursor.execute(sql_query, params) if params else cursor.execute(sql_query)
+            with metrics.timed("fetch"):
+                rows, _, _ = fetch_rows(cursor, max_rows, columns=names, convert=convert)
+            return rows
+
+        return await run_statement(connection, _run_query, statement=sql_query)
+
+    select_list, convert = lazy_select(columns or [], backend_for(connection), quote_identifier, LARGE_VALUE_CHARS)
+    names = [column["name"] for column in columns] if select_list else None
+    if select_list:
+        try:
+            return await _query(select_list, convert)
+        except DB_ERRORS as e:
+            print(f"Lazy read of large columns failed, reading them whole: {e}", file=sys.stderr)
+            names = None
+    if projected:
+        return await _query(", ".join(quote_identifier(column["name"]) for column in columns), None)
+    return await _query("*", None)
 
 
 async def query_table(
-    connection: pyodbc.Connection,
+    connection,
     table_name: str,
     limit: int = 3, # Keep the default limit low
-) -> list[dict]:
-    """Query data from a table."""
-    def _run_query():
-        cursor = connection.cursor()
-        cursor.execute(f"SELECT TOP {limit} * FROM [{table_name}]")
-        columns = [column[0] for column in cursor.description]
-        results = []
-        for row in cursor.fetchall():
-            # Convert row to a list of values that can be serialized to JSON
-            row_values = [str(value) if isinstance(value, (bytes, bytearray)) else value for value in row]
-            results.append(dict(zip(columns, row_values)))
-        cursor.close()
-        return results
-    
-    results = await anyio.to_thread.run_sync(_run_query)
-    return results
+    max_rows: int = None,
+    columns: list = None,
+    query: TableQuery = None,
+) -> RowSet:
+    """Query data from a table.
+
+    If max_rows is given, stop pulling rows from the driver after max_rows + 1
+    rows (the extra row tells the caller that more rows exist). Given the
+    table's columns, large values stay in the database (see select_table_rows).
+    query (from build_table_query) selects columns, filters and orders the rows
+    in the database; it takes the place of columns.
+    """
+    backend = backend_for(connection)
+    body = f"FROM {quote_identifier(table_name)}"
+    params = None
+    projected = False
+    if query is not None:
+        body = " ".join(part for part in (body, query.where, query.order_by) if part)
+        columns, params, projected = query.columns, query.params, query.projected
+    # Identifiers and TOP n cannot be parameters; the name is quoted and limit is an int.
+    # One row beyond max_rows tells the caller that more rows exist
+    return await select_table_rows(
+        connection, columns, body, lambda select: backend.top_query(limit, select), params,
+        max_rows=None if max_rows is None else max_rows + 1, projected=projected,
+    )
+
+
+async def query_table_page(
+    connection,
+    table_name: str,
+    page_size: int,
+    key_columns: list[str],
+    after: list = None,
+    columns: list = None,
+) -> RowSet:
+    """Fetch up to page_size + 1 rows of a table in key order, starting after the key values in after.
+
+    Keyset pagination: the cost of a page does not depend on how far into the table it is.
+    The extra row tells the caller whether another page exists. Given the table's
+    columns, large values stay in the database (see select_table_rows).
+    """
+    order_by = ", ".join(quote_identifier(column) for column in key_columns)
+    body = f"FROM {quote_identifier(table_name)}"
+    params = []
+    if after is not None:
+        predicate, value_indexes = keyset_predicate(key_columns, quote_identifier)
+        body += f" WHERE {predicate}"
+        params = [after[i] for i in value_indexes]
+    body += f" ORDER BY {order_by}"
+    backend = backend_for(connection)
+    return await select_table_rows(
+        connection, columns, body, lambda select: backend.top_query(page_size + 1, select), params, page_size + 1
+    )
+
+
+async def sample_table(connection, table_name: str, n: int, schema: dict, seed: int) -> tuple:
+    """Fetch a uniform random sample of n rows of a table, keeping at most n rows in memory.
+
+    Returns (rows, method):
+    - "key-range": for a single integer primary key, random key values between its
+      MIN and MAX are looked up with IN (...) lists; only sampled rows are read.
+    - "random-order": rows are ordered by a seeded pseudo-random function of a
+      numeric key column in the database, and only the first n are transferred.
+    - "reservoir": otherwise all rows are streamed in fetchmany() batches through
+      a reservoir of n rows.
+    - "all": the table has no more than n rows.
+    The same seed gives the same sample of an unchanged table.
+    """
+    backend = backend_for(connection)
+    table = quote_identifier(table_name)
+    rng = random.Random(seed)
+    types = {column["name"]: column.get("type") for column in schema["columns"]}
+    primary_keys = schema["primary_keys"]
+    key = primary_keys[0] if len(primary_keys) == 1 and types.get(primary_keys[0]) == "integer" else None
+    # Rows whose order column is Null would all sort first, so only key columns qualify
+    order_column = next((name for name in primary_keys if types.get(name) in _NUMERIC_TYPES), None)
+
+    def _sample(cursor):
+        if key is not None:
+            with metrics.timed("execute"):
+                cursor.execute(f"SELECT COUNT(*), MIN({quote_identifier(key)}), MAX({quote_identifier(key)}) FROM {table}")
+                count, low, high = cursor.fetchone()
+            if count <= n:
+                with metrics.timed("execute"):
+                    cursor.execute(f"SELECT * FROM {table}")
+                with metrics.timed("fetch"):
+                    rows, _, _ = fetch_rows(cursor)
+                return rows, "all"
+            if count / (high - low + 1) >= MIN_KEY_DENSITY:
+                description = []
+
+                def _fetch(keys):
+                    key_list = ", ".join(str(int(value)) for value in keys)
+                    cursor.execute(f"SELECT * FROM {table} WHERE {quote_identifier(key)} IN ({key_list})")
+                    description[:] = cursor.description
+                    found = cursor.fetchall()
+                    metrics.add_rows(len(found))
+                    return found
+
+                with metrics.timed("execute"):
+                    found = key_range_sample(_fetch, low, high, count, n, rng)
+                if len(found) == n:
+                    names = [column[0] for column in description]
+                    key_index = names.index(key)
+                    found.sort(key=lambda row: row[key_index])
+                    convert = row_converter(description, LARGE_VALUE_CHARS)
+                    return RowSet(names, list(map(convert, found))), "key-range"
+
+        if order_column is not None:
+            order_by = backend.random_order(quote_identifier(order_column), seed)
+            try:
+                with metrics.timed("execute"):
+                    cursor.execute(backend.top_query(n, f"* FROM {table} ORDER BY {order_by}"))
+                with metrics.timed("fetch"):
+                    rows, _, _ = fetch_rows(cursor, n)
+                return rows, "random-order"
+            except DB_ERRORS as e:
+                print(f"Random-order sample of {table_name} failed, streaming all rows: {e}", file=sys.stderr)
+
+        with metrics.timed("execute"):
+            cursor.execute(f"SELECT * FROM {table}")
+        names = [column[0] for column in cursor.description]
+        convert = row_converter(cursor.description, LARGE_VALUE_CHARS)
+
+        def _rows():
+            while True:
+                batch = cursor.fetchmany(FETCH_BATCH_SIZE)
+                if not batch:
+                    return
+                metrics.add_rows(len(batch))
+                yield from batch
+
+        with metrics.timed("fetch"):
+            sample = reservoir_sample(_rows(), n, rng)
+        return RowSet(names, list(map(convert, sample))), "reservoir" if len(sample) == n else "all"
+
+    return await run_statement(connection, _sample)
 
 
 async def execute_sql(
-    connection: pyodbc.Connection,
+    connection,
     sql_query: str,
+    max_rows: int = None,
+    count_rows: bool = False,
+    params: list = None,
+    timeout: float = None,
 ) -> dict:
-    """Execute a custom SQL query."""
-    def _run_query():
-        cursor = connection.cursor()
-        cursor.execute(sql_query)
-        
-        # If the query returns results
-        if cursor.description:
-            columns = [column[0] for column in cursor.description]
-            results = []
-            for row in cursor.fetchall():
-                # Convert row to a list of values that can be serialized to JSON
-                row_values = [str(value) if isinstance(value, (bytes, bytearray)) else value for value in row]
-                results.append(dict(zip(columns, row_values)))
-            return {"result_type": "query", "data": results}
-        else:
+    """Execute a custom SQL query.
+
+    By default the full result set is materialized. With max_rows, only that many
+    rows are fetched; count_rows additionally counts the remaining rows without
+    keeping them (see fetch_rows). params are bound to the query's ? placeholders.
+    The query is cancelled after timeout seconds (see run_statement).
+    """
+    def _run_query(cursor):
+        with metrics.timed("execute"):
+            if params:
+                cursor.execute(sql_query, params)
+            else:
+                cursor.execute(sql_query)
+
             # For non-query operations like INSERT, UPDATE, DELETE
-            connection.commit()
-            return {"result_type": "command", "rows_affected": cursor.rowcount}
+            if not cursor.description:
+                connection.commit()
+                return {"result_type": "command", "rows_affected": cursor.rowcount}
+
+        # The query returns results
+        with metrics.timed("fetch"):
+            results, row_count, more_rows = fetch_rows(cursor, max_rows, count_rows)
+        return {"result_type": "query", "data": results, "row_count": row_count, "more_rows": more_rows}
     
-    result = await anyio.to_thread.run_sync(_run_query)
+    result = await run_statement(connection, _run_query, timeout, statement=sql_query)
+    return result
+
+
+def quote_identifier(name: str) -> str:
+    """Quote a table or column name for Access SQL, accepting already bracketed names"""
+    name = name.strip()
+    if name.startswith('[') and name.endswith(']'):
+        name = name[1:-1]
+    if '[' in name or ']' in name:
+        raise ValueError(f"Invalid identifier: {name}")
+    return f"[{name}]"
+
+
+async def bulk_insert(
+    connection,
+    table_name: str,
+    columns: list[str],
+    rows,
+    batch_size: int = None,
+    progress: dict = None,
+) -> dict:
+    """Insert rows into a table with a parameterized executemany, committing every batch_size rows.
+
+    fast_executemany is used when the driver supports it; if the first batch fails
+    with it enabled, the batch is retried with regular executemany. rows may be any
+    iterable of value lists and is consumed lazily. progress, if given, is updated
+    with the number of committed rows so callers can report partial success.
+    """
+    batch_size = batch_size or BULK_INSERT_BATCH_SIZE
+    progress = progress if progress is not None else {}
+    progress["rows_inserted"] = 0
+    column_list = ", ".join(quote_identifier(column) for column in columns)
+    placeholders = ", ".join("?" for _ in columns)
+    insert_sql = f"INSERT INTO {quote_identifier(table_name)} ({column_list}) VALUES ({placeholders})"
+
+    def _insert():
+        cursor = connection.cursor()
+        fast = hasattr(cursor, "fast_executemany")
+        started = time.perf_counter()
+        rows_iter = iter(rows)
+        try:
+            while True:
+                batch = list(islice(rows_iter, batch_size))
+                if not batch:
+                    break
+                if fast:
+                    cursor.fast_executemany = True
+                try:
+                    cursor.executemany(insert_sql, batch)
+                except DB_ERRORS:
+                    if not fast or progress["rows_inserted"]:
+                        raise
+                    # The driver may not support parameter arrays; retry without them
+                    connection.rollback()
+                    fast = False
+                    cursor.fast_executemany = False
+                    cursor.executemany(insert_sql, batch)
+                connection.commit()
+                progress["rows_inserted"] += len(batch)
+        except BaseException:
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
+        elapsed = time.perf_counter() - started
+        return {
+            "rows_inserted": progress["rows_inserted"],
+            "seconds": elapsed,
+            "rows_per_second": progress["rows_inserted"] / elapsed if elapsed > 0 else 0.0,
+            "fast_executemany": fast,
+        }
+
+    result = await run_on_connection(connection, _insert, "execute")
     return result
 
 
+async def run_sql(
+    conn_id: str,
+    sql_query: str,
+    max_rows: int = None,
+    count_rows: bool = False,
+    params: list = None,
+    timeout: float = None,
+    use_mirror: bool = True,
+) -> dict:
+    """Execute SQL on a pooled connection of conn_id, serving reads from the result cache.
+
+    Reads that only touch fresh mirrored tables run against the local mirror (see
+    mirror_pool_for); if the mirror rejects the query it runs against the database.
+    """
+    cache_key = None
+    if is_read_query(sql_query):
+        cache_key = result_cache_key(
+            conn_id, 'sql', normalize_sql(sql_query), tuple(params or ()), max_rows, count_rows, use_mirror
+        )
+    result_dict = result_cache.get(cache_key)
+    if result_dict is None:
+        started = time.perf_counter()
+        mirror_pool = await mirror_pool_for(conn_id, sql_query) if use_mirror else None
+        if mirror_pool is not None:
+            try:
+                async with mirror_pool.connection() as connection:
+                    result_dict = await execute_sql(
+                        connection, sql_query, max_rows=max_rows, count_rows=count_rows, params=params,
+                        timeout=timeout
+                    )
+                result_dict['source'] = "mirror"
+            except DB_ERRORS as e:
+                print(f"Mirror could not run the query, using the database instead: {e}", file=sys.stderr)
+        if result_dict is None:
+            async with connections[conn_id]['pool'].connection() as connection:
+                result_dict = await execute_sql(
+                    connection, sql_query, max_rows=max_rows, count_rows=count_rows, params=params, timeout=timeout
+                )
+        metrics.record_query(sql_query, time.perf_counter() - started)
+        note_sql_executed(conn_id, sql_query)
+        if result_dict['result_type'] == 'query':
+            result_cache.put(cache_key, result_dict)
+    return result_dict
+
+
+async def mirror_pool_for(conn_id: str, sql_query: str):
+    """Return the pool of conn_id's mirror if it can answer a read query, else None.
+
+    That is the case when every table the query mentions is mirrored and fresh,
+    and the query uses no syntax that SQLite would interpret differently.
+    """
+    if not is_read_query(sql_query):
+        return None
+    info = connections[conn_id]
+    mirror = info['mirror']
+    if not mirror.tables or not mirror_compatible(sql_query):
+        return None
+    tables = referenced_tables(sql_query, (await get_catalog(conn_id))["tables"])
+    if not mirror.is_fresh(tables, file_signature(info['db_path']), MIRROR_MAX_AGE):
+        return None
+    return await get_pool(mirror.path, writable=False, backend=BACKENDS["sqlite"])
+
+
+def timeout_message(timeout: float = None) -> str:
+    """Error message for a query cancelled by run_statement's timeout"""
+    seconds = QUERY_TIMEOUT if timeout is None else timeout
+    return (f"Error: Query cancelled after the {seconds:g}s timeout. Narrow the query, or pass a larger"
+            " timeout (timeout=0 for no limit).")
+
+
+def format_sql_error(error_msg: str, is_readonly: bool) -> str:
+    """Format a database error from executing SQL, with a hint at the likely fix."""
+    # Check if it's a known read-only error
+    if is_readonly and ('Update locks invalid' in error_msg or 'Operation must use an updateable query' in error_msg):
+        return f"Database Error: Cannot execute SQL because the connection is ReadOnly. Reconnect with writable=True if modification is needed. Original error: {error_msg}"
+    # Add helpful suggestions based on common errors
+    suggestions = ""
+    if "syntax error" in error_msg.lower():
+        suggestions = "\nPossible fix: Check your SQL syntax for errors."
+    elif "no such table" in error_msg.lower() or "invalid object name" in error_msg.lower():
+        suggestions = "\nPossible fix: Verify the table name exists."
+    elif "ambiguous column name" in error_msg.lower():
+        suggestions = "\nPossible fix: Fully qualify column names with table names."
+    elif "timeout expired" in error_msg.lower():
+        suggestions = "\nPossible fix: Narrow the query, or pass a larger timeout."
+    return f"SQL Error: {error_msg}{suggestions}"
+
+
 async def get_table_schema(
-    connection: pyodbc.Connection,
+    connection,
     table_name: str,
 ) -> list[dict]:
     """Get the schema of a specific table."""
-    def _get_schema():
-        cursor = connection.cursor()
-        cursor.execute(f"SELECT TOP 1 * FROM [{table_name}]")
-        columns = []
-        for column in cursor.description:
-            columns.append({
-                "name": column[0],
-                "type": type_mapping.get(column[1].__name__, column[1].__name__),
-                "nullable": column[6],
-            })
-        cursor.close()
-        return columns
-    
-    # Mapping from Python types to more friendly names
-    type_mapping = {
-        "str": "text",
-        "int": "integer",
-        "float": "float",
-        "datetime": "datetime",
-        "bool": "boolean",
-        "bytes": "binary",
-    }
-    
-    schema = await anyio.to_thread.run_sync(_get_schema)
+    backend = backend_for(connection)
+    schema = await run_on_connection(
+        connection, lambda: backend.table_columns(connection, table_name), "metadata", PRIORITY_METADATA
+    )
     return schema
 
 
 async def get_extended_schema(
-    connection: pyodbc.Connection,
+    connection,
     table_name: str,
 ) -> dict:
     """Get more detailed schema including primary keys and indexes."""
     schema_info = await get_table_schema(connection, table_name)
     
+    backend = backend_for(connection)
+
     def _get_primary_keys_and_indexes():
-        cursor = connection.cursor()
         primary_keys = []
         indexes = []
         
         # Get indexes (which include primary keys in Access)
         try:
-            # This will get all indexes in the table
-            for index_info in cursor.statistics(table=table_name):
-                if index_info[5]:  # index_name is not None
-                    index_name = index_info[5]
-                    column_name = index_info[8]
-                    is_unique = not index_info[6]  # non_unique = 0 means it's unique
-                    
-                    # In Access, primary key is typically an index named "PrimaryKey"
-                    if index_name == "PrimaryKey" or "PK" in index_name:
-                        primary_keys.append(column_name)
-                    
-                    # Store index information
-                    indexes.append({
-                        "name": index_name,
-                        "column": column_name,
-                        "unique": is_unique
-                    })
+            for index_name, column_name, non_unique in backend.statistics(connection, table_name):
+                # In Access, primary key is typically an index named "PrimaryKey"
+                if index_name == "PrimaryKey" or "PK" in index_name:
+                    primary_keys.append(column_name)
+                
+                # Store index information
+                indexes.append({
+                    "name": index_name,
+                    "column": column_name,
+                    "unique": not non_unique
+                })
         except Exception as e:
             # Access databases might not fully support this method
             pass
@@ -210,19 +803,15 @@ async def get_extended_schema(
         if not primary_keys:
             try:
                 # Try to find primary keys using a heuristic approach for Access
-                # In Access, primary keys often have an AutoNumber data type
-                cursor.execute(f"SELECT TOP 1 * FROM [{table_name}]")
-                for i, col in enumerate(cursor.description):
-                    col_name = col[0]
-                    if col[5]:  # is_autoincrement flag
-                        primary_keys.append(col_name)
-            except:
+                primary_keys = backend.autoincrement_columns(connection, table_name)
+            except Exception:
                 pass
         
-        cursor.close()
         return {"primary_keys": primary_keys, "indexes": indexes}
     
-    pk_index_info = await anyio.to_thread.run_sync(_get_primary_keys_and_indexes)
+    pk_index_info = await run_on_connection(
+        connection, _get_primary_keys_and_indexes, "metadata", PRIORITY_METADATA
+    )
     
     # Mark primary keys in the schema
     for column in schema_info:
@@ -235,44 +824,394 @@ async def get_extended_schema(
     }
 
 
-def format_value(val):
-    """Format a value for display, handling None and datetime types"""
-    if val is None:
-        return "NULL"
-    if isinstance(val, (datetime, date)):
-        return val.isoformat()
-    return str(val)
+async def get_cached_schema(conn_id: str, table_name: str) -> dict:
+    """Return get_extended_schema() for a table, cached until the database file changes."""
+    db_path = connections[conn_id]['db_path']
+    schema = schema_store.get_table(db_path, table_name)
+    if schema is None:
+        signature = file_signature(db_path)
+        async with connections[conn_id]['pool'].connection() as connection:
+            schema = await get_extended_schema(connection, table_name)
+        schema_store.put_table(db_path, table_name, schema, signature)
+    return schema
+
+
+async def describe_database(conn_id: str, refresh: bool = False) -> tuple:
+    """Describe every table of a database, crawling tables concurrently over the pool.
+
+    Returns ({table: schema or {"error": message}}, from_snapshot, snapshot_path).
+    """
+    info = connections[conn_id]
+    db_path = info['db_path']
+    if not refresh:
+        tables = schema_store.get_database(db_path)
+        if tables is not None:
+            return tables, True, schema_store.snapshot_path(db_path) if schema_store.snapshot_dir else None
+    else:
+        schema_store.invalidate(db_path)
+
+    signature = file_signature(db_path)
+    table_names = (await get_catalog(conn_id))["tables"]
+    tables = {}
+    limiter = anyio.CapacityLimiter(info['pool'].max_size)
+
+    async def _describe(table_name):
+        async with limiter:
+            try:
+                tables[table_name] = await get_cached_schema(conn_id, table_name)
+            except Exception as e:
+                tables[table_name] = {"error": str(e)}
+
+    async with anyio.create_task_group() as tg:
+        for table_name in table_names:
+            tg.start_soon(_describe, table_name)
+
+    # Keep catalog order rather than completion order
+    tables = {table_name: tables[table_name] for table_name in table_names}
+    snapshot_path = schema_store.put_database(db_path, tables, signature)
+    return tables, False, snapshot_path
+
+
+async def get_search_index(conn_id: str, include_columns: bool = True) -> TrigramIndex:
+    """Return the trigram index of a database's table, column and linked source names.
+
+    The index is built once and rebuilt only when the catalog is reloaded (after
+    file changes or DDL). With include_columns every table is described first
+    (see describe_database, which reuses the schema snapshot).
+    """
+    db_path = connections[conn_id]['db_path']
+    catalog = await get_catalog(conn_id)
+    tables = (await describe_database(conn_id))[0] if include_columns else {}
+    signature = file_signature(db_path)
+    cached = search_indexes.get((db_path, include_columns))
+    if cached is not None and cached[0] is catalog and cached[1] == signature:
+        return cached[2]
+
+    index = TrigramIndex()
+    for table_name in catalog["tables"]:
+        index.add(catalog["table_types"].get(table_name, "TABLE").lower(), table_name)
+        for column in tables.get(table_name, {}).get("columns", []):
+            index.add("column", table_name, column["name"])
+    for table_name, (_, source_name) in catalog.get("linked_sources", {}).items():
+        if source_name != table_name:
+            index.add("linked source", table_name, text=source_name)
+    search_indexes[(db_path, include_columns)] = (catalog, signature, index)
+    return index
+
+
+async def find_value(conn_id: str, value: str, tables: list = None, max_hits: int = 10,
+                     contains: bool = False, indexed_only: bool = False) -> dict:
+    """Search the tables of a database for rows holding value, probing tables concurrently.
+
+    Columns are picked from the cached schema (see describe_database) by type, and
+    indexed columns are probed on their own, ahead of the scans of the remaining
+    columns (see plan_probes). Probes run concurrently over the connection pool;
+    each fetches at most the hits still wanted, and once max_hits rows have been
+    found the running probes are cancelled and the rest are skipped. Returns
+    {"hits": [(table, columns, row)], "probes", "probes_run", "columns", "tables",
+    "errors", "complete"}.
+    """
+    info = connections[conn_id]
+    schemas = (await describe_database(conn_id))[0]
+    if tables:
+        names = {name.lower(): name for name in schemas}
+        missing = [table for table in tables if table.strip("[]").lower() not in names]
+        if missing:
+            raise ValueError(f"Table(s) not found: {', '.join(missing)}")
+        schemas = {names[table.strip("[]").lower()]: schemas[names[table.strip("[]").lower()]] for table in tables}
+    probes, columns_searched = plan_probes(schemas, value, contains, indexed_only)
+    backend = backend_for_path(info['db_path'])
+    operator = "LIKE" if contains else "="
+    hits = []
+    errors = []
+    state = {"probes_run": 0}
+    limiter = anyio.CapacityLimiter(info['pool'].max_size)
+
+    async def _probe(probe, scope):
+        async with limiter:
+            wanted = max_hits - len(hits)
+            if wanted <= 0:
+                return
+            state["probes_run"] += 1
+            where = " OR ".join(f"{quote_identifier(column)} {operator} ?" for column in probe.columns)
+            sql_query = backend.top_query(wanted, f"* FROM {quote_identifier(probe.table)} WHERE {where}")
+
+            def _run_query(cursor):
+                with metrics.timed("execute"):
+                    cursor.execute(sql_query, list(probe.params))
+                with metrics.timed("fetch"):
+                    # Values are kept whole for matching_columns and compacted afterwards
+                    rows, _, _ = fetch_rows(cursor, wanted, convert=tuple)
+                return rows
+
+            try:
+                async with info['pool'].connection() as connection:
+                    rows = await run_statement(connection, _run_query, statement=sql_query)
+            except TimeoutError:
+                errors.append((probe.table, "timed out"))
+                return
+            except PoolExhaustedError as e:
+                errors.append((probe.table, str(e)))
+                return
+            except DB_ERRORS as e:
+                errors.append((probe.table, str(e)))
+                return
+            for row in rows[:max_hits - len(hits)]:
+                matched = matching_columns(row, probe, value, contains)
+                row = {name: compact_value(cell, LARGE_VALUE_CHARS) for name, cell in row.items()}
+                hits.append((probe.table, matched, row))
+            if len(hits) >= max_hits:
+                # Enough hits: stop the probes still running and skip the rest
+                scope.cancel()
+
+    async with anyio.create_task_group() as tg:
+        for probe in probes:
+            tg.start_soon(_probe, probe, tg.cancel_scope)
+
+    return {
+        "hits": hits,
+        "probes": len(probes),
+        "probes_run": state["probes_run"],
+        "columns": columns_searched,
+        "tables": len(schemas),
+        "errors": errors,
+        "complete": len(hits) < max_hits,
+    }
+
+
+async def read_cell(conn_id: str, table_name: str, column: str, key: dict, offset: int, length: int) -> dict:
+    """Read length characters (bytes for binary columns) of one cell from offset.
+
+    The row is identified by key, {column: value}, normally its primary key, and
+    must be unique. Only the requested range is transferred where the backend can
+    slice the value in SQL (see Backend.substring_sql); otherwise the cell is read
+    whole and sliced here. Returns {"column", "binary", "value", "total"}; total
+    is the length of the whole value, and value is None for a Null cell.
+    """
+    schema = await get_cached_schema(conn_id, table_name)
+    by_name = {item["name"].lower(): item for item in schema["columns"]}
+    missing = [name for name in [column, *key] if name.strip("[]").lower() not in by_name]
+    if missing:
+        raise ValueError(f"Column(s) not found in '{table_name}': {', '.join(missing)}")
+    if not key:
+        raise ValueError("key must name at least one column, e.g. {\"ID\": 42}.")
+    column_info = by_name[column.strip("[]").lower()]
+    binary = column_info.get("type") in ("binary", "bytearray")
+    backend = backend_for_path(connections[conn_id]['db_path'])
+    quoted = quote_identifier(column_info["name"])
+    ranged = backend.substring_sql(quoted, offset + 1, length, binary)
+    select = f"{backend.length_sql(quoted, binary)}, {ranged}" if ranged else quoted
+    where = " AND ".join(f"{quote_identifier(by_name[name.strip('[]').lower()]['name'])} = ?" for name in key)
+    # Two rows are enough to tell that the key is not unique
+    sql_query = backend.top_query(2, f"{select} FROM {quote_identifier(table_name)} WHERE {where}")
+
+    def _read(cursor):
+        with metrics.timed("execute"):
+            cursor.execute(sql_query, list(key.values()))
+        with metrics.timed("fetch"):
+            rows = cursor.fetchall()
+        metrics.add_rows(len(rows))
+        return rows
+
+    async with connections[conn_id]['pool'].connection() as connection:
+        rows = await run_statement(connection, _read, statement=sql_query)
+    if not rows:
+        raise ValueError(f"No row of '{table_name}' matches {key}.")
+    if len(rows) > 1:
+        raise ValueError(f"More than one row of '{table_name}' matches {key}; use its primary key "
+                         f"({', '.join(schema['primary_keys']) or 'none'}).")
+    if ranged:
+        total, value = rows[0]
+    else:
+        value = rows[0][0]
+        total = None if value is None else len(value)
+        value = None if value is None else value[offset:offset + length]
+    if binary and value is not None:
+        value = bytes(value)
+    return {"column": column_info["name"], "binary": binary, "value": value,
+            "total": None if total is None else int(total)}
+
+
+async def run_query_job(job, timeout: float = None):
+    """Run a submitted query, writing its rows to a JSON lines file in JOBS_PATH as they are fetched.
+
+    The file starts with a line holding the array of column names, followed by an
+    array of values per row (see ResultFile).
+
+    Rows are fetched in FETCH_BATCH_SIZE batches and job.rows counts them, so the
+    job's progress can be polled while it runs.
+    """
+    info = connections.get(job.conn_id)
+    if info is None:
+        raise RuntimeError(f"Connection {job.conn_id} was closed")
+    os.makedirs(JOBS_PATH, exist_ok=True)
+    result = job.result = ResultFile(os.path.join(JOBS_PATH, f"{os.getpid()}-{job.id}.jsonl"))
+
+    def _spill(cursor):
+        with metrics.timed("execute"):
+            cursor.execute(job.sql, job.params) if job.params else cursor.execute(job.sql)
+        job.columns = [column[0] for column in cursor.description]
+        convert = row_converter(cursor.description, LARGE_VALUE_CHARS)
+        with open(result.path, "wb") as f:
+            result.start(f, job.columns)
+            while not job.cancel_requested:
+                batch = cursor.fetchmany(FETCH_BATCH_SIZE)
+                if not batch:
+                    break
+                result.append(f, map(convert, batch))
+                job.rows = result.rows
+        if job.cancel_requested:
+            raise RuntimeError("Job cancelled")
+
+    started = time.perf_counter()
+    async with info['pool'].connection() as connection:
+        await run_statement(connection, _spill, timeout, statement=job.sql)
+    metrics.record_query(job.sql, time.perf_counter() - started)
+
+
+async def export_query(conn_id: str, sql_query: str, path: str, export_format: str, params: list = None,
+                       timeout: float = 0) -> dict:
+    """Stream the result of a query on a pooled connection of conn_id to a file (see export_cursor)"""
+    def _export(cursor):
+        with metrics.timed("execute"):
+            cursor.execute(sql_query, params) if params else cursor.execute(sql_query)
+        with metrics.timed("fetch"):
+            return export_cursor(cursor, path, export_format, FETCH_BATCH_SIZE, metrics.add_rows)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    async with connections[conn_id]['pool'].connection() as connection:
+        return await run_statement(connection, _export, timeout, statement=sql_query)
+
+
+def format_schema_line(table_name: str, schema: dict) -> str:
+    """Format a table's schema as one compact line: name(col type, ...) with [PK] marks and indexes"""
+    if "error" in schema:
+        return f"{table_name}: (error: {schema['error']})"
+    columns = ", ".join(
+        f"{'[PK] ' if column.get('primary_key') else ''}{column['name']} {column.get('type', '?')}"
+        for column in schema["columns"]
+    )
+    line = f"{table_name}({columns})"
+    indexes = [index for index in schema["indexes"] if index["name"] != "PrimaryKey"]
+    if indexes:
+        line += " indexes: " + ", ".join(
+            f"{'UNIQUE ' if index.get('unique') else ''}{index['name']}({index['column']})" for index in indexes
+        )
+    return line
+
+
+# Column types whose values can't be aggregated with MIN/MAX, and those that can be averaged
+_UNORDERED_TYPES = ("binary", "bytearray")
+_NUMERIC_TYPES = ("integer", "float", "Decimal")
+
 
+def build_profile_query(table_name: str, columns: list[dict], count_distinct: bool, min_max_types=None):
+    """Build one aggregate statement profiling every column of a table.
 
-def format_results(results, max_chars=None):
-    """Format rows in a clean vertical format with intelligent truncation"""
+    Returns (sql, stats) where stats lists (column name, statistic) for each
+    selected expression after the leading COUNT(*). min_max_types, if given,
+    restricts MIN/MAX to columns of those types.
+    """
+    expressions = ["COUNT(*)"]
+    stats = []
+    for column in columns:
+        name = quote_identifier(column["name"])
+        column_type = column.get("type")
+        wanted = [("non_null", f"COUNT({name})")]
+        if count_distinct:
+            wanted.append(("distinct", f"COUNT(DISTINCT {name})"))
+        if column_type not in _UNORDERED_TYPES and (min_max_types is None or column_type in min_max_types):
+            wanted += [("min", f"MIN({name})"), ("max", f"MAX({name})")]
+        if column_type in _NUMERIC_TYPES:
+            wanted.append(("mean", f"AVG({name})"))
+        for stat, expression in wanted:
+            expressions.append(expression)
+            stats.append((column["name"], stat))
+    select = ", ".join(f"{expression} AS p{i}" for i, expression in enumerate(expressions))
+    return f"SELECT {select} FROM {quote_identifier(table_name)}", stats
+
+
+async def profile_table(conn_id: str, table_name: str) -> tuple:
+    """Profile the columns of a table with a single aggregate scan.
+
+    The scan runs against the local mirror when it is fresh for the table. Profiles
+    are cached until the database file changes. Returns (profile, cached) where
+    profile is {"rows", "seconds", "source", "columns": [{name, type, non_null,
+    distinct, min, max, mean}]}.
+    """
+    info = connections[conn_id]
+    db_path = info['db_path']
+    profile = schema_store.get_profile(db_path, table_name)
+    if profile is not None:
+        return profile, True
+
+    signature = file_signature(db_path)
+    schema = await get_cached_schema(conn_id, table_name)
+    mirror = info['mirror']
+    if mirror.is_fresh([table_name], signature, MIRROR_MAX_AGE):
+        pool, backend, source = await get_pool(mirror.path, False, BACKENDS["sqlite"]), BACKENDS["sqlite"], "mirror"
+    else:
+        pool, backend, source = info['pool'], backend_for_path(db_path), "database"
+
+    started = time.perf_counter()
+    sql_query, stats = build_profile_query(table_name, schema["columns"], backend.supports_count_distinct)
+    async with pool.connection() as connection:
+        try:
+            result = await execute_sql(connection, sql_query)
+        except DB_ERRORS as e:
+            # Some drivers refuse MIN/MAX on long text (Memo) columns; keep them for the rest
+            print(f"Profile query failed, retrying without text MIN/MAX: {e}", file=sys.stderr)
+            sql_query, stats = build_profile_query(
+                table_name, schema["columns"], backend.supports_count_distinct,
+                min_max_types=_NUMERIC_TYPES + ("datetime", "date", "boolean"),
+            )
+            result = await execute_sql(connection, sql_query)
+    values = list(result["data"].rows[0])
+
+    columns = {column["name"]: {"name": column["name"], "type": column.get("type")} for column in schema["columns"]}
+    for (column_name, stat), value in zip(stats, values[1:]):
+        columns[column_name][stat] = value
+    # Without COUNT(DISTINCT), single-column primary and unique keys are still known to be distinct
+    unique_columns = set()
+    if not backend.supports_count_distinct:
+        index_columns = {}
+        for index in schema["indexes"]:
+            index_columns.setdefault(index["name"], []).append(index)
+        unique_columns = {
+            entries[0]["column"] for entries in index_columns.values()
+            if len(entries) == 1 and entries[0].get("unique")
+        }
+        if len(schema["primary_keys"]) == 1:
+            unique_columns.add(schema["primary_keys"][0])
+    for column in columns.values():
+        if "distinct" not in column and column["name"] in unique_columns:
+            column["distinct"] = column["non_null"]
+
+    profile = {
+        "rows": values[0],
+        "seconds": time.perf_counter() - started,
+        "source": source,
+        "columns": list(columns.values()),
+    }
+    schema_store.put_profile(db_path, table_name, profile, signature)
+    return profile, False
+
+
+def format_results(results, max_chars=None, output_format="vertical"):
+    """Format rows in a clean vertical format (or another of OUTPUT_FORMATS) with intelligent truncation"""
     if not max_chars:
         max_chars = EXECUTE_QUERY_MAX_CHARS
-        
-    output = ""
-    row_displayed = 0
-    current_size = 0
-    
-    for i, row in enumerate(results, 1):
-        line = f"{i}. row\n"
-        for col, val in row.items():
-            line += f"{col}: {format_value(val)}\n"
-        line += "\n"
-        
-        current_size += len(line)
-        if max_chars and current_size > max_chars:
-            break
-            
-        output += line
-        row_displayed = i
+
+    with metrics.timed("format"):
+        formatted = format_rows(results, output_format, max_chars)
     
     # Add summary information
     total_rows = len(results)
-    output += f"\nResult: {total_rows} rows"
-    if row_displayed < total_rows:
-        output += f" (output truncated, showing {row_displayed} of {total_rows})"
+    output = formatted.text + f"\nResult: {total_rows} rows"
+    if formatted.rows < total_rows:
+        output += f" (output truncated, showing {formatted.rows} of {total_rows})"
     
-    return output, row_displayed
+    return output, formatted.rows
 
 
 def save_results_for_claude(results):
@@ -280,76 +1219,174 @@ def save_results_for_claude(results):
     if not CLAUDE_FILES_PATH:
         return ""
         
-    # Create a serializable version of the results
-    serializable_results = json.dumps(results)
-    file_hash = hashlib.sha256(serializable_results.encode()).hexdigest()
-    file_name = f"{file_hash}.json"
-    file_path = os.path.join(CLAUDE_FILES_PATH, file_name)
-    
+    partial = None
     try:
-        with open(file_path, 'w') as f:
-            f.write(serializable_results)
+        # Stream the JSON to a temporary file, hashing it on the way, instead of
+        # building the whole document as one string
+        digest = hashlib.sha256()
+        with tempfile.NamedTemporaryFile('w', dir=CLAUDE_FILES_PATH, suffix='.partial', delete=False) as f:
+            partial = f.name
+            # Same text as json.dumps() of the rows as a list of dicts, one row at a time
+            for index, row in enumerate(results):
+                chunk = ("[" if index == 0 else ", ") + json.dumps(row)
+                f.write(chunk)
+                digest.update(chunk.encode())
+            chunk = "]" if results else "[]"
+            f.write(chunk)
+            digest.update(chunk.encode())
+        file_name = f"{digest.hexdigest()}.json"
+        os.replace(partial, os.path.join(CLAUDE_FILES_PATH, file_name))
+        partial = None
             
         return (f"\nFull result set url: https://cdn.jsdelivr.net/pyodide/claude-local-files/{file_name}"
                 " (format: JSON array of objects)"
                 " (ALWAYS prefer fetching this url in artifacts instead of hardcoding the values)")
     except Exception as e:
         return f"\nError saving results for Claude: {str(e)}"
+    finally:
+        # Leave no partial file behind if writing failed
+        if partial is not None:
+            try:
+                os.remove(partial)
+            except OSError:
+                pass
 
 
-# Define MCP tools using FastMCP decorators
-
-@mcp.tool()
-async def connect(db_path: str, writable: bool = False) -> str:
-    """Connect to an MS Access database.
-
-    Defaults to a ReadOnly connection to minimize file locking.
-    Set writable=True to connect in a shared mode allowing writes (if permissions allow) 
-    and better concurrency for other users.
-
-    Args:
-        db_path: Path to the MS Access .mdb or .accdb file
-        writable: If True, connect in shared/writable mode. Defaults to False (ReadOnly).
+async def open_connection(db_path: str, writable: bool = False) -> str:
+    """Open (or reopen in another mode) the connection pool of a database as conn_id = its file name.
 
-    Returns:
-        A message indicating success or failure. 
-        On success, the message will include the connection ID (the database filename), 
-        which should be used in subsequent tool calls.
+    Returns a message for the user, as the connect tool does.
     """
     conn_id = os.path.basename(db_path)
+    abs_path = os.path.abspath(db_path)
     mode_text = "SHARED Writable" if writable else "ReadOnly"
 
     if conn_id in connections:
-        current_writable = connections[conn_id]['writable']
-        if writable == current_writable:
+        current = connections[conn_id]
+        if writable == current['writable'] and abs_path == current['db_path']:
             return f"Already connected to {conn_id} in {mode_text} mode."
         else:
-            # Mode change requested, disconnect old connection first
+            # Mode (or file) change requested, close the old pool first
             print(f"Mode change requested for {conn_id}. Reconnecting in {mode_text} mode.", file=sys.stderr)
             try:
-                old_conn = connections[conn_id]['conn']
-                await anyio.to_thread.run_sync(lambda: old_conn.close())
-                del connections[conn_id]
-                print(f"Closed previous connection to {conn_id}.", file=sys.stderr)
+                await current['held_cursors'].close_all()
+                await close_pool(current['pool'])
+                print(f"Closed previous connection pool for {conn_id}.", file=sys.stderr)
             except Exception as e:
                 # Log error but try to continue connecting
-                print(f"Error closing previous connection for {conn_id}: {e}", file=sys.stderr)
-                # Ensure entry is removed if disconnect failed partially
-                if conn_id in connections:
-                     del connections[conn_id]
+                print(f"Error closing previous connection pool for {conn_id}: {e}", file=sys.stderr)
+            finally:
+                # Ensure entry is removed even if closing failed partially
+                connections.pop(conn_id, None)
 
     # Proceed with new connection or reconnection
     try:
-        connection = await connect_to_access_db(db_path, writable=writable)
-        connections[conn_id] = {'conn': connection, 'writable': writable}
+        pool = await get_pool(abs_path, writable=writable)
+        catalog = catalogs.setdefault(abs_path, CatalogCache(abs_path))
+        # Reuse the schema snapshot of a previous run if the file has not changed
+        schema_store.load(abs_path)
+        mirror = mirrors.get(abs_path)
+        if mirror is None:
+            mirror = mirrors[abs_path] = Mirror(abs_path, MIRROR_PATH)
+            mirror.load()
+        connections[conn_id] = {
+            'pool': pool,
+            'catalog': catalog,
+            'held_cursors': HeldCursors(ttl=PAGE_CURSOR_TTL, max_cursors=PAGE_CURSOR_MAX, executor=executor),
+            'writable': writable,
+            'db_path': abs_path,
+            'mirror': mirror,
+        }
         return f"Successfully connected to {conn_id} in {mode_text} mode. Use '{conn_id}' as the conn_id for other tools."
-    except pyodbc.Error as e:
+    except DB_ERRORS as e:
         return f"Database Error connecting in {mode_text} mode: {str(e)}"
     except Exception as e:
         return f"Error connecting in {mode_text} mode: {str(e)}"
 
 
+async def connection_ready(conn_id: str) -> bool:
+    """Check whether conn_id is connected, first waiting for it if it is still being opened at startup"""
+    pending = startup_connects.get(conn_id)
+    if pending is not None:
+        await pending.wait()
+    return conn_id in connections
+
+
+async def warm_up_database(entry: dict):
+    """Open a database from the startup config and load its catalog (and schema, if asked) in advance"""
+    conn_id = os.path.basename(entry["path"])
+    started = time.perf_counter()
+    try:
+        message = await open_connection(entry["path"], entry["writable"])
+    finally:
+        # Let tool calls waiting for this connection go ahead, whether it opened or not
+        startup_connects.pop(conn_id).set()
+    if conn_id not in connections:
+        print(f"Startup: {message}", file=sys.stderr)
+        return
+    try:
+        tables = (await get_catalog(conn_id))["tables"]
+        if entry["describe"]:
+            await describe_database(conn_id)
+        print(f"Startup: {conn_id} ready in {time.perf_counter() - started:.2f}s ({len(tables)} tables"
+              f"{', schema loaded' if entry['describe'] else ''})", file=sys.stderr)
+    except Exception as e:
+        print(f"Startup: Could not prewarm {conn_id}: {e}", file=sys.stderr)
+
+
+@asynccontextmanager
+async def server_lifespan(server):
+    """Open the databases of the startup config in the background while the server starts serving.
+
+    Tool calls for a database that is still being opened wait for it (see
+    connection_ready); catalogs and schemas keep loading in the background.
+    The workers of the job scheduler run here too, for as long as the server runs.
+    """
+    try:
+        entries = load_startup_databases(STARTUP_CONFIG, STARTUP_DATABASES)
+    except ValueError as e:
+        print(f"Warning: {e}", file=sys.stderr)
+        entries = []
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(jobs.run)
+        for entry in entries:
+            startup_connects[os.path.basename(entry["path"])] = anyio.Event()
+            tg.start_soon(warm_up_database, entry)
+        try:
+            yield {}
+        finally:
+            tg.cancel_scope.cancel()
+
+
+# Define MCP tools using FastMCP decorators
+
+@mcp.tool()
+@metrics.tool
+async def connect(db_path: str, writable: bool = False) -> str:
+    """Connect to an MS Access database.
+
+    Defaults to a ReadOnly connection to minimize file locking.
+    Set writable=True to connect in a shared mode allowing writes (if permissions allow) 
+    and better concurrency for other users.
+    Connections are pooled per database file and mode, so concurrent tool calls
+    against the same database run on separate connections.
+
+    Args:
+        db_path: Path to the MS Access .mdb or .accdb file
+        writable: If True, connect in shared/writable mode. Defaults to False (ReadOnly).
+
+    Returns:
+        A message indicating success or failure. 
+        On success, the message will include the connection ID (the database filename), 
+        which should be used in subsequent tool calls.
+    """
+    # A database from the startup config may still be opening; don't open it twice
+    await connection_ready(os.path.basename(db_path))
+    return await open_connection(db_path, writable)
+
+
 @mcp.tool()
+@metrics.tool
 async def list_tables_tool(conn_id: str, full: bool = False) -> str:
     """
     List all tables in the connected database (shows first 5 by default).
@@ -359,12 +1396,11 @@ async def list_tables_tool(conn_id: str, full: bool = False) -> str:
     Returns:
         A formatted list of table names, with a prompt if there are more than 5.
     """
-    if conn_id not in connections:
+    if not await connection_ready(conn_id):
         return f"Connection {conn_id} not found. Use the 'connect' tool first."
     
     try:
-        connection = connections[conn_id]['conn'] # Access connection object
-        all_tables = await list_tables(connection)
+        all_tables = (await get_catalog(conn_id))["tables"]
         if not all_tables:
             return f"No tables found for connection {conn_id}"
         
@@ -377,13 +1413,14 @@ async def list_tables_tool(conn_id: str, full: bool = False) -> str:
             output += f"\n... ({len(all_tables) - 5} more tables available. Set full=True to see all.)"
             
         return output
-    except pyodbc.Error as e:
+    except DB_ERRORS as e:
         return f"Database Error listing tables: {str(e)}"
     except Exception as e:
         return f"Error listing tables: {str(e)}"
 
 
 @mcp.tool()
+@metrics.tool
 async def filter_tables_tool(conn_id: str, substring: str, full: bool = False) -> str:
     """
     List tables containing a specific substring (shows first 5 by default).
@@ -394,60 +1431,229 @@ async def filter_tables_tool(conn_id: str, substring: str, full: bool = False) -
     Returns:
         A formatted list of matching table names, with a prompt if there are more than 5.
     """
-    if conn_id not in connections:
+    if not await connection_ready(conn_id):
+        return f"Connection {conn_id} not found. Use the 'connect' tool first."
+    
+    try:
+        all_tables = (await get_catalog(conn_id))["tables"]
+        filtered_tables = [t for t in all_tables if substring.lower() in t.lower()]
+        
+        if not filtered_tables:
+            return f"No tables found containing '{substring}' for connection {conn_id}"
+        
+        display_limit = None if full else 5
+        output_tables = filtered_tables[:display_limit]
+        
+        output = f"Tables containing '{substring}' for {conn_id}:\n" + "\n".join(output_tables)
+        
+        if not full and len(filtered_tables) > 5:
+            output += f"\n... ({len(filtered_tables) - 5} more matching tables available. Set full=True to see all.)"
+            
+        return output
+    except DB_ERRORS as e:
+        return f"Database Error filtering tables: {str(e)}"
+    except Exception as e:
+        return f"Error filtering tables: {str(e)}"
+
+
+@mcp.tool()
+@metrics.tool
+async def search_schema_tool(conn_id: str, query: str, limit: int = 20, include_columns: bool = True) -> str:
+    """Fuzzy search for tables and columns by name
+    
+    Matches the query against table names, column names and the source names of
+    linked tables using a trigram index, so partial names, abbreviations and typos
+    still find the right object. Results are ranked by similarity.
+    
+    Args:
+        conn_id: Connection ID (filename of database)
+        query: Name or part of a name to look for (case insensitive)
+        limit: Maximum number of matches to return (default: 20)
+        include_columns: Also search column names. The first search describes every
+            table (like describe_database_tool); later searches use the cached schema.
+    
+    Returns:
+        Matches with their score (1.0 is an exact match), kind, table and column
+    """
+    if not await connection_ready(conn_id):
         return f"Connection {conn_id} not found. Use the 'connect' tool first."
+
+    try:
+        index = await get_search_index(conn_id, include_columns)
+        matches = index.search(query, max(1, limit))
+        if not matches:
+            return f"No tables or columns matching '{query}' for connection {conn_id}"
+
+        linked_sources = (await get_catalog(conn_id)).get("linked_sources", {})
+        rows = []
+        for score, kind, table_name, column_name, text in matches:
+            if kind == "linked source":
+                database = linked_sources[table_name][0]
+                column_name = f"(source {text} in {os.path.basename(database or '')})"
+            rows.append({"score": f"{score:.2f}", "kind": kind, "table": table_name, "column": column_name or ""})
+        header = f"Matches for '{query}' in {conn_id} ({len(index)} names indexed):\n\n"
+        return header + format_rows(rows, "table", EXECUTE_QUERY_MAX_CHARS).text
+    except DB_ERRORS as e:
+        return f"Database Error searching schema: {str(e)}"
+    except Exception as e:
+        return f"Error searching schema: {str(e)}"
+
+
+@mcp.tool()
+@metrics.tool
+async def find_value_tool(
+    conn_id: str,
+    value: str,
+    tables: list[str] = None,
+    max_hits: int = 10,
+    contains: bool = False,
+    indexed_only: bool = False,
+    output_format: str = "table",
+) -> str:
+    """Find which tables and columns contain a value (an ID, code, name, date...)
+    
+    Searches every table in one call. Only columns whose type fits the value are
+    compared: text columns always, numeric columns if the value is a number, and
+    date columns if it is a date (YYYY-MM-DD[ HH:MM:SS]). Indexed columns are
+    probed first, each with its own index lookup; the other columns of a table are
+    searched with one scan. Tables are probed concurrently over the connection
+    pool, and the search stops as soon as max_hits rows have been found.
+    
+    Args:
+        conn_id: Connection ID (filename of database)
+        value: Value to look for
+        tables: Only search these tables (default: all tables)
+        max_hits: Stop after this many matching rows (default: 10)
+        contains: If True, find text columns containing value (LIKE '%value%', a scan)
+            instead of columns equal to it
+        indexed_only: If True, only probe indexed columns (fast, but may miss matches)
+        output_format: "table" (default), "vertical", "csv", "markdown" or "jsonl"
     
+    Returns:
+        One line per matching row with its table, matching column(s) and values
+    """
+    if not await connection_ready(conn_id):
+        return f"Connection {conn_id} not found. Use the 'connect' tool first."
+    if output_format not in OUTPUT_FORMATS:
+        return f"Error: Unknown output_format '{output_format}'. Use one of: {', '.join(OUTPUT_FORMATS)}"
+    value = value.strip()
+    if not value:
+        return "Error: value must not be empty."
+
     try:
-        connection = connections[conn_id]['conn'] # Access connection object
-        all_tables = await list_tables(connection)
-        filtered_tables = [t for t in all_tables if substring.lower() in t.lower()]
-        
-        if not filtered_tables:
-            return f"No tables found containing '{substring}' for connection {conn_id}"
-        
-        display_limit = None if full else 5
-        output_tables = filtered_tables[:display_limit]
-        
-        output = f"Tables containing '{substring}' for {conn_id}:\n" + "\n".join(output_tables)
-        
-        if not full and len(filtered_tables) > 5:
-            output += f"\n... ({len(filtered_tables) - 5} more matching tables available. Set full=True to see all.)"
-            
-        return output
-    except pyodbc.Error as e:
-        return f"Database Error filtering tables: {str(e)}"
+        max_hits = max(1, max_hits)
+        cache_key = result_cache_key(conn_id, 'find', value, tuple(tables or ()), max_hits, contains, indexed_only)
+        result = result_cache.get(cache_key)
+        started = time.perf_counter()
+        if result is None:
+            result = await find_value(conn_id, value, tables, max_hits, contains, indexed_only)
+            if not result["errors"]:
+                result_cache.put(cache_key, result)
+        elapsed = time.perf_counter() - started
+
+        summary = (f"{len(result['hits'])} matching rows for '{value}' in {conn_id} "
+                   f"({result['columns']} columns of {result['tables']} tables, "
+                   f"{result['probes_run']} of {result['probes']} probes run, {elapsed:.2f}s)")
+        if not result["complete"]:
+            summary += f"\nStopped after max_hits={max_hits} rows; more matches may exist."
+        if indexed_only:
+            summary += "\nOnly indexed columns were searched."
+        for table_name, error in result["errors"]:
+            summary += f"\nSkipped a probe of '{table_name}': {error}"
+        if not result["hits"]:
+            return f"No rows containing '{value}' found.\n{summary}"
+
+        rows = [
+            {"table": table_name, "column": ", ".join(columns),
+             "row": "; ".join(f"{name}={format_value(cell)}" for name, cell in row.items())[:FIND_VALUE_ROW_CHARS]}
+            for table_name, columns, row in result["hits"]
+        ]
+        return summary + "\n\n" + format_rows(rows, output_format, EXECUTE_QUERY_MAX_CHARS).text
+    except DB_ERRORS as e:
+        return f"Database Error searching for '{value}': {str(e)}"
     except Exception as e:
-        return f"Error filtering tables: {str(e)}"
+        return f"Error searching for '{value}': {str(e)}"
 
 
 @mcp.tool()
-async def query_table_tool(conn_id: str, table_name: str, limit: int = 3) -> str:
+@metrics.tool
+async def query_table_tool(
+    conn_id: str,
+    table_name: str,
+    limit: int = 3,
+    output_format: str = "vertical",
+    sample: bool = False,
+    seed: int = None,
+    columns: list[str] = None,
+    where: list[dict] = None,
+    order_by: list[str] = None,
+) -> str:
     """Query data from a table
     
+    By default the first rows in storage order are returned. With sample=True a
+    uniform random sample of limit rows is returned instead, without reading the
+    whole table where it has a numeric primary key. columns, where and order_by
+    are checked against the table's columns and run in the database, so only the
+    wanted rows and columns are transferred.
+    
     Args:
         conn_id: Connection ID (filename of database)
         table_name: Name of the table to query
         limit: Maximum number of rows to return (default: 3)
+        output_format: "vertical" (one line per field), or the more compact "table",
+            "csv", "markdown" or "jsonl"
+        sample: Return a random sample of limit rows instead of the first rows
+        seed: Seed for sample=True; the same seed repeats the same sample (default: random)
+        columns: Only return these columns, in this order (default: all columns)
+        where: Conditions the rows must all meet, each like {"column": "City", "op": "=", "value": "Paris"}.
+            op is one of =, <>, <, <=, >, >=, like, not like (value with % and _ wildcards),
+            in, not in (value is a list), between (value is [low, high]), is null, is not null
+        order_by: Columns to sort by, each optionally followed by DESC, e.g. ["Amount DESC", "OrderID"]
     
     Returns:
         Formatted query results
     """
-    if conn_id not in connections:
+    if not await connection_ready(conn_id):
         return f"Connection {conn_id} not found. Use the 'connect' tool first."
+    if output_format not in OUTPUT_FORMATS:
+        return f"Error: Unknown output_format '{output_format}'. Use one of: {', '.join(OUTPUT_FORMATS)}"
+    if sample and (columns or where or order_by):
+        return "Error: sample=True cannot be combined with columns, where or order_by."
     
     try:
-        connection = connections[conn_id]['conn'] # Access connection object
-        data = await query_table(connection, table_name, limit)
+        # Only materialize everything when the full result set is spilled to a file
+        spill = bool(CLAUDE_FILES_PATH)
+        max_rows = None if spill else DISPLAY_ROWS
+        if sample:
+            return await _sample_table_output(conn_id, table_name, limit if spill else min(limit, DISPLAY_ROWS),
+                                              seed, output_format)
+        schema = await get_cached_schema(conn_id, table_name)
+        query = build_table_query(schema["columns"], quote_identifier, columns, where, order_by,
+                                  tiebreak=schema["primary_keys"])
+        cache_key = result_cache_key(
+            conn_id, 'table', table_name.lower(), limit, max_rows,
+            tuple(column["name"] for column in query.columns) if query.projected else None,
+            query.where, tuple(query.params), query.order_by,
+        )
+        data = result_cache.get(cache_key)
+        if data is None:
+            async with connections[conn_id]['pool'].connection() as connection:
+                data = await query_table(connection, table_name, limit, max_rows=max_rows, query=query)
+            result_cache.put(cache_key, data)
+        if not data and query.where:
+            return f"No rows of table '{table_name}' match the where conditions."
         if not data:
             return f"No data found in table '{table_name}' for connection {conn_id}"
         
         # Use the enhanced formatter
-        row_displayed = 10  # Maximum rows to display inline
-        formatted_output = format_results(data[:row_displayed], max_chars=EXECUTE_QUERY_MAX_CHARS)
+        row_displayed = DISPLAY_ROWS  # Maximum rows to display inline
+        formatted_output, _ = format_results(data[:row_displayed], EXECUTE_QUERY_MAX_CHARS, output_format)
         
         # Add a message if more rows were fetched but not displayed
         actual_retrieved = len(data)
-        if actual_retrieved > row_displayed:
+        if actual_retrieved > row_displayed and not spill:
+            formatted_output += f"\n... Displaying first {row_displayed} rows; more rows are available (query limit was {limit})."
+        elif actual_retrieved > row_displayed:
             formatted_output += f"\n... Displaying first {row_displayed} of {actual_retrieved} rows retrieved (query limit was {limit})."
         elif actual_retrieved < limit:
              formatted_output += f"\n(Retrieved {actual_retrieved} rows, which is less than the limit of {limit})"
@@ -455,12 +1661,16 @@ async def query_table_tool(conn_id: str, table_name: str, limit: int = 3) -> str
             formatted_output += f"\n(Retrieved {actual_retrieved} rows, reaching the limit of {limit})"
             
         # For large result sets, save them for Claude
-        if actual_retrieved > row_displayed and CLAUDE_FILES_PATH:
+        if actual_retrieved > row_displayed and spill:
             claude_link = save_results_for_claude(data)
             formatted_output += claude_link
             
         return formatted_output
-    except pyodbc.Error as e:
+    except ValueError as e:
+        return f"Error: {str(e)}"
+    except TimeoutError:
+        return timeout_message()
+    except DB_ERRORS as e:
         # Check if it's a read-only error
         if connections[conn_id]['writable'] is False and ('Update locks invalid' in str(e) or 'Operation must use an updateable query' in str(e)):
              return f"Database Error: Cannot perform this operation on table '{table_name}' because the connection is ReadOnly. Reconnect with writable=True if modification is needed. Original error: {str(e)}"
@@ -469,19 +1679,269 @@ async def query_table_tool(conn_id: str, table_name: str, limit: int = 3) -> str
         return f"Error querying table '{table_name}': {str(e)}"
 
 
+async def _sample_table_output(conn_id: str, table_name: str, n: int, seed: int, output_format: str) -> str:
+    """Sample n rows of a table for query_table_tool(sample=True) and format them"""
+    if seed is None:
+        seed = random.randrange(1, 1000000)
+    cache_key = result_cache_key(conn_id, 'sample', table_name.lower(), n, seed)
+    cached = result_cache.get(cache_key)
+    if cached is None:
+        schema = await get_cached_schema(conn_id, table_name)
+        async with connections[conn_id]['pool'].connection() as connection:
+            cached = await sample_table(connection, table_name, max(1, n), schema, seed)
+        result_cache.put(cache_key, cached)
+    data, method = cached
+    if not data:
+        return f"No data found in table '{table_name}' for connection {conn_id}"
+
+    formatted_output, _ = format_results(data[:DISPLAY_ROWS], EXECUTE_QUERY_MAX_CHARS, output_format)
+    if method == "all":
+        formatted_output += f"\n(The table has only {len(data)} rows; all are shown)"
+    else:
+        formatted_output += f"\n(Random sample of {len(data)} rows by {method} sampling; seed={seed})"
+    if len(data) > DISPLAY_ROWS:
+        formatted_output += f"\n... Displaying first {DISPLAY_ROWS} of {len(data)} rows sampled."
+        formatted_output += save_results_for_claude(data)
+    return formatted_output
+
+
+def _format_page(rows: RowSet, page_size: int, output_format: str = "vertical"):
+    """Format one page of rows; returns (text, rows_shown, more_rows)."""
+    more_rows = len(rows) > page_size
+    page = rows[:page_size]
+    text, shown = format_results(page, EXECUTE_QUERY_MAX_CHARS, output_format)
+    if page and shown == 0:
+        # Always make progress, even if a single row exceeds the output budget
+        text, shown = format_results(page[:1], sys.maxsize, output_format)
+    return text, shown, more_rows or shown < len(page)
+
+
+async def _cursor_page(conn_id: str, table_name: str, page_size: int, state: dict = None,
+                       output_format: str = "vertical"):
+    """Serve a page from a held-open cursor (for tables without a usable key)."""
+    info = connections[conn_id]
+    held_cursors = info['held_cursors']
+
+    if state is None:
+        # Dedicated connection so the held cursor does not occupy a pooled one
+        connection = await connect_to_access_db(info['db_path'], writable=info['writable'])
+
+        def _open():
+            cursor = connection.cursor()
+            cursor.execute(f"SELECT * FROM {quote_identifier(table_name)}")
+            return cursor, [column[0] for column in cursor.description]
+
+        try:
+            cursor, columns = await run_on_connection(connection, _open, "execute")
+        except BaseException:
+            await executor.close(connection)
+            raise
+        cursor_id = await held_cursors.add(connection, cursor, columns, [], table_name)
+        entry = await held_cursors.get(cursor_id)
+        entry['page'] = 0
+    else:
+        cursor_id = state['id']
+        entry = await held_cursors.get(cursor_id)
+        if entry['table_name'] != table_name or entry['page'] != state['page']:
+            raise PageTokenError("Page token does not match the current position of its cursor.")
+
+    async with entry['lock']:
+        def _fetch():
+            wanted = page_size + 1 - len(entry['pending'])
+            fetched = entry['cursor'].fetchmany(wanted) if wanted > 0 else []
+            metrics.add_rows(len(fetched))
+            convert = row_converter(entry['cursor'].description, LARGE_VALUE_CHARS)
+            return RowSet(entry['columns'], entry['pending'] + list(map(convert, fetched)))
+
+        rows = await run_on_connection(entry['connection'], _fetch, "fetch")
+        text, shown, more_rows = _format_page(rows, page_size, output_format)
+        entry['pending'] = rows.rows[shown:]
+        entry['page'] += 1
+
+    if not more_rows:
+        await held_cursors.close(cursor_id)
+        return text, None
+    return text, encode_page_token({"mode": "cursor", "table": table_name, "id": cursor_id, "page": entry['page']})
+
+
+@mcp.tool()
+@metrics.tool
+async def query_table_page_tool(
+    conn_id: str,
+    table_name: str,
+    page_size: int = 10,
+    page_token: str = None,
+    output_format: str = "vertical",
+) -> str:
+    """Page through all rows of a table
+    
+    Tables with a primary key are paged by key (WHERE key > last key ORDER BY key),
+    so every page costs the same however deep into the table it is. Tables without
+    a key are paged through a cursor held open on the server for a limited time.
+    
+    Args:
+        conn_id: Connection ID (filename of database)
+        table_name: Name of the table to page through
+        page_size: Rows per page (default: 10)
+        page_token: Token returned by the previous call; omit to get the first page
+        output_format: "vertical", "table", "csv", "markdown" or "jsonl"
+    
+    Returns:
+        Formatted rows of the page and, if more rows exist, the token for the next page
+    """
+    if not await connection_ready(conn_id):
+        return f"Connection {conn_id} not found. Use the 'connect' tool first."
+    if output_format not in OUTPUT_FORMATS:
+        return f"Error: Unknown output_format '{output_format}'. Use one of: {', '.join(OUTPUT_FORMATS)}"
+
+    page_size = max(1, page_size)
+    try:
+        state = decode_page_token(page_token) if page_token else None
+        if state is not None and state['table'] != table_name:
+            return f"Error: The page token belongs to table '{state['table']}', not '{table_name}'."
+
+        pool = connections[conn_id]['pool']
+        if state is None or state['mode'] == 'keyset':
+            schema = await get_cached_schema(conn_id, table_name)
+        if state is None and schema["primary_keys"]:
+            state = {"mode": "keyset", "table": table_name, "keys": schema["primary_keys"], "values": None}
+
+        if state is not None and state['mode'] == 'keyset':
+            async with pool.connection() as connection:
+                rows = await query_table_page(connection, table_name, page_size, state['keys'], state['values'],
+                                              schema["columns"])
+            text, shown, more_rows = _format_page(rows, page_size, output_format)
+            next_token = None
+            if more_rows:
+                last_row = {column.lower(): value for column, value in zip(rows.columns, rows.rows[shown - 1])}
+                next_token = encode_page_token({
+                    "mode": "keyset",
+                    "table": table_name,
+                    "keys": state['keys'],
+                    "values": [last_row[column.lower()] for column in state['keys']],
+                })
+        else:
+            text, next_token = await _cursor_page(conn_id, table_name, page_size, state, output_format)
+
+        if next_token:
+            return f"{text}\n\nNext page token: {next_token}"
+        return f"{text}\n\n(Last page)"
+    except PageTokenError as e:
+        return f"Error: {str(e)}"
+    except TimeoutError:
+        return timeout_message()
+    except DB_ERRORS as e:
+        return f"Database Error paging table '{table_name}': {str(e)}"
+    except Exception as e:
+        return f"Error paging table '{table_name}': {str(e)}"
+
+
+@mcp.tool()
+@metrics.tool
+async def read_cell_tool(
+    conn_id: str,
+    table_name: str,
+    column: str,
+    key: dict,
+    offset: int = 0,
+    length: int = 2000,
+    binary_format: str = "hex",
+) -> str:
+    """Read part of one cell, e.g. a long Memo or an OLE Object (attachment) value
+    
+    Query tools show such values as placeholders like <text 52311 chars, not read>
+    (query_table_tool, query_table_page_tool) or <binary 48213 bytes sha256:3f2a9c1b2d4e>
+    (other queries, which read the value); this reads them a range at a time. Only
+    the range is transferred where the database can slice the value.
+    
+    Args:
+        conn_id: Connection ID (filename of database)
+        table_name: Table holding the cell
+        column: Column of the cell
+        key: Values identifying the row, normally its primary key, e.g. {"ID": 42}
+        offset: First character (byte for binary columns) to read, from 0
+        length: Characters (bytes) to read (default: 2000, limited by the output size)
+        binary_format: How binary data is shown: "hex" (default) or "base64"
+    
+    Returns:
+        The range of the value, its position in the whole value and the offset of the next range
+    """
+    if not await connection_ready(conn_id):
+        return f"Connection {conn_id} not found. Use the 'connect' tool first."
+    if binary_format not in ("hex", "base64"):
+        return f"Error: Unknown binary_format '{binary_format}'. Use \"hex\" or \"base64\"."
+
+    try:
+        offset = max(0, offset)
+        # Stay within the output budget: hex doubles binary data and base64 adds a third
+        limit = {"hex": EXECUTE_QUERY_MAX_CHARS // 2, "base64": EXECUTE_QUERY_MAX_CHARS * 3 // 4}[binary_format]
+        cell = await read_cell(conn_id, table_name, column, key, offset, max(1, min(length, EXECUTE_QUERY_MAX_CHARS)))
+        if cell["binary"] and cell["value"] is not None and len(cell["value"]) > limit:
+            cell["value"] = cell["value"][:limit]
+        where = ", ".join(f"{name}={value!r}" for name, value in key.items())
+        if cell["value"] is None:
+            return f"{table_name}.{cell['column']} where {where} is NULL."
+        unit = "bytes" if cell["binary"] else "characters"
+        end = offset + len(cell["value"])
+        if not cell["value"]:
+            return f"{table_name}.{cell['column']} where {where} has {cell['total']} {unit}; nothing at offset {offset}."
+        if cell["binary"]:
+            text = cell["value"].hex() if binary_format == "hex" else base64.b64encode(cell["value"]).decode("ascii")
+        else:
+            text = cell["value"]
+        header = f"{table_name}.{cell['column']} where {where}: {unit} {offset}-{end - 1} of {cell['total']}"
+        if cell["binary"]:
+            header += f" ({binary_format})"
+        output = f"{header}\n\n{text}"
+        if end < cell["total"]:
+            output += f"\n\nNext: read_cell_tool(..., offset={end})"
+        return output
+    except ValueError as e:
+        return f"Error: {str(e)}"
+    except TimeoutError:
+        return timeout_message()
+    except DB_ERRORS as e:
+        return f"Database Error reading {table_name}.{column}: {str(e)}"
+    except Exception as e:
+        return f"Error reading {table_name}.{column}: {str(e)}"
+
+
 @mcp.tool()
-async def execute_sql_tool(conn_id: str, sql_query: str) -> str:
+@metrics.tool
+async def execute_sql_tool(
+    conn_id: str,
+    sql_query: str,
+    params: list = None,
+    count_rows: bool = False,
+    output_format: str = "vertical",
+    timeout: float = None,
+    use_mirror: bool = True,
+) -> str:
     """Execute a custom SQL query
     
+    Pass values as params bound to ? placeholders instead of writing them into the
+    SQL text: quoting is then handled by the driver, and running the same statement
+    again with other values reuses its prepared form.
+    
     Args:
         conn_id: Connection ID (filename of database)
-        sql_query: SQL query to execute
+        sql_query: SQL query to execute, optionally with ? placeholders
+        params: Values for the ? placeholders, in order
+        count_rows: If True, count all result rows even though only the first few are
+            displayed (rows beyond the display are counted, not transferred into memory)
+        output_format: "vertical" (one line per field), or the more compact "table",
+            "csv", "markdown" or "jsonl"
+        timeout: Seconds after which the query is cancelled (default: QUERY_TIMEOUT; 0 for no limit)
+        use_mirror: If True, read-only queries over tables copied by mirror_tool run
+            against the local mirror while it is fresh
     
     Returns:
         Formatted query results or command results
     """
-    if conn_id not in connections:
+    if not await connection_ready(conn_id):
         return f"Connection {conn_id} not found. Use the 'connect' tool first."
+    if output_format not in OUTPUT_FORMATS:
+        return f"Error: Unknown output_format '{output_format}'. Use one of: {', '.join(OUTPUT_FORMATS)}"
         
     is_readonly = not connections[conn_id]['writable']
     is_select_query = sql_query.strip().lower().startswith('select')
@@ -491,8 +1951,12 @@ async def execute_sql_tool(conn_id: str, sql_query: str) -> str:
         return f"Error: Cannot execute modification SQL ('{sql_query[:50]}...') on a ReadOnly connection. Reconnect with writable=True."
 
     try:
-        connection = connections[conn_id]['conn'] # Access connection object
-        result_dict = await execute_sql(connection, sql_query)
+        # Only materialize everything when the full result set is spilled to a file
+        spill = bool(CLAUDE_FILES_PATH)
+        result_dict = await run_sql(
+            conn_id, sql_query, max_rows=None if spill else DISPLAY_ROWS, count_rows=count_rows, params=params,
+            timeout=timeout, use_mirror=use_mirror,
+        )
         
         # Handle results or errors from execute_sql
         if isinstance(result_dict, str): # execute_sql returned an error string
@@ -512,38 +1976,504 @@ async def execute_sql_tool(conn_id: str, sql_query: str) -> str:
              return f"Command executed, returned no data (as expected for non-SELECT)."
         
         # Format SELECT results
-        row_displayed = 10  # Maximum rows to display inline
-        formatted_output = format_results(data[:row_displayed], max_chars=EXECUTE_QUERY_MAX_CHARS)
+        row_displayed = DISPLAY_ROWS  # Maximum rows to display inline
+        formatted_output, _ = format_results(data[:row_displayed], EXECUTE_QUERY_MAX_CHARS, output_format)
+        row_count = result_dict.get('row_count')
+        more_rows = result_dict.get('more_rows') or len(data) > row_displayed
         
         # Add message about displayed rows
-        if len(data) > row_displayed:
-            formatted_output += f"\n... Displaying first {row_displayed} of {len(data)} rows retrieved."
+        if more_rows and row_count is not None:
+            formatted_output += f"\n... Displaying first {row_displayed} of {row_count} rows retrieved."
+        elif more_rows:
+            formatted_output += (f"\n... Displaying first {row_displayed} rows; remaining rows were not fetched"
+                                 " (set count_rows=True to count them).")
+        if result_dict.get('source') == "mirror":
+            formatted_output += "\n(Served from the local mirror; pass use_mirror=False to query the database.)"
             
         # For large result sets, save them for Claude
-        if len(data) > row_displayed and CLAUDE_FILES_PATH:
+        if len(data) > row_displayed and spill:
             claude_link = save_results_for_claude(data)
             formatted_output += claude_link
             
         return formatted_output
-    except pyodbc.Error as e:
-        error_msg = str(e)
-        # Check if it's a known read-only error
-        if is_readonly and ('Update locks invalid' in error_msg or 'Operation must use an updateable query' in error_msg):
-             return f"Database Error: Cannot execute SQL because the connection is ReadOnly. Reconnect with writable=True if modification is needed. Original error: {error_msg}"
-        # Add helpful suggestions based on common errors (copied from original)
-        suggestions = ""
-        if "syntax error" in error_msg.lower():
-            suggestions = "\nPossible fix: Check your SQL syntax for errors."
-        elif "no such table" in error_msg.lower() or "invalid object name" in error_msg.lower():
-            suggestions = "\nPossible fix: Verify the table name exists."
-        elif "ambiguous column name" in error_msg.lower():
-            suggestions = "\nPossible fix: Fully qualify column names with table names."
-        return f"SQL Error: {error_msg}{suggestions}"
+    except TimeoutError:
+        return timeout_message(timeout)
+    except DB_ERRORS as e:
+        return format_sql_error(str(e), is_readonly)
     except Exception as e:
         return f"Error executing query: {str(e)}"
 
 
 @mcp.tool()
+@metrics.tool
+async def bulk_insert_tool(
+    conn_id: str,
+    table_name: str,
+    data: str = None,
+    file_path: str = None,
+    data_format: str = "auto",
+    columns: list[str] = None,
+    batch_size: int = None,
+) -> str:
+    """Insert many rows into a table using parameterized batches
+    
+    Requires a writable connection. Rows are committed every batch_size rows, so
+    on error the rows of earlier batches stay inserted.
+    
+    Args:
+        conn_id: Connection ID (filename of database)
+        table_name: Name of the table to insert into
+        data: Inline rows as a JSON array, CSV text (header row first) or NDJSON
+        file_path: Path to a .json, .csv, .ndjson or .jsonl file with the rows (instead of data)
+        data_format: "json", "csv", "ndjson" or "auto" to detect from the file extension or data
+        columns: Column names, needed when rows are given as arrays (or for CSV without a header)
+        batch_size: Rows per executemany batch and commit (default: BULK_INSERT_BATCH_SIZE)
+    
+    Returns:
+        The number of rows inserted and the insert rate
+    """
+    if not await connection_ready(conn_id):
+        return f"Connection {conn_id} not found. Use the 'connect' tool first."
+    if not connections[conn_id]['writable']:
+        return "Error: Cannot insert rows on a ReadOnly connection. Reconnect with writable=True."
+    if (data is None) == (file_path is None):
+        return "Error: Pass exactly one of data or file_path."
+
+    progress = {"rows_inserted": 0}
+    try:
+        if data_format == "auto":
+            data_format = detect_format(data, file_path)
+        source = open(file_path, newline='', encoding='utf-8') if file_path else data
+        try:
+            columns, rows = read_rows(source, data_format, columns)
+            if not columns:
+                return "No rows to insert."
+            async with connections[conn_id]['pool'].connection() as connection:
+                result = await bulk_insert(connection, table_name, columns, rows, batch_size, progress)
+        finally:
+            if file_path:
+                source.close()
+        mode = "fast_executemany" if result["fast_executemany"] else "executemany"
+        return (f"Inserted {result['rows_inserted']} rows into '{table_name}' in {result['seconds']:.2f}s "
+                f"({result['rows_per_second']:.0f} rows/sec, {mode}).")
+    except DB_ERRORS as e:
+        return (f"{format_sql_error(str(e), False)}\n"
+                f"{progress['rows_inserted']} rows were committed before the error.")
+    except Exception as e:
+        return f"Error inserting rows into '{table_name}': {str(e)}. {progress['rows_inserted']} rows were committed."
+    finally:
+        if progress["rows_inserted"]:
+            # Drop cached results of the table we just wrote to
+            note_sql_executed(conn_id, f"INSERT INTO {quote_identifier(table_name)}")
+
+
+@mcp.tool()
+@metrics.tool
+async def execute_batch_tool(
+    conn_id: str,
+    statements: list[str] = None,
+    sql_query: str = None,
+    param_sets: list[list] = None,
+    output_format: str = "vertical",
+    timeout: float = None,
+) -> str:
+    """Execute many SQL statements in a single call
+    
+    Consecutive SELECT statements run concurrently on pooled connections. Any other
+    statement runs alone, after the statements listed before it and before those
+    listed after it. The results share one output budget (EXECUTE_QUERY_MAX_CHARS)
+    and show at most the first few rows of each query.
+    
+    Args:
+        conn_id: Connection ID (filename of database)
+        statements: List of SQL statements to execute
+        sql_query: A single SQL statement with ? placeholders, executed once per parameter set
+        param_sets: List of parameter lists for sql_query
+        output_format: "vertical", "table", "csv", "markdown" or "jsonl"
+        timeout: Seconds after which each statement is cancelled (default: QUERY_TIMEOUT; 0 for no limit)
+    
+    Returns:
+        Formatted results for each statement, in order
+    """
+    if not await connection_ready(conn_id):
+        return f"Connection {conn_id} not found. Use the 'connect' tool first."
+    if output_format not in OUTPUT_FORMATS:
+        return f"Error: Unknown output_format '{output_format}'. Use one of: {', '.join(OUTPUT_FORMATS)}"
+
+    if statements and sql_query:
+        return "Error: Pass either statements or sql_query with param_sets, not both."
+    if statements:
+        batch = [(statement, None) for statement in statements]
+    elif sql_query:
+        batch = [(sql_query, list(params)) for params in (param_sets or [[]])]
+    else:
+        return "Error: No statements given."
+
+    is_readonly = not connections[conn_id]['writable']
+    if is_readonly:
+        for index, (statement, _) in enumerate(batch, 1):
+            if not statement.strip().lower().startswith('select'):
+                return f"Error: Cannot execute modification SQL in statement {index} ('{statement[:50]}...') on a ReadOnly connection. Reconnect with writable=True."
+
+    results = [None] * len(batch)
+    # Don't queue more statements on the pool than it can serve at once
+    limiter = anyio.CapacityLimiter(connections[conn_id]['pool'].max_size)
+
+    async def _run(index):
+        statement, params = batch[index]
+        async with limiter:
+            try:
+                results[index] = await run_sql(conn_id, statement, max_rows=DISPLAY_ROWS, params=params,
+                                               timeout=timeout)
+            except TimeoutError:
+                results[index] = timeout_message(timeout)
+            except DB_ERRORS as e:
+                results[index] = format_sql_error(str(e), is_readonly)
+            except Exception as e:
+                results[index] = f"Error executing query: {str(e)}"
+
+    index = 0
+    while index < len(batch):
+        if not is_read_query(batch[index][0]):
+            # Writes act as barriers between groups of concurrent reads
+            await _run(index)
+            index += 1
+            continue
+        end = index
+        while end < len(batch) and is_read_query(batch[end][0]):
+            end += 1
+        async with anyio.create_task_group() as tg:
+            for read_index in range(index, end):
+                tg.start_soon(_run, read_index)
+        index = end
+
+    # Share the output budget between the statements still to be shown
+    budget = EXECUTE_QUERY_MAX_CHARS
+    output = []
+    for index, result in enumerate(results):
+        statement, params = batch[index]
+        header = f"--- Statement {index + 1}: {statement[:80]}"
+        if params:
+            header += f" with params {params}"
+        output.append(header)
+        if isinstance(result, str):
+            body = result
+        elif result['result_type'] == 'command':
+            body = f"Command executed successfully. Rows affected: {result['rows_affected']}"
+        elif not result['data']:
+            body = "Query executed successfully, but returned no results."
+        else:
+            share = budget // (len(results) - index)
+            if share <= 0:
+                body = "(output budget exhausted; rows not shown)"
+            else:
+                body, _ = format_results(result['data'], share, output_format)
+                if result.get('more_rows'):
+                    body += " (more rows not fetched)"
+        budget = max(0, budget - len(body))
+        output.append(body)
+
+    return "\n".join(output)
+
+
+@mcp.tool()
+@metrics.tool
+async def submit_query_tool(
+    conn_id: str,
+    sql_query: str,
+    params: list = None,
+    priority: int = 1,
+    timeout: float = 0,
+) -> str:
+    """Start a long-running SELECT query in the background and return a job ID at once
+    
+    The query runs on the server's job workers (JOB_WORKERS at a time) while other
+    tools keep working. Its rows are written to a file as they are fetched, so
+    results of any size can be read page by page. Poll job_status_tool for
+    progress and read the rows with fetch_job_result_tool.
+    
+    Args:
+        conn_id: Connection ID (filename of database)
+        sql_query: SELECT query to run, optionally with ? placeholders
+        params: Values for the ? placeholders, in order
+        priority: Queued jobs with a lower value start first (default: 1; use 0 for urgent jobs)
+        timeout: Seconds after which the query is cancelled (default: 0, no limit)
+    
+    Returns:
+        The job ID
+    """
+    if not await connection_ready(conn_id):
+        return f"Connection {conn_id} not found. Use the 'connect' tool first."
+    if not is_read_query(sql_query):
+        return "Error: Only SELECT queries can run as jobs. Use execute_sql_tool for other statements."
+
+    try:
+        job = jobs.submit(conn_id, sql_query, params, priority,
+                          lambda job: run_query_job(job, timeout))
+        position = sum(1 for other in jobs.jobs.values() if other.status == "queued" and other is not job)
+        return (f"Submitted {job.id} (priority {priority}, {position} other jobs queued). "
+                f"Check it with job_status_tool(job_id=\"{job.id}\").")
+    except Exception as e:
+        return f"Error submitting query: {str(e)}"
+
+
+@mcp.tool()
+@metrics.tool
+async def job_status_tool(job_id: str = None, conn_id: str = None, cancel: bool = False) -> str:
+    """Show the progress of background query jobs, or cancel one
+    
+    Args:
+        job_id: Job to show (or cancel); omit to list all jobs
+        conn_id: When listing, only show the jobs of this connection
+        cancel: If True, cancel the job (a running query is stopped through the driver)
+    
+    Returns:
+        The job's status, rows fetched so far and elapsed time, or a table of all jobs
+    """
+    if job_id is None:
+        if cancel:
+            return "Error: Pass the job_id of the job to cancel."
+        rows = [job.summary() for job in jobs.jobs.values() if not conn_id or job.conn_id == conn_id]
+        if not rows:
+            return "No jobs."
+        return format_rows(rows, "table", EXECUTE_QUERY_MAX_CHARS).text
+    job = jobs.jobs.get(job_id)
+    if job is None:
+        return f"Error: Job {job_id} not found (finished jobs are kept for the last {JOB_HISTORY} jobs)."
+
+    if cancel:
+        if not jobs.cancel(job_id):
+            return f"Job {job_id} already finished ({job.status})."
+        if job.status == "cancelled":
+            return f"Job {job_id} cancelled."
+        return f"Cancelling job {job_id}; it stops as soon as the driver returns."
+
+    output = [f"Job {job.id} on {job.conn_id}: {job.status}",
+              f"Query: {job.sql[:200]}",
+              f"Rows fetched: {job.rows}"]
+    if job.started is not None:
+        output.append(f"Elapsed: {job.elapsed():.2f}s")
+    else:
+        queued = [other for other in jobs.jobs.values() if other.status == "queued"]
+        ahead = sum(1 for other in queued if (other.priority, other.submitted) < (job.priority, job.submitted))
+        output.append(f"Queued behind {ahead} jobs")
+    if job.error:
+        output.append(f"Error: {job.error}")
+    if job.status == "done":
+        output.append(f"Result file: {job.result.path} (JSON lines: the first line is an array of the"
+                      f" column names, each further line an array of one row's values in that order)")
+        output.append(f"Read the rows with fetch_job_result_tool(job_id=\"{job.id}\").")
+    return "\n".join(output)
+
+
+@mcp.tool()
+@metrics.tool
+async def fetch_job_result_tool(
+    job_id: str,
+    offset: int = 0,
+    limit: int = 10,
+    output_format: str = "vertical",
+) -> str:
+    """Read rows of a finished background query job
+    
+    Args:
+        job_id: Job ID returned by submit_query_tool
+        offset: Number of rows to skip (default: 0)
+        limit: Number of rows to show (default: 10)
+        output_format: "vertical" (one line per field), or the more compact "table",
+            "csv", "markdown" or "jsonl"
+    
+    Returns:
+        Formatted rows and the offset of the next rows, if any
+    """
+    if output_format not in OUTPUT_FORMATS:
+        return f"Error: Unknown output_format '{output_format}'. Use one of: {', '.join(OUTPUT_FORMATS)}"
+    job = jobs.jobs.get(job_id)
+    if job is None:
+        return f"Error: Job {job_id} not found (finished jobs are kept for the last {JOB_HISTORY} jobs)."
+    if job.status not in FINISHED:
+        return f"Job {job_id} is {job.status} ({job.rows} rows fetched so far). Try again later."
+    if job.status != "done":
+        return f"Error: Job {job_id} {job.status}" + (f": {job.error}" if job.error else ".")
+
+    try:
+        offset = max(0, offset)
+        rows = await anyio.to_thread.run_sync(job.result.read, offset, max(1, limit))
+        if not rows:
+            return f"Job {job_id} returned {job.result.rows} rows; none at offset {offset}."
+        text, shown = format_results(rows, EXECUTE_QUERY_MAX_CHARS, output_format)
+        if rows and shown == 0:
+            # Always make progress, even if a single row exceeds the output budget
+            text, shown = format_results(rows[:1], sys.maxsize, output_format)
+        end = offset + shown
+        text += f"\nRows {offset + 1}-{end} of {job.result.rows}."
+        if end < job.result.rows:
+            text += f" Next: fetch_job_result_tool(job_id=\"{job_id}\", offset={end})"
+        return text
+    except Exception as e:
+        return f"Error reading result of job {job_id}: {str(e)}"
+
+
+@mcp.tool()
+@metrics.tool
+async def export_tool(
+    conn_id: str,
+    table_name: str = None,
+    sql_query: str = None,
+    file_path: str = None,
+    export_format: str = "csv",
+    params: list = None,
+    timeout: float = 0,
+) -> str:
+    """Export a table or the result of a SELECT query to a CSV, NDJSON or Parquet file
+    
+    Rows are streamed from the driver to the file in FETCH_BATCH_SIZE batches, so
+    memory use does not depend on the size of the table.
+    
+    Args:
+        conn_id: Connection ID (filename of database)
+        table_name: Table to export (or pass sql_query)
+        sql_query: SELECT query whose result to export, optionally with ? placeholders
+        file_path: File to write (default: EXPORT_PATH/<database>/<table or "query">.<format>)
+        export_format: "csv" (default), "ndjson" or "parquet" (requires pyarrow)
+        params: Values for the ? placeholders of sql_query
+        timeout: Seconds after which the export is cancelled (default: 0, no limit)
+    
+    Returns:
+        The file written, its row count, size and SHA-256 checksum
+    """
+    if not await connection_ready(conn_id):
+        return f"Connection {conn_id} not found. Use the 'connect' tool first."
+    if export_format not in EXPORT_FORMATS:
+        return f"Error: Unknown export_format '{export_format}'. Use one of: {', '.join(EXPORT_FORMATS)}"
+    if (table_name is None) == (sql_query is None):
+        return "Error: Pass exactly one of table_name or sql_query."
+    if sql_query is not None and not is_read_query(sql_query):
+        return "Error: Only SELECT queries can be exported."
+
+    try:
+        if table_name is not None:
+            sql_query = f"SELECT * FROM {quote_identifier(table_name)}"
+        if not file_path:
+            file_path = os.path.join(EXPORT_PATH, os.path.splitext(conn_id)[0],
+                                     export_file_name(table_name or "query", export_format))
+        result = await export_query(conn_id, sql_query, file_path, export_format, params, timeout)
+        rate = result["rows"] / result["seconds"] if result["seconds"] > 0 else 0.0
+        return (f"Exported {result['rows']} rows to {result['path']} ({result['bytes']} bytes, "
+                f"{result['seconds']:.2f}s, {rate:.0f} rows/sec)\nSHA-256: {result['sha256']}")
+    except TimeoutError:
+        return timeout_message(timeout)
+    except DB_ERRORS as e:
+        return format_sql_error(str(e), not connections[conn_id]['writable'])
+    except Exception as e:
+        return f"Error exporting: {str(e)}"
+
+
+@mcp.tool()
+@metrics.tool
+async def export_database_tool(
+    conn_id: str,
+    directory: str = None,
+    export_format: str = "csv",
+    tables: list[str] = None,
+    workers: int = None,
+) -> str:
+    """Export every table of the database to files, several tables at once
+    
+    Each table is streamed to its own file like export_tool does. A manifest.json
+    listing every file with its row count, size and SHA-256 checksum is written
+    next to them. System (MSys) tables are skipped.
+    
+    Args:
+        conn_id: Connection ID (filename of database)
+        directory: Directory for the files (default: EXPORT_PATH/<database>)
+        export_format: "csv" (default), "ndjson" or "parquet" (requires pyarrow)
+        tables: Only export these tables (default: all tables)
+        workers: Tables exported at once (default: EXPORT_WORKERS, at most the connection pool size)
+    
+    Returns:
+        One line per table with its row count, size and time, and the manifest path
+    """
+    if not await connection_ready(conn_id):
+        return f"Connection {conn_id} not found. Use the 'connect' tool first."
+    if export_format not in EXPORT_FORMATS:
+        return f"Error: Unknown export_format '{export_format}'. Use one of: {', '.join(EXPORT_FORMATS)}"
+
+    try:
+        catalog_tables = [name for name in (await get_catalog(conn_id))["tables"] if not name.startswith("MSys")]
+        if tables:
+            by_name = {name.lower(): name for name in catalog_tables}
+            missing = [table for table in tables if table.strip("[]").lower() not in by_name]
+            if missing:
+                return f"Error: Table(s) not found in {conn_id}: {', '.join(missing)}"
+            catalog_tables = [by_name[table.strip("[]").lower()] for table in tables]
+        directory = directory or os.path.join(EXPORT_PATH, os.path.splitext(conn_id)[0])
+        os.makedirs(directory, exist_ok=True)
+
+        started = time.perf_counter()
+        results = {}
+        file_names = {}
+        for table_name in catalog_tables:
+            # Distinct tables may map to the same file name once unsafe characters are replaced
+            name = export_file_name(table_name, export_format)
+            while name.lower() in (used.lower() for used in file_names.values()):
+                stem, extension = os.path.splitext(name)
+                name = f"{stem}_{extension}"
+            file_names[table_name] = name
+        limiter = anyio.CapacityLimiter(max(1, min(workers or EXPORT_WORKERS, connections[conn_id]['pool'].max_size)))
+
+        async def _export(table_name):
+            async with limiter:
+                path = os.path.join(directory, file_names[table_name])
+                try:
+                    results[table_name] = await export_query(
+                        conn_id, f"SELECT * FROM {quote_identifier(table_name)}", path, export_format
+                    )
+                except Exception as e:
+                    results[table_name] = {"error": str(e) or type(e).__name__}
+
+        async with anyio.create_task_group() as tg:
+            for table_name in catalog_tables:
+                tg.start_soon(_export, table_name)
+        elapsed = time.perf_counter() - started
+
+        manifest = {
+            "database": connections[conn_id]['db_path'],
+            "exported_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "format": export_format,
+            "tables": [],
+        }
+        lines = []
+        for table_name in catalog_tables:
+            result = results[table_name]
+            if "error" in result:
+                manifest["tables"].append({"table": table_name, "error": result["error"]})
+                lines.append({"table": table_name, "rows": "", "bytes": "", "seconds": "",
+                              "error": result["error"]})
+                continue
+            manifest["tables"].append({
+                "table": table_name, "file": file_names[table_name], "rows": result["rows"],
+                "bytes": result["bytes"], "sha256": result["sha256"],
+            })
+            lines.append({"table": table_name, "rows": result["rows"], "bytes": result["bytes"],
+                          "seconds": round(result["seconds"], 2), "error": ""})
+        manifest_path = os.path.join(directory, "manifest.json")
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+
+        failed = sum(1 for result in results.values() if "error" in result)
+        header = (f"Exported {len(catalog_tables) - failed} of {len(catalog_tables)} tables of {conn_id} "
+                  f"to {directory} in {elapsed:.2f}s ({limiter.total_tokens} at a time)\n"
+                  f"Manifest: {manifest_path}\n\n")
+        return header + format_rows(lines, "table", EXECUTE_QUERY_MAX_CHARS).text
+    except DB_ERRORS as e:
+        return f"Database Error exporting database: {str(e)}"
+    except Exception as e:
+        return f"Error exporting database: {str(e)}"
+
+
+@mcp.tool()
+@metrics.tool
 async def get_table_schema_tool(conn_id: str, table_name: str) -> str:
     """Get the schema of a specific table
     
@@ -554,12 +2484,11 @@ async def get_table_schema_tool(conn_id: str, table_name: str) -> str:
     Returns:
         Formatted schema information
     """
-    if conn_id not in connections:
+    if not await connection_ready(conn_id):
         return f"Connection {conn_id} not found. Use the 'connect' tool first."
     
     try:
-        connection = connections[conn_id]['conn'] # Access connection object
-        schema_info = await get_extended_schema(connection, table_name)
+        schema_info = await get_cached_schema(conn_id, table_name)
         
         # Format the schema information in a readable way
         output = [f"Schema for table '{table_name}' (Connection: {conn_id}, Mode: {'Writable' if connections[conn_id]['writable'] else 'ReadOnly'}):"]
@@ -594,13 +2523,280 @@ async def get_table_schema_tool(conn_id: str, table_name: str) -> str:
             output.append("\nINDEXES: (None found)")
 
         return "\n".join(output)
-    except pyodbc.Error as e:
+    except DB_ERRORS as e:
         return f"Database Error getting schema for '{table_name}': {str(e)}"
     except Exception as e:
         return f"Error getting table schema for '{table_name}': {str(e)}"
 
 
 @mcp.tool()
+@metrics.tool
+async def describe_database_tool(conn_id: str, refresh: bool = False, full: bool = False) -> str:
+    """Describe the columns, primary keys and indexes of every table in the database
+    
+    Tables are described concurrently over the connection pool. The result is saved
+    as a JSON schema snapshot and reused (also after a server restart) until the
+    database file changes.
+    
+    Args:
+        conn_id: Connection ID (filename of database)
+        refresh: If True, crawl the database again even if a snapshot is current
+        full: If True, show every table. Otherwise output is limited to EXECUTE_QUERY_MAX_CHARS.
+    
+    Returns:
+        One line per table with its columns ([PK] marks primary keys) and indexes
+    """
+    if not await connection_ready(conn_id):
+        return f"Connection {conn_id} not found. Use the 'connect' tool first."
+
+    try:
+        started = time.perf_counter()
+        tables, from_snapshot, snapshot_path = await describe_database(conn_id, refresh)
+        elapsed = time.perf_counter() - started
+
+        source = "schema snapshot" if from_snapshot else f"crawl in {elapsed:.2f}s"
+        header = f"Schema of {conn_id}: {len(tables)} tables (from {source})"
+        if snapshot_path:
+            header += f"\nSnapshot file: {snapshot_path}"
+        output = [header, ""]
+        size = len(header)
+        for shown, (table_name, schema) in enumerate(tables.items()):
+            line = format_schema_line(table_name, schema)
+            size += len(line) + 1
+            if not full and size > EXECUTE_QUERY_MAX_CHARS:
+                output.append(f"... ({len(tables) - shown} more tables. Set full=True to see all"
+                              " or read the snapshot file.)")
+                break
+            output.append(line)
+        return "\n".join(output)
+    except DB_ERRORS as e:
+        return f"Database Error describing database: {str(e)}"
+    except Exception as e:
+        return f"Error describing database: {str(e)}"
+
+
+def _stats_table(rows: list[dict]) -> str:
+    return format_rows(rows, "table").text if rows else "(none)\n"
+
+
+@mcp.tool()
+@metrics.tool
+async def profile_table_tool(conn_id: str, table_name: str, output_format: str = "table") -> str:
+    """Profile every column of a table with one aggregate query
+    
+    Computes the row count and, per column, the non-null count, null percentage,
+    minimum, maximum, mean (numeric columns) and distinct count in a single scan
+    on the database server. Distinct counts need COUNT(DISTINCT), which Access
+    lacks; there they are only shown for primary and unique key columns (or when
+    the table is served from a fresh mirror_tool copy). Profiles are cached until
+    the database file changes.
+    
+    Args:
+        conn_id: Connection ID (filename of database)
+        table_name: Name of the table to profile
+        output_format: "table" (default), "vertical", "csv", "markdown" or "jsonl"
+    
+    Returns:
+        One line per column with its statistics
+    """
+    if not await connection_ready(conn_id):
+        return f"Connection {conn_id} not found. Use the 'connect' tool first."
+    if output_format not in OUTPUT_FORMATS:
+        return f"Error: Unknown output_format '{output_format}'. Use one of: {', '.join(OUTPUT_FORMATS)}"
+
+    try:
+        profile, cached = await profile_table(conn_id, table_name)
+        rows = profile["rows"]
+        lines = []
+        for column in profile["columns"]:
+            non_null = column.get("non_null", 0)
+            lines.append({
+                "column": column["name"],
+                "type": column["type"],
+                "non_null": non_null,
+                "null_pct": round(100.0 * (rows - non_null) / rows, 1) if rows else 0.0,
+                "distinct": column.get("distinct", "n/a"),
+                "min": column.get("min"),
+                "max": column.get("max"),
+                "mean": round(column["mean"], 4) if isinstance(column.get("mean"), float) else column.get("mean"),
+            })
+        when = "cached" if cached else f"computed in {profile['seconds']:.2f}s"
+        header = f"Profile of '{table_name}': {rows} rows ({when} from the {profile['source']})\n\n"
+        return header + format_rows(lines, output_format, EXECUTE_QUERY_MAX_CHARS).text
+    except TimeoutError:
+        return timeout_message()
+    except DB_ERRORS as e:
+        return f"Database Error profiling table '{table_name}': {str(e)}"
+    except Exception as e:
+        return f"Error profiling table '{table_name}': {str(e)}"
+
+
+@mcp.tool()
+@metrics.tool
+async def mirror_tool(conn_id: str, tables: list[str] = None, full_refresh: bool = False) -> str:
+    """Copy tables into a local SQLite mirror, or bring mirrored tables up to date
+    
+    Read-only queries through execute_sql_tool that only use mirrored tables run
+    against the mirror while the database file is unchanged since the last sync,
+    which makes aggregations over large tables much faster than through Access.
+    Syncs are incremental where possible: tables with a last-modified datetime
+    column (and a primary key) copy rows changed since the last sync, tables with
+    an AutoNumber key copy new rows, and other tables are copied in full. A table
+    whose row count no longer matches (deleted rows) is copied in full.
+    
+    Args:
+        conn_id: Connection ID (filename of database)
+        tables: Tables to mirror or sync; omit to show the state of the mirror
+        full_refresh: If True, copy the tables in full even if they could be synced incrementally
+    
+    Returns:
+        What was copied per table, or the mirrored tables and whether they are fresh
+    """
+    if not await connection_ready(conn_id):
+        return f"Connection {conn_id} not found. Use the 'connect' tool first."
+
+    info = connections[conn_id]
+    mirror = info['mirror']
+    try:
+        if not tables:
+            if not mirror.tables:
+                return f"No tables of {conn_id} are mirrored yet. Pass tables=[...] to mirror them."
+            signature = file_signature(info['db_path'])
+            rows = [
+                {"table": table["table"], "sync": table["mode"], "rows": table["rows"],
+                 "synced_at": table["synced_at"],
+                 "fresh": "yes" if mirror.is_fresh([table["table"]], signature, MIRROR_MAX_AGE) else "no"}
+                for table in mirror.tables.values()
+            ]
+            return f"Mirror of {conn_id}: {mirror.path}\n\n" + format_rows(rows, "table").text
+
+        catalog_tables = {name.lower(): name for name in (await get_catalog(conn_id))["tables"]}
+        names = []
+        for table_name in tables:
+            name = catalog_tables.get(table_name.strip("[]").lower())
+            if name is None:
+                return f"Error: Table '{table_name}' not found in {conn_id}."
+            if name.startswith("MSys"):
+                return f"Error: System table '{name}' cannot be mirrored."
+            names.append(name)
+
+        output = [f"Mirror of {conn_id}: {mirror.path}"]
+        async with mirror.lock:
+            for table_name in names:
+                try:
+                    schema = await get_cached_schema(conn_id, table_name)
+                    # Taken before copying, so changes made during the copy leave the table stale
+                    signature = file_signature(info['db_path'])
+
+                    def _sync(cursor):
+                        with metrics.timed("fetch"):
+                            result = mirror.sync_table(cursor, table_name, schema, signature,
+                                                       full_refresh, FETCH_BATCH_SIZE)
+                        metrics.add_rows(result["rows_copied"])
+                        return result
+
+                    async with info['pool'].connection() as connection:
+                        result = await run_statement(connection, _sync, timeout=0)
+                    how = "copied in full" if result["full_copy"] else f"synced by {result['mode']}"
+                    output.append(f"{table_name}: {how}, {result['rows_copied']} rows copied, "
+                                  f"{result['rows']} rows in mirror ({result['seconds']:.2f}s)")
+                except DB_ERRORS as e:
+                    output.append(f"{table_name}: Database Error: {str(e)}")
+        return "\n".join(output)
+    except DB_ERRORS as e:
+        return f"Database Error mirroring tables: {str(e)}"
+    except Exception as e:
+        return f"Error mirroring tables: {str(e)}"
+
+
+@mcp.tool()
+@metrics.tool
+async def server_stats(conn_id: str = None, reset: bool = False) -> str:
+    """Show latency, row and byte statistics of the tool calls served so far
+    
+    Latencies are estimated from histograms (bucket upper bounds), so percentiles
+    are accurate to within a factor of two. Tool calls are listed slowest first
+    by total time, followed by where that time went (stages), the slowest SQL
+    statements, and the state of the connection pools, the driver call executor
+    (running and queued calls), the result cache, the prepared statement cache
+    and the background jobs.
+    
+    Args:
+        conn_id: Only show calls against this connection (default: all)
+        reset: If True, clear all statistics after showing them
+    
+    Returns:
+        Formatted statistics tables
+    """
+    snapshot = metrics.snapshot()
+    histograms = snapshot["histograms"]
+
+    calls = []
+    stages = []
+    for (name, labels), (count, total, maximum, p50, p95, p99) in histograms.items():
+        label_values = dict(labels)
+        if conn_id and label_values["db"] != conn_id:
+            continue
+        if name == "tool_seconds":
+            rows = histograms.get(("rows", labels), (0, 0))
+            sent = histograms.get(("bytes", labels), (0, 0))
+            calls.append({
+                "tool": label_values["tool"], "db": label_values["db"], "calls": count,
+                "errors": snapshot["errors"].get(labels, 0), "total_s": round(total, 3),
+                "p50_ms": round(p50 * 1000, 1), "p95_ms": round(p95 * 1000, 1),
+                "p99_ms": round(p99 * 1000, 1), "max_ms": round(maximum * 1000, 1),
+                "rows": int(rows[1]), "bytes": int(sent[1]),
+            })
+        elif name == "stage_seconds":
+            stages.append({
+                "tool": label_values["tool"], "db": label_values["db"], "stage": label_values["stage"],
+                "count": count, "total_s": round(total, 3),
+                "p95_ms": round(p95 * 1000, 1), "max_ms": round(maximum * 1000, 1),
+            })
+    calls.sort(key=lambda row: row["total_s"], reverse=True)
+    stages.sort(key=lambda row: row["total_s"], reverse=True)
+    slowest = [
+        {"seconds": round(seconds, 3), "db": db, "sql": sql}
+        for seconds, db, sql in snapshot["slowest"] if not conn_id or db == conn_id
+    ]
+    pool_rows = [
+        {"db": os.path.basename(path), "mode": "Writable" if writable else "ReadOnly", **pool.stats()}
+        for (path, writable), pool in pools.items()
+        if not conn_id or os.path.basename(path) == conn_id
+    ]
+
+    statement_caches = executor.locals("statements")
+    statement_rows = [{
+        "connections": len(statement_caches),
+        "cursors": sum(len(cache) for cache in statement_caches),
+        "hits": sum(cache.hits for cache in statement_caches),
+        "misses": sum(cache.misses for cache in statement_caches),
+        "evictions": sum(cache.evictions for cache in statement_caches),
+        "max_per_connection": STATEMENT_CACHE_SIZE,
+    }] if statement_caches else []
+
+    uptime = time.time() - metrics.started
+    output = [
+        f"Server stats for the last {uptime:.0f}s" + (f" (connection {conn_id})" if conn_id else ""),
+        "\nTOOL CALLS:", _stats_table(calls),
+        "STAGES:", _stats_table(stages),
+        "SLOWEST QUERIES:", _stats_table(slowest),
+        "POOLS:", _stats_table(pool_rows),
+        "EXECUTOR:", _stats_table([executor.stats()]),
+        "RESULT CACHE:", _stats_table([result_cache.stats()]),
+        "STATEMENT CACHE:", _stats_table(statement_rows),
+        "JOBS:", _stats_table([jobs.stats()]),
+    ]
+    if METRICS_FILE:
+        output.append(f"Prometheus metrics file: {METRICS_FILE} (every {METRICS_INTERVAL:g}s)")
+    if reset:
+        metrics.reset()
+        output.append("Statistics have been reset.")
+    return "\n".join(output)
+
+
+@mcp.tool()
+@metrics.tool
 async def disconnect(conn_id: str) -> str:
     """Disconnect from a database
     
@@ -610,14 +2806,18 @@ async def disconnect(conn_id: str) -> str:
     Returns:
         A message indicating success or failure
     """
-    if conn_id not in connections:
+    if not await connection_ready(conn_id):
         return f"Connection {conn_id} not found"
     
     try:
         connection_info = connections[conn_id]
-        connection = connection_info['conn']
         mode_text = "Writable" if connection_info['writable'] else "ReadOnly"
-        await anyio.to_thread.run_sync(lambda: connection.close())
+        jobs.cancel_all(conn_id)
+        await connection_info['held_cursors'].close_all()
+        await close_pool(connection_info['pool'])
+        mirror_pool = pools.get((connection_info['mirror'].path, False))
+        if mirror_pool is not None:
+            await close_pool(mirror_pool)
         del connections[conn_id]
         return f"Successfully disconnected from {conn_id} (was {mode_text} mode)"
     except Exception as e:
@@ -641,6 +2841,10 @@ def main():
     print(f"Starting MS Access Connector MCP server...", file=sys.stderr)
     print(f"Python version: {os.sys.version}", file=sys.stderr)
     print(f"Current directory: {os.getcwd()}", file=sys.stderr)
+
+    if METRICS_FILE:
+        metrics.start_writer(METRICS_FILE, METRICS_INTERVAL)
+        print(f"Writing Prometheus metrics to {METRICS_FILE} every {METRICS_INTERVAL:g}s", file=sys.stderr)
     
     # Run the server with default settings
     mcp.run()
@@ -0,0 +1,418 @@
+"""
+Database backends: MS Access over ODBC, and a SQLite stand-in for testing and benchmarking
+
+Everything that depends on the database engine (connecting, catalog and index
+metadata, column types and SQL dialect) goes through a Backend, so the tools,
+caches and pools run unchanged against either one.
+"""
+import math
+import os
+import re
+import sqlite3
+import sys
+
+try:
+    import pyodbc
+except ImportError:  # No ODBC driver manager (e.g. Linux CI); only the SQLite backend is usable
+    pyodbc = None
+
+# Exceptions raised by any backend's driver, for `except DB_ERRORS`
+DB_ERRORS = (sqlite3.Error,) + ((pyodbc.Error,) if pyodbc is not None else ())
+
+
+class Backend:
+    """Interface implemented by each database backend.
+
+    Methods taking a connection are blocking and meant to run in a worker thread.
+    """
+
+    name = "abstract"
+    # Whether COUNT(DISTINCT column) is supported (Access SQL lacks it)
+    supports_count_distinct = False
+    # Whether cursors are kept per statement to reuse their prepared statements
+    caches_statements = False
+
+    def connect(self, db_path: str, writable: bool = False):
+        """Open a DB-API connection to the database file"""
+        raise NotImplementedError
+
+    def top_query(self, limit: int, body: str) -> str:
+        """Build "SELECT <body>" returning at most limit rows; body starts after SELECT"""
+        raise NotImplementedError
+
+    def table_entries(self, connection) -> list:
+        """Return (table_name, table_type) for every table and view in the catalog"""
+        raise NotImplementedError
+
+    def linked_tables(self, connection) -> list:
+        """Return the names of linked tables (MSysObjects Type=6); raises if unavailable"""
+        raise NotImplementedError
+
+    def linked_table_sources(self, connection) -> dict:
+        """Return {linked table: (source database, source table)}; raises if unavailable"""
+        raise NotImplementedError
+
+    def table_columns(self, connection, table_name: str) -> list:
+        """Return [{"name", "type", "nullable", "size"}] for the columns of a table.
+
+        size is the declared maximum length of text and binary columns, None if
+        unbounded (Memo, OLE Object) or not applicable.
+        """
+        raise NotImplementedError
+
+    def statistics(self, connection, table_name: str) -> list:
+        """Return (index_name, column_name, non_unique) for every indexed column.
+
+        The primary key index is reported as "PrimaryKey", as Access does.
+        """
+        raise NotImplementedError
+
+    def autoincrement_columns(self, connection, table_name: str) -> list:
+        """Return columns that look like AutoNumber keys, used when no key index is found"""
+        return []
+
+    def random_order(self, column: str, seed: int) -> str:
+        """Build an ORDER BY expression shuffling rows reproducibly by seed.
+
+        column is a quoted numeric, non-null column; distinct values get
+        independent pseudo-random positions.
+        """
+        raise NotImplementedError
+
+    def length_sql(self, column: str, binary: bool = False) -> str:
+        """SQL expression for the length of a quoted column's value: characters, or bytes if binary"""
+        raise NotImplementedError
+
+    def substring_sql(self, column: str, start: int, length: int, binary: bool = False):
+        """SQL expression for length characters (bytes if binary) of a column's value from start (1-based).
+
+        Returns None if the engine cannot slice such values; they are then read whole.
+        """
+        raise NotImplementedError
+
+    def short_value_sql(self, column: str, max_chars: int) -> str:
+        """SQL expression for a text column's value if it has at most max_chars characters, else Null"""
+        raise NotImplementedError
+
+    def set_timeout(self, connection, seconds: float = None):
+        """Set the driver-side timeout for statements on connection (None: no timeout)"""
+
+    def release_cursor(self, cursor) -> bool:
+        """Close the result set of cursor but keep its prepared statement.
+
+        Returns False if the cursor cannot be reused.
+        """
+        return False
+
+    def cancel(self, connection, cursor):
+        """Interrupt the statement running on connection; called from another thread"""
+        raise NotImplementedError
+
+
+class AccessBackend(Backend):
+    """Microsoft Access through the 32-bit Access ODBC driver"""
+
+    name = "access"
+    caches_statements = True
+
+    # Mapping from Python types to more friendly names
+    type_mapping = {
+        "str": "text",
+        "int": "integer",
+        "float": "float",
+        "datetime": "datetime",
+        "bool": "boolean",
+        "bytes": "binary",
+        "bytearray": "binary",
+    }
+
+    def connect(self, db_path: str, writable: bool = False):
+        if pyodbc is None:
+            raise RuntimeError("pyodbc could not be imported; the Access backend requires the ODBC driver manager.")
+        # Note: Must be running on Windows with 32-bit Access ODBC driver installed
+        base_conn_string = f"DRIVER={{Microsoft Access Driver (*.mdb, *.accdb)}};DBQ={db_path};"
+        if writable:
+            # Use Share Deny None for better concurrency when writes might be needed
+            connection_string = base_conn_string + "Mode=Share Deny None;"
+        else:
+            # Default to ReadOnly to prevent locking
+            connection_string = base_conn_string + "ReadOnly=True;"
+        return pyodbc.connect(connection_string)
+
+    def top_query(self, limit: int, body: str) -> str:
+        return f"SELECT TOP {int(limit)} {body}"
+
+    def table_entries(self, connection) -> list:
+        cursor = connection.cursor()
+        try:
+            return [(table.table_name, table.table_type) for table in cursor.tables()]
+        finally:
+            cursor.close()
+
+    def linked_tables(self, connection) -> list:
+        cursor = connection.cursor()
+        try:
+            # Query MSysObjects which contains information about all database objects including linked tables
+            cursor.execute("SELECT Name FROM MSysObjects WHERE Type=6")
+            return [row.Name for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+
+    def linked_table_sources(self, connection) -> dict:
+        cursor = connection.cursor()
+        try:
+            cursor.execute("SELECT Name, Database, ForeignName FROM MSysObjects WHERE Type=6")
+            return {row.Name: (row.Database, row.ForeignName or row.Name) for row in cursor.fetchall()}
+        finally:
+            cursor.close()
+
+    def table_columns(self, connection, table_name: str) -> list:
+        cursor = connection.cursor()
+        try:
+            cursor.execute(self.top_query(1, f"* FROM [{table_name}]"))
+            return [
+                {
+                    "name": column[0],
+                    "type": self.type_mapping.get(column[1].__name__, column[1].__name__),
+                    "nullable": column[6],
+                    # internal_size; Memo and OLE Object columns report about 1 GB (or 0)
+                    "size": column[3] if column[1] in (str, bytes, bytearray) and column[3] else None,
+                }
+                for column in cursor.description
+            ]
+        finally:
+            cursor.close()
+
+    def statistics(self, connection, table_name: str) -> list:
+        cursor = connection.cursor()
+        try:
+            # This will get all indexes in the table; index_name is None for table statistics rows
+            return [
+                (index_info[5], index_info[8], bool(index_info[6]))
+                for index_info in cursor.statistics(table=table_name)
+                if index_info[5]
+            ]
+        finally:
+            cursor.close()
+
+    def autoincrement_columns(self, connection, table_name: str) -> list:
+        cursor = connection.cursor()
+        try:
+            # In Access, primary keys often have an AutoNumber data type
+            cursor.execute(self.top_query(1, f"* FROM [{table_name}]"))
+            return [col[0] for col in cursor.description if col[5]]
+        finally:
+            cursor.close()
+
+    def random_order(self, column: str, seed: int) -> str:
+        # Rnd with a negative argument returns the same number for the same argument;
+        # the 0.5 keeps the argument negative when the column value is 0
+        return f"Rnd(-{int(seed)} * ({column} + 0.5))"
+
+    def length_sql(self, column: str, binary: bool = False) -> str:
+        # Len counts the bytes of an OLE Object in pairs (as characters); LenB counts bytes
+        return f"LenB({column})" if binary else f"Len({column})"
+
+    def substring_sql(self, column: str, start: int, length: int, binary: bool = False):
+        # Mid on an OLE Object returns text rather than bytes, so binary cells are read whole
+        if binary:
+            return None
+        return f"Mid({column}, {int(start)}, {int(length)})"
+
+    def short_value_sql(self, column: str, max_chars: int) -> str:
+        return f"IIf(Len({column}) > {int(max_chars)}, Null, {column})"
+
+    def set_timeout(self, connection, seconds: float = None):
+        # SQL_ATTR_QUERY_TIMEOUT in whole seconds; 0 disables it. pyodbc applies it
+        # to cursors created afterwards
+        connection.timeout = max(1, math.ceil(seconds)) if seconds else 0
+
+    def release_cursor(self, cursor) -> bool:
+        # Moving past the last result set closes the ODBC cursor (SQL_CLOSE) and
+        # releases its read locks, while pyodbc keeps the statement prepared
+        try:
+            while cursor.nextset():
+                pass
+            return True
+        except pyodbc.Error:
+            return False
+
+    def cancel(self, connection, cursor):
+        if cursor is not None:
+            cursor.cancel()
+
+
+class SQLiteBackend(Backend):
+    """SQLite file that mimics the Access metadata surface.
+
+    - Tables are reported as TABLE, views as VIEW, and MSys*/sqlite_* tables as SYSTEM TABLE.
+    - An optional MSysObjects(Name, Type, Database, ForeignName) table lists linked
+      tables (Type=6); on connect each one whose Database file exists is attached and
+      exposed as a temporary view, so it can be queried by name like in Access.
+    - Primary key indexes are reported as "PrimaryKey" in statistics().
+    - Cursors are not cached per statement: the sqlite3 module keeps its own
+      cache of prepared statements per connection.
+    """
+
+    name = "sqlite"
+    supports_count_distinct = True
+
+    def connect(self, db_path: str, writable: bool = False):
+        if not os.path.exists(db_path):
+            raise sqlite3.OperationalError(f"Database file not found: {db_path}")
+        mode = "rw" if writable else "ro"
+        # Pooled connections are used from worker threads, one thread at a time
+        connection = sqlite3.connect(
+            f"file:{db_path}?mode={mode}", uri=True, check_same_thread=False
+        )
+        self._attach_linked_tables(connection, db_path, mode)
+        return connection
+
+    def _attach_linked_tables(self, connection, db_path: str, mode: str):
+        try:
+            links = connection.execute(
+                "SELECT Name, Database, ForeignName FROM MSysObjects WHERE Type=6"
+            ).fetchall()
+        except sqlite3.Error:
+            return
+        for i, (name, database, foreign_name) in enumerate(links):
+            if not database:
+                continue
+            database = os.path.join(os.path.dirname(db_path), database)
+            if not os.path.exists(database):
+                continue
+            try:
+                connection.execute(f"ATTACH DATABASE ? AS link_{i}", (f"file:{database}?mode={mode}",))
+                connection.execute(
+                    f'CREATE TEMP VIEW "{name}" AS SELECT * FROM link_{i}."{foreign_name or name}"'
+                )
+            except sqlite3.Error as e:
+                print(f"Note: Could not attach linked table {name}: {e}", file=sys.stderr)
+
+    def top_query(self, limit: int, body: str) -> str:
+        return f"SELECT {body} LIMIT {int(limit)}"
+
+    def table_entries(self, connection) -> list:
+        rows = connection.execute(
+            "SELECT name, type FROM sqlite_master WHERE type IN ('table', 'view') ORDER BY rowid"
+        ).fetchall()
+        entries = []
+        for name, kind in rows:
+            if name.startswith(("MSys", "sqlite_")):
+                entries.append((name, "SYSTEM TABLE"))
+            else:
+                entries.append((name, "VIEW" if kind == "view" else "TABLE"))
+        return entries
+
+    def linked_tables(self, connection) -> list:
+        return [row[0] for row in connection.execute("SELECT Name FROM MSysObjects WHERE Type=6")]
+
+    def linked_table_sources(self, connection) -> dict:
+        rows = connection.execute("SELECT Name, Database, ForeignName FROM MSysObjects WHERE Type=6")
+        return {name: (database, foreign_name or name) for name, database, foreign_name in rows}
+
+    @staticmethod
+    def _friendly_type(declared: str) -> str:
+        """Map a declared SQLite column type to the names used for Access columns"""
+        declared = (declared or "").upper()
+        if not declared:
+            return "text"
+        if "INT" in declared:
+            return "integer"
+        if "BOOL" in declared or declared == "BIT":
+            return "boolean"
+        if "DATE" in declared or "TIME" in declared:
+            return "datetime"
+        if any(word in declared for word in ("REAL", "FLOA", "DOUB", "NUM", "DEC", "MONEY", "CURRENCY")):
+            return "float"
+        if "BLOB" in declared or "BINARY" in declared or "OLE" in declared:
+            return "binary"
+        return "text"
+
+    @staticmethod
+    def _declared_size(declared: str, friendly_type: str):
+        """Size of a text or binary column like Access reports it: TEXT holds up to 255
+        characters unless declared otherwise; MEMO/LONGTEXT/CLOB and BLOB/OLE are unbounded"""
+        declared = (declared or "").upper()
+        match = re.search(r"\(\s*(\d+)\s*\)", declared)
+        if match:
+            return int(match.group(1))
+        if friendly_type == "text" and not any(word in declared for word in ("MEMO", "LONG", "CLOB")):
+            return 255
+        return None
+
+    def table_columns(self, connection, table_name: str) -> list:
+        rows = connection.execute(f'PRAGMA table_info("{table_name}")').fetchall()
+        if not rows:
+            raise sqlite3.OperationalError(f"no such table: {table_name}")
+        columns = []
+        for _, name, declared, not_null, _, pk in rows:
+            friendly_type = self._friendly_type(declared)
+            size = self._declared_size(declared, friendly_type) if friendly_type in ("text", "binary") else None
+            columns.append({"name": name, "type": friendly_type, "nullable": not (not_null or pk), "size": size})
+        return columns
+
+    def statistics(self, connection, table_name: str) -> list:
+        result = []
+        for _, index_name, unique, origin, _ in connection.execute(f'PRAGMA index_list("{table_name}")').fetchall():
+            reported_name = "PrimaryKey" if origin == "pk" else index_name
+            for _, _, column_name in connection.execute(f'PRAGMA index_info("{index_name}")').fetchall():
+                result.append((reported_name, column_name, not unique))
+        if not any(index_name == "PrimaryKey" for index_name, _, _ in result):
+            # INTEGER PRIMARY KEY columns alias the rowid and have no index of their own
+            table_info = connection.execute(f'PRAGMA table_info("{table_name}")').fetchall()
+            for _, column_name, _, _, _, pk in sorted(table_info, key=lambda row: row[5]):
+                if pk:
+                    result.append(("PrimaryKey", column_name, False))
+        return result
+
+    def random_order(self, column: str, seed: int) -> str:
+        # random() takes no seed; two multiplicative hash rounds of the value, with the
+        # seed mixed in between, give a repeatable order (products stay within 64 bits)
+        value = f"(CAST({column} AS INTEGER) * 2654435761 + {int(seed) % 4294967296}) % 4294967296"
+        return f"{value} * 1540483477 % 4294967296"
+
+    def length_sql(self, column: str, binary: bool = False) -> str:
+        return f"LENGTH({column})"
+
+    def substring_sql(self, column: str, start: int, length: int, binary: bool = False):
+        # SUBSTR counts characters of text and bytes of BLOBs
+        return f"SUBSTR({column}, {int(start)}, {int(length)})"
+
+    def short_value_sql(self, column: str, max_chars: int) -> str:
+        return f"CASE WHEN LENGTH({column}) > {int(max_chars)} THEN NULL ELSE {column} END"
+
+    def cancel(self, connection, cursor):
+        # SQLite has no statement timeout; timeouts are enforced by interrupting
+        connection.interrupt()
+
+
+BACKENDS = {
+    AccessBackend.name: AccessBackend(),
+    SQLiteBackend.name: SQLiteBackend(),
+}
+
+_SQLITE_EXTENSIONS = (".sqlite", ".sqlite3", ".db")
+
+
+def backend_for_path(db_path: str) -> Backend:
+    """Pick the backend for a database file.
+
+    MCP_ACCESS_BACKEND=access|sqlite forces a backend; otherwise SQLite files are
+    recognized by extension and everything else is opened through Access ODBC.
+    """
+    forced = os.environ.get("MCP_ACCESS_BACKEND")
+    if forced:
+        if forced not in BACKENDS:
+            raise ValueError(f"Unknown backend '{forced}'. Use one of: {', '.join(BACKENDS)}")
+        return BACKENDS[forced]
+    if db_path.lower().endswith(_SQLITE_EXTENSIONS):
+        return BACKENDS["sqlite"]
+    return BACKENDS["access"]
+
+
+def backend_for(connection) -> Backend:
+    """Return the backend that opened a connection"""
+    if isinstance(connection, sqlite3.Connection):
+        return BACKENDS["sqlite"]
+    return BACKENDS["access"]
@@ -0,0 +1,91 @@
+"""
+Startup benchmark: how soon a freshly spawned server answers its first real tool call
+
+Creates a SQLite database (no Access driver needed), then spawns the server over
+stdio several times and measures, per run:
+- initialize: spawning the process until the MCP handshake completes
+- first call: from then until list_tables_tool returns the tables
+Both cold (the client calls connect first) and warm (the database is listed in
+ACCESS_STARTUP_DATABASES and opened in the background) starts are measured.
+
+Usage: python bench_startup.py [--runs N] [--tables N] [--db PATH]
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+SERVER = str(Path(__file__).parent / "server.py")
+
+
+def create_database(path: str, tables: int):
+    """Create a SQLite database with the given number of small tables"""
+    if os.path.exists(path):
+        os.remove(path)
+    connection = sqlite3.connect(path)
+    for i in range(tables):
+        connection.execute(f"CREATE TABLE Table{i} (ID INTEGER PRIMARY KEY, Name TEXT, Amount REAL)")
+        connection.executemany(f"INSERT INTO Table{i} VALUES (?, ?, ?)", [(j, f"row {j}", j * 1.5) for j in range(100)])
+    connection.commit()
+    connection.close()
+
+
+async def measure(db_path: str, warm: bool) -> tuple:
+    """Return (initialize seconds, first call seconds) for one server start"""
+    env = dict(os.environ)
+    env.pop("ACCESS_STARTUP_CONFIG", None)
+    if warm:
+        env["ACCESS_STARTUP_DATABASES"] = db_path
+    else:
+        env.pop("ACCESS_STARTUP_DATABASES", None)
+    conn_id = os.path.basename(db_path)
+    server_params = StdioServerParameters(command=sys.executable, args=[SERVER], env=env)
+
+    started = time.perf_counter()
+    with open(os.devnull, "w") as devnull:
+        async with stdio_client(server_params, errlog=devnull) as (read, write):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                initialized = time.perf_counter()
+                if not warm:
+                    await session.call_tool("connect", {"db_path": db_path})
+                result = await session.call_tool("list_tables_tool", {"conn_id": conn_id})
+                first_call = time.perf_counter()
+    if not result.content[0].text.startswith("Tables for"):
+        raise RuntimeError(f"Unexpected result: {result.content[0].text}")
+    return initialized - started, first_call - initialized
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--tables", type=int, default=50)
+    parser.add_argument("--db", help="Database to use instead of a generated SQLite file")
+    args = parser.parse_args()
+
+    db_path = args.db
+    if db_path is None:
+        db_path = os.path.join(tempfile.gettempdir(), "mcp_access_bench.sqlite")
+        create_database(db_path, args.tables)
+
+    print(f"Server: {SERVER}\nDatabase: {db_path}\nRuns: {args.runs}\n")
+    print(f"{'start':<6} {'initialize ms':>14} {'first call ms':>14} {'total ms':>10}")
+    for warm in (False, True):
+        timings = [await measure(db_path, warm) for _ in range(args.runs)]
+        initialize = statistics.median(t[0] for t in timings) * 1000
+        first_call = statistics.median(t[1] for t in timings) * 1000
+        total = statistics.median(t[0] + t[1] for t in timings) * 1000
+        print(f"{'warm' if warm else 'cold':<6} {initialize:>14.0f} {first_call:>14.1f} {total:>10.0f}")
+    print("\n(medians; cold calls connect before list_tables_tool)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,95 @@
+"""
+Row parsing for bulk loads into MS Access tables
+"""
+import csv
+import io
+import json
+import os
+from itertools import chain
+
+DATA_FORMATS = ("json", "csv", "ndjson")
+
+_EXTENSION_FORMATS = {
+    ".json": "json",
+    ".csv": "csv",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+}
+
+
+def detect_format(data: str = None, file_path: str = None) -> str:
+    """Guess the data format from a file extension or the first character of inline data"""
+    if file_path:
+        data_format = _EXTENSION_FORMATS.get(os.path.splitext(file_path)[1].lower())
+        if data_format is None:
+            raise ValueError(f"Cannot detect the format of '{file_path}'; pass data_format explicitly.")
+        return data_format
+    head = (data or "").lstrip()[:1]
+    if head == "[":
+        return "json"
+    if head == "{":
+        return "ndjson"
+    return "csv"
+
+
+def _object_rows(objects, columns):
+    """Turn an iterator of JSON objects (or arrays) into value lists ordered by columns"""
+    for obj in objects:
+        if isinstance(obj, dict):
+            yield [obj.get(column) for column in columns]
+        else:
+            yield list(obj)
+
+
+def _with_columns(objects, columns):
+    """Determine the column names from the first JSON record if they were not given"""
+    objects = iter(objects)
+    first = next(objects, None)
+    if first is None:
+        return columns or [], iter(())
+    if columns is None:
+        if not isinstance(first, dict):
+            raise ValueError("Rows given as arrays need explicit column names.")
+        columns = list(first.keys())
+    return columns, _object_rows(chain([first], objects), columns)
+
+
+def read_rows(source, data_format: str, columns: list = None):
+    """Parse rows for a bulk insert.
+
+    Args:
+        source: Inline text, or an open text file (read lazily for csv and ndjson)
+        data_format: One of "json" (array of objects/arrays), "csv" (header row
+            first; empty fields become NULL) or "ndjson" (one object/array per line)
+        columns: Column names. Required when JSON rows are arrays; otherwise taken
+            from the first JSON object. For CSV, passing columns means the data has
+            no header row.
+
+    Returns:
+        (columns, rows) where rows is an iterator of value lists
+    """
+    if data_format not in DATA_FORMATS:
+        raise ValueError(f"Unsupported data format '{data_format}'. Use one of: {', '.join(DATA_FORMATS)}")
+    if isinstance(source, str):
+        source = io.StringIO(source)
+
+    if data_format == "json":
+        records = json.load(source)
+        if not isinstance(records, list):
+            raise ValueError("JSON data must be an array of rows.")
+        return _with_columns(records, columns)
+
+    if data_format == "ndjson":
+        records = (json.loads(line) for line in source if line.strip())
+        return _with_columns(records, columns)
+
+    reader = csv.reader(source)
+    header = next(reader, None)
+    if header is None:
+        return columns or [], iter(())
+    if columns is None:
+        columns = header
+    else:
+        reader = chain([header], reader)
+    rows = ([value if value != "" else None for value in row] for row in reader if row)
+    return columns, rows
@@ -0,0 +1,58 @@
+"""
+Table catalog caching for MS Access databases
+"""
+import os
+import re
+
+import anyio
+
+# Statements that change the set of tables (SELECT ... INTO creates a table)
+_DDL_PATTERN = re.compile(r"^\s*(CREATE|DROP|ALTER)\b|^\s*SELECT\b.*\bINTO\s+\S+\s+FROM\b", re.IGNORECASE | re.DOTALL)
+
+
+def file_signature(db_path: str):
+    """Return (mtime_ns, size) identifying the current version of a database file.
+
+    Returns None if the file cannot be stat'ed (e.g. the network share is gone),
+    which callers treat as "unknown version".
+    """
+    try:
+        stat = os.stat(db_path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def is_ddl_statement(sql_query: str) -> bool:
+    """Check whether a statement may create, drop or alter tables"""
+    return bool(_DDL_PATTERN.search(sql_query))
+
+
+class CatalogCache:
+    """Cached catalog (tables, linked tables, table types) of one database file.
+
+    The cached catalog is discarded when the file's mtime or size changes, or
+    when invalidate() is called after DDL.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.lock = anyio.Lock()
+        self._catalog = None
+        self._signature = None
+
+    def get(self):
+        """Return the cached catalog, or None if missing or stale"""
+        signature = file_signature(self.db_path)
+        if self._catalog is not None and signature is not None and signature == self._signature:
+            return self._catalog
+        return None
+
+    def set(self, catalog: dict, signature):
+        """Store a catalog read while the file had the given signature"""
+        self._catalog = catalog
+        self._signature = signature
+
+    def invalidate(self):
+        self._catalog = None
+        self._signature = None
@@ -0,0 +1,223 @@
+"""
+Connection pooling for MS Access databases
+"""
+import sys
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+import anyio
+
+from executor import PRIORITY_METADATA
+
+
+class PoolClosedError(Exception):
+    """Raised when a connection is requested from a closed pool"""
+
+
+class PoolExhaustedError(Exception):
+    """Raised when no pooled connection becomes free within the acquire timeout.
+
+    Deliberately not a TimeoutError: no statement ran, so it must not be reported
+    as a query timeout.
+    """
+
+
+def ping(connection):
+    """Default health check: run a trivial statement on the connection"""
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT 1")
+        cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+class ConnectionPool:
+    """A pool of connections to one database file in one mode (ReadOnly/Writable).
+
+    Each tool call checks a connection out for the duration of its blocking
+    ODBC work, so concurrent calls against the same database run on separate
+    connections instead of sharing one pyodbc connection.
+
+    Args:
+        connect: Async callable returning a new connection
+        min_size: Connections opened up front and kept even when idle
+        max_size: Upper bound on open connections; further checkouts wait
+        idle_timeout: Seconds after which idle connections above min_size are closed.
+            There is no background reaper: they are only closed on a later checkout
+            or checkin, so an unused pool keeps its connections until then
+        acquire_timeout: Seconds to wait for a free connection before failing
+        health_check_interval: Idle connections older than this are pinged before reuse
+        health_check: Blocking callable raising if a connection is unusable
+        on_checkout: Optional callable receiving the seconds each checkout waited
+        executor: Optional DBExecutor running the health checks, rollbacks and closes
+            on each connection's own worker thread (the connections must have been
+            opened through it); by default they run in anyio's thread pool
+    """
+
+    def __init__(
+        self,
+        connect,
+        min_size: int = 1,
+        max_size: int = 4,
+        idle_timeout: float = 300.0,
+        acquire_timeout: float = 30.0,
+        health_check_interval: float = 10.0,
+        health_check=ping,
+        on_checkout=None,
+        executor=None,
+    ):
+        self._connect = connect
+        self.min_size = max(0, min_size)
+        self.max_size = max(1, max_size, self.min_size)
+        self.idle_timeout = idle_timeout
+        self.acquire_timeout = acquire_timeout
+        self.health_check_interval = health_check_interval
+        self._health_check = health_check
+        self._on_checkout = on_checkout
+        self._executor = executor
+        self._idle = deque()  # (connection, last_used) pairs, most recent on the right
+        self._size = 0
+        self._closed = False
+        self._limiter = anyio.Semaphore(self.max_size)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def stats(self) -> dict:
+        """Return current pool occupancy"""
+        return {
+            "size": self._size,
+            "idle": len(self._idle),
+            "in_use": self._size - len(self._idle),
+            "min_size": self.min_size,
+            "max_size": self.max_size,
+        }
+
+    async def open(self):
+        """Open min_size connections so the first calls don't pay the connect cost"""
+        while self._size < self.min_size:
+            connection = await self._new_connection()
+            self._idle.append((connection, time.monotonic()))
+
+    @asynccontextmanager
+    async def connection(self):
+        """Check out a connection for exclusive use; it is checked back in on exit"""
+        if self._closed:
+            raise PoolClosedError("Connection pool is closed")
+        started = time.monotonic()
+        try:
+            with anyio.fail_after(self.acquire_timeout):
+                await self._limiter.acquire()
+        except TimeoutError:
+            raise PoolExhaustedError(
+                f"All {self.max_size} pooled connections stayed in use for {self.acquire_timeout:g}s;"
+                " no statement was run. Try again when fewer queries are running."
+            ) from None
+        try:
+            connection = await self._checkout()
+        except BaseException:
+            self._limiter.release()
+            raise
+        if self._on_checkout is not None:
+            self._on_checkout(time.monotonic() - started)
+
+        failed = False
+        try:
+            yield connection
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            with anyio.CancelScope(shield=True):
+                try:
+                    await self._checkin(connection, failed)
+                finally:
+                    self._limiter.release()
+
+    async def prune(self):
+        """Close connections that have been idle longer than idle_timeout (keeping min_size)"""
+        now = time.monotonic()
+        expired = []
+        # Oldest connections are on the left
+        while self._idle and self._size - len(expired) > self.min_size:
+            connection, last_used = self._idle[0]
+            if now - last_used < self.idle_timeout:
+                break
+            self._idle.popleft()
+            expired.append(connection)
+        for connection in expired:
+            await self._discard(connection)
+
+    async def close(self):
+        """Close all idle connections; checked-out connections are closed on checkin"""
+        self._closed = True
+        while self._idle:
+            connection, _ = self._idle.pop()
+            await self._discard(connection)
+
+    async def _new_connection(self):
+        self._size += 1
+        try:
+            return await self._connect()
+        except BaseException:
+            self._size -= 1
+            raise
+
+    async def _checkout(self):
+        await self.prune()
+        while self._idle:
+            # Reuse the most recently used connection so older ones can age out
+            connection, last_used = self._idle.pop()
+            if time.monotonic() - last_used < self.health_check_interval:
+                return connection
+            if await self._is_healthy(connection):
+                return connection
+            print("Discarding unhealthy pooled connection.", file=sys.stderr)
+            await self._discard(connection)
+        return await self._new_connection()
+
+    async def _checkin(self, connection, failed: bool):
+        if self._closed:
+            await self._discard(connection)
+            return
+        if failed:
+            # Leave no half-finished transaction behind and drop broken connections
+            def _reset():
+                try:
+                    connection.rollback()
+                except Exception:
+                    pass
+                self._health_check(connection)
+
+            try:
+                await self._run_sync(connection, _reset)
+            except Exception:
+                await self._discard(connection)
+                return
+        self._idle.append((connection, time.monotonic()))
+        await self.prune()
+
+    async def _is_healthy(self, connection) -> bool:
+        try:
+            await self._run_sync(connection, lambda: self._health_check(connection))
+            return True
+        except Exception:
+            return False
+
+    async def _run_sync(self, connection, func):
+        if self._executor is None:
+            return await anyio.to_thread.run_sync(func)
+        return await self._executor.run(connection, func, PRIORITY_METADATA)
+
+    async def _discard(self, connection):
+        self._size -= 1
+        try:
+            if self._executor is None:
+                await anyio.to_thread.run_sync(connection.close)
+            else:
+                await self._executor.close(connection)
+        except Exception as e:
+            print(f"Error closing pooled connection: {e}", file=sys.stderr)
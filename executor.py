@@ -0,0 +1,222 @@
+"""
+Scheduling of blocking driver calls: one worker thread per connection, bounded global concurrency
+"""
+import heapq
+import itertools
+import queue
+import sys
+import threading
+
+import anyio
+import anyio.from_thread
+import anyio.lowlevel
+
+# Lower values run first when calls wait for a free slot
+PRIORITY_METADATA = 0  # Catalog and schema reads, connect/close: cheap and interactive
+PRIORITY_QUERY = 1  # Queries and writes of unknown cost
+
+_PRIORITY_NAMES = {PRIORITY_METADATA: "metadata", PRIORITY_QUERY: "query"}
+
+
+class PriorityLimiter:
+    """An async capacity limiter whose waiters are served by priority, then in arrival order"""
+
+    def __init__(self, total_tokens: int):
+        self.total_tokens = max(1, total_tokens)
+        self.borrowed_tokens = 0
+        self._waiters = []  # heap of [priority, seq, event]; event is None once cancelled
+        self._waiting = {}  # priority -> number of live waiters
+        self._seq = itertools.count()
+
+    def waiting(self) -> dict:
+        """Return the number of waiters per priority"""
+        return dict(self._waiting)
+
+    async def acquire(self, priority: int = PRIORITY_QUERY):
+        if self.borrowed_tokens < self.total_tokens and not self._waiting:
+            self.borrowed_tokens += 1
+            return
+        event = anyio.Event()
+        waiter = [priority, next(self._seq), event]
+        heapq.heappush(self._waiters, waiter)
+        self._waiting[priority] = self._waiting.get(priority, 0) + 1
+        try:
+            await event.wait()
+        except BaseException:
+            if event.is_set():
+                # The token was handed over just as we were cancelled; pass it on
+                self.release()
+            else:
+                waiter[2] = None
+                self._done_waiting(priority)
+            raise
+
+    def release(self):
+        while self._waiters:
+            priority, _, event = heapq.heappop(self._waiters)
+            if event is not None:
+                # Hand the token straight to the next waiter
+                self._done_waiting(priority)
+                event.set()
+                return
+        self.borrowed_tokens -= 1
+
+    def _done_waiting(self, priority: int):
+        self._waiting[priority] -= 1
+        if not self._waiting[priority]:
+            del self._waiting[priority]
+
+
+class _Worker:
+    """A thread running the calls submitted for one connection, one at a time"""
+
+    def __init__(self, name: str):
+        self.local = {}  # resources living as long as the connection, see DBExecutor.local
+        self._queue = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._thread = threading.Thread(target=self._loop, name=name, daemon=True)
+        self._thread.start()
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
+
+    def submit(self, priority: int, call):
+        self._queue.put((priority, next(self._seq), call))
+
+    def stop(self):
+        # Sorts after every pending call, so queued work still runs
+        self._queue.put((sys.maxsize, next(self._seq), None))
+
+    def _loop(self):
+        while True:
+            _, _, call = self._queue.get()
+            if call is None:
+                return
+            call()
+
+
+class DBExecutor:
+    """Runs blocking driver calls on a dedicated worker thread per connection.
+
+    Drivers like the Access ODBC driver are not safe to use from arbitrary threads,
+    so every call on a connection (including opening and closing it) runs on the
+    connection's own thread, in order. At most max_concurrency calls run at once
+    across all connections; waiting calls are admitted by priority, so catalog
+    and schema reads are not stuck behind long queries.
+    """
+
+    def __init__(self, max_concurrency: int = 8):
+        self.limiter = PriorityLimiter(max_concurrency)
+        self._workers = {}  # id(connection) -> _Worker
+        self._names = itertools.count(1)
+
+    async def _call(self, worker: _Worker, func, priority: int, cancel=None):
+        token = anyio.lowlevel.current_token()
+        done = anyio.Event()
+        outcome = {}
+
+        def _run():
+            try:
+                outcome["value"] = func()
+            except BaseException as e:
+                outcome["error"] = e
+            try:
+                anyio.from_thread.run_sync(done.set, token=token)
+            except RuntimeError:
+                pass  # The event loop has shut down; nobody is waiting any more
+
+        await self.limiter.acquire(priority)
+        try:
+            worker.submit(priority, _run)
+            if cancel is None:
+                # Like anyio.to_thread.run_sync, the call cannot be abandoned once started
+                with anyio.CancelScope(shield=True):
+                    await done.wait()
+            else:
+                try:
+                    await done.wait()
+                except anyio.get_cancelled_exc_class():
+                    # Ask the driver to stop, then wait until the connection is free again
+                    with anyio.CancelScope(shield=True):
+                        try:
+                            await anyio.to_thread.run_sync(cancel)
+                        except Exception as e:
+                            print(f"Error cancelling driver call: {e}", file=sys.stderr)
+                        await done.wait()
+                    raise
+        finally:
+            self.limiter.release()
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome["value"]
+
+    async def connect(self, connect, priority: int = PRIORITY_METADATA):
+        """Open a connection on a new worker thread, which then serves all its calls"""
+        worker = _Worker(f"db-worker-{next(self._names)}")
+        try:
+            connection = await self._call(worker, connect, priority)
+        except BaseException:
+            worker.stop()
+            raise
+        self._workers[id(connection)] = worker
+        return connection
+
+    async def run(self, connection, func, priority: int = PRIORITY_QUERY, cancel=None):
+        """Run func() on the worker thread of connection.
+
+        If the caller is cancelled while func runs, cancel() (if given) is called from
+        another thread to interrupt it, and the cancellation is raised once func has
+        returned. Without cancel, func always runs to completion first.
+        """
+        worker = self._workers.get(id(connection))
+        if worker is None:
+            raise RuntimeError("Connection was not opened through this executor or is closed")
+        return await self._call(worker, func, priority, cancel)
+
+    def local(self, connection) -> dict:
+        """Return storage for resources tied to a connection (e.g. its cached cursors).
+
+        Values with a close() method are closed on the worker thread just before
+        the connection itself. Only use the resources from the worker thread.
+        """
+        worker = self._workers.get(id(connection))
+        if worker is None:
+            raise RuntimeError("Connection was not opened through this executor or is closed")
+        return worker.local
+
+    def locals(self, name: str) -> list:
+        """Return the resource stored under name for every open connection that has one"""
+        return [worker.local[name] for worker in self._workers.values() if name in worker.local]
+
+    async def close(self, connection):
+        """Close a connection on its worker thread and stop the thread"""
+        worker = self._workers.pop(id(connection), None)
+        if worker is None:
+            await anyio.to_thread.run_sync(connection.close)
+            return
+
+        def _close():
+            for resource in worker.local.values():
+                if hasattr(resource, "close"):
+                    try:
+                        resource.close()
+                    except Exception as e:
+                        print(f"Error closing connection resource: {e}", file=sys.stderr)
+            worker.local.clear()
+            connection.close()
+
+        try:
+            await self._call(worker, _close, PRIORITY_METADATA)
+        finally:
+            worker.stop()
+
+    def stats(self) -> dict:
+        """Return the number of workers, running calls and queued calls"""
+        waiting = self.limiter.waiting()
+        return {
+            "workers": len(self._workers),
+            "running": self.limiter.borrowed_tokens,
+            "max_concurrency": self.limiter.total_tokens,
+            **{f"waiting_{_PRIORITY_NAMES.get(p, p)}": waiting.get(p, 0) for p in sorted(_PRIORITY_NAMES)},
+            "worker_queue": sum(worker.qsize() for worker in self._workers.values()),
+        }
@@ -0,0 +1,248 @@
+"""
+Streaming export of query results to CSV, NDJSON or Parquet files in bounded memory
+"""
+import base64
+import csv
+import hashlib
+import json
+import os
+import time
+from datetime import date, datetime, time as dt_time
+from decimal import Decimal
+
+EXPORT_FORMATS = ("csv", "ndjson", "parquet")
+EXTENSIONS = {"csv": ".csv", "ndjson": ".ndjson", "parquet": ".parquet"}
+
+
+def _text_value(value):
+    """Represent a value in a text format: dates in ISO 8601, binary as base64"""
+    if isinstance(value, (datetime, date, dt_time)):
+        return value.isoformat()
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return base64.b64encode(bytes(value)).decode("ascii")
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+class _HashingFile:
+    """A file opened for writing that computes the SHA-256 of the bytes written to it.
+
+    Text (str) is written as UTF-8. The checksum comes for free with the export
+    instead of reading a possibly large file a second time.
+    """
+
+    def __init__(self, path: str):
+        self._file = open(path, "wb")
+        self._digest = hashlib.sha256()
+
+    def write(self, data) -> int:
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self._digest.update(data)
+        return self._file.write(data)
+
+    def tell(self) -> int:
+        return self._file.tell()
+
+    def flush(self):
+        self._file.flush()
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+    def close(self):
+        self._file.close()
+
+    def sha256(self) -> str:
+        return self._digest.hexdigest()
+
+
+class _CsvWriter:
+    def __init__(self, path: str, columns: list, description):
+        self._file = _HashingFile(path)
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(columns)
+
+    def write(self, rows: list):
+        self._writer.writerows(
+            ["" if value is None else _text_value(value) for value in row] for row in rows
+        )
+
+    def close(self):
+        self._file.close()
+
+    def sha256(self) -> str:
+        return self._file.sha256()
+
+
+class _NdjsonWriter:
+    def __init__(self, path: str, columns: list, description):
+        self._file = _HashingFile(path)
+        self._columns = columns
+
+    def write(self, rows: list):
+        self._file.write("".join(
+            json.dumps(dict(zip(self._columns, map(_text_value, row))), default=str) + "\n" for row in rows
+        ))
+
+    def close(self):
+        self._file.close()
+
+    def sha256(self) -> str:
+        return self._file.sha256()
+
+
+# Rows held back by _ParquetWriter while the type of a column is still unknown
+MAX_PENDING_ROWS = 50000
+
+
+class _ParquetWriter:
+    """Writes each batch as a row group, with column types from the cursor or the values.
+
+    pyodbc reports the type of every column. sqlite3 reports none, so there the
+    type is taken from the column's first non-null values: batches are held back
+    (up to MAX_PENDING_ROWS rows) until every column has had one. Columns still
+    without a value then are written as text. Values that do not fit their
+    column's type (SQLite columns may mix types) fail the export with ValueError.
+    """
+
+    def __init__(self, path: str, columns: list, description):
+        # Parquet export is optional, and pyarrow is slow to import: only load it when used
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow).") from None
+        self._pyarrow = pyarrow
+        self._file = _HashingFile(path)
+        self._columns = columns
+        self._types = [self._arrow_type(column[1]) for column in description]
+        self._text_columns = set()  # columns written as text, having had no value to type them by
+        self._pending = []
+        self._pending_rows = 0
+        self._writer = None
+
+    def _arrow_type(self, type_code):
+        pyarrow = self._pyarrow
+        # pyodbc reports the Python type of each column; sqlite3 reports None
+        return {
+            int: pyarrow.int64(), float: pyarrow.float64(), Decimal: pyarrow.float64(),
+            str: pyarrow.string(), bool: pyarrow.bool_(), datetime: pyarrow.timestamp("us"),
+            date: pyarrow.date32(), dt_time: pyarrow.time64("us"),
+            bytes: pyarrow.binary(), bytearray: pyarrow.binary(),
+        }.get(type_code)
+
+    def write(self, rows: list):
+        if self._writer is not None:
+            self._write_rows(rows)
+            return
+        self._pending.append(rows)
+        self._pending_rows += len(rows)
+        for index, column_type in enumerate(self._types):
+            if column_type is None:
+                self._types[index] = self._infer_type(index, rows)
+        if None not in self._types or self._pending_rows >= MAX_PENDING_ROWS:
+            self._open()
+
+    def _infer_type(self, index: int, rows: list):
+        values = [row[index] for row in rows if row[index] is not None]
+        if not values:
+            return None
+        try:
+            return self._pyarrow.array(values).type
+        except (self._pyarrow.ArrowInvalid, self._pyarrow.ArrowTypeError) as e:
+            raise ValueError(f"Column {self._columns[index]!r} mixes values of different types ({e});"
+                             " export as csv or ndjson, or CAST the column in the query.") from None
+
+    def _open(self):
+        pyarrow = self._pyarrow
+        self._text_columns = {index for index, column_type in enumerate(self._types) if column_type is None}
+        fields = [pyarrow.field(name, column_type or pyarrow.string())
+                  for name, column_type in zip(self._columns, self._types)]
+        self._writer = pyarrow.parquet.ParquetWriter(self._file, pyarrow.schema(fields))
+        pending, self._pending = self._pending, []
+        for rows in pending:
+            self._write_rows(rows)
+
+    def _write_rows(self, rows: list):
+        pyarrow = self._pyarrow
+        schema = self._writer.schema
+        arrays = []
+        for index, field in enumerate(schema):
+            values = [row[index] for row in rows]
+            if index in self._text_columns:
+                values = [None if value is None else str(_text_value(value)) for value in values]
+            elif field.type == pyarrow.float64():
+                values = [float(value) if isinstance(value, Decimal) else value for value in values]
+            try:
+                arrays.append(pyarrow.array(values, type=field.type))
+            except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError) as e:
+                raise ValueError(f"Column {field.name!r} has a value that is not {field.type} ({e});"
+                                 " export as csv or ndjson, or CAST the column in the query.") from None
+        self._writer.write_table(pyarrow.Table.from_arrays(arrays, schema=schema))
+
+    def close(self):
+        if self._writer is None:
+            # Fewer rows than MAX_PENDING_ROWS, or none: still write a file with the columns
+            self._open()
+        try:
+            self._writer.close()
+        finally:
+            # ParquetWriter does not close a file object it was given
+            self._file.close()
+
+    def sha256(self) -> str:
+        return self._file.sha256()
+
+
+_WRITERS = {"csv": _CsvWriter, "ndjson": _NdjsonWriter, "parquet": _ParquetWriter}
+
+
+def export_cursor(cursor, path: str, export_format: str, batch_size: int, on_batch=None) -> dict:
+    """Write the result of an executed cursor to path, fetching batch_size rows at a time.
+
+    Only one batch is held in memory (Parquet may hold back a few more to type
+    its columns, see _ParquetWriter). The file is written under a temporary name
+    and renamed when complete, so a failed export leaves no partial file behind.
+    on_batch, if given, is called with the number of rows of every batch.
+    Returns {"path", "rows", "bytes", "sha256", "seconds"}.
+    """
+    started = time.perf_counter()
+    columns = [column[0] for column in cursor.description]
+    partial = path + ".partial"
+    writer = _WRITERS[export_format](partial, columns, cursor.description)
+    rows = 0
+    try:
+        try:
+            while True:
+                batch = cursor.fetchmany(batch_size)
+                if not batch:
+                    break
+                writer.write(batch)
+                rows += len(batch)
+                if on_batch is not None:
+                    on_batch(len(batch))
+        finally:
+            writer.close()
+        os.replace(partial, path)
+    except BaseException:
+        try:
+            os.remove(partial)
+        except OSError:
+            pass
+        raise
+    return {
+        "path": path,
+        "rows": rows,
+        "bytes": os.path.getsize(path),
+        "sha256": writer.sha256(),
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def export_file_name(name: str, export_format: str) -> str:
+    """File name for exporting a table: the name with characters unsafe in file names replaced"""
+    safe = "".join(ch if ch.isalnum() or ch in " -_." else "_" for ch in name).strip() or "export"
+    return safe + EXTENSIONS[export_format]
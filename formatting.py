@@ -0,0 +1,211 @@
+"""
+Result formatting for query output: vertical, aligned table, CSV, markdown and JSON lines
+"""
+import json
+from datetime import date, datetime
+from typing import NamedTuple
+
+from rowset import RowSet
+
+OUTPUT_FORMATS = ("vertical", "table", "csv", "markdown", "jsonl")
+
+
+class FormattedRows(NamedTuple):
+    """Formatted text with exact counts of what it contains"""
+    text: str
+    rows: int   # Rows emitted (only whole rows are emitted)
+    chars: int  # Characters in text
+    bytes: int  # UTF-8 bytes in text
+
+
+def format_value(val):
+    """Format a value for display, handling None and datetime types"""
+    if val is None:
+        return "NULL"
+    if isinstance(val, (datetime, date)):
+        return val.isoformat()
+    return str(val)
+
+
+def _json_value(val):
+    if isinstance(val, (datetime, date)):
+        return val.isoformat()
+    return str(val)
+
+
+def _single_line(text: str) -> str:
+    return text.replace("\r", "\\r").replace("\n", "\\n").replace("\t", " ")
+
+
+def _csv_field(text: str) -> str:
+    if any(ch in text for ch in ',"\r\n'):
+        return '"' + text.replace('"', '""') + '"'
+    return text
+
+
+class _Buffer:
+    """Collects output pieces, tracking their size against a character budget"""
+
+    def __init__(self, budget):
+        self.parts = []
+        self.size = 0
+        self.budget = budget
+
+    def fits(self, extra: int) -> bool:
+        return self.budget is None or self.size + extra <= self.budget
+
+    def commit(self, pieces: list, size: int):
+        self.parts.extend(pieces)
+        self.size += size
+
+
+def _emit_rows(rows, buffer, header_pieces, start_row, field_piece, end_row):
+    """Emit the rows of a RowSet field by field, stopping at the first field that breaks the budget.
+
+    Pieces of a row are only committed to the buffer once the whole row fits, and
+    the header is only committed together with the first row. field_piece is
+    called with the column index and the value.
+    """
+    emitted = 0
+    pending = list(header_pieces)
+    pending_size = sum(len(piece) for piece in pending)
+    for number, row in enumerate(rows.rows, 1):
+        pieces = pending
+        size = pending_size
+        opening = start_row(number)
+        pieces.append(opening)
+        size += len(opening)
+        if not buffer.fits(size):
+            break
+        complete = True
+        for index, value in enumerate(row):
+            piece = field_piece(index, value)
+            size += len(piece)
+            if not buffer.fits(size):
+                complete = False
+                break
+            pieces.append(piece)
+        if not complete:
+            break
+        closing = end_row(number)
+        size += len(closing)
+        if not buffer.fits(size):
+            break
+        pieces.append(closing)
+        buffer.commit(pieces, size)
+        emitted = number
+        pending = []
+        pending_size = 0
+    return emitted
+
+
+def _vertical(rows, columns, buffer):
+    labels = [f"{column}: " for column in columns]
+    return _emit_rows(
+        rows, buffer, [],
+        lambda number: f"{number}. row\n",
+        lambda index, value: labels[index] + format_value(value) + "\n",
+        lambda number: "\n",
+    )
+
+
+def _csv(rows, columns, buffer):
+    header = ",".join(_csv_field(str(column)) for column in columns) + "\n"
+    return _emit_rows(
+        rows, buffer, [header],
+        lambda number: "",
+        lambda index, value: ("," if index else "") + ("" if value is None else _csv_field(format_value(value))),
+        lambda number: "\n",
+    )
+
+
+def _markdown(rows, columns, buffer):
+    header = (
+        "| " + " | ".join(_single_line(str(column)).replace("|", "\\|") for column in columns) + " |\n"
+        + "|" + "|".join(" --- " for _ in columns) + "|\n"
+    )
+    return _emit_rows(
+        rows, buffer, [header],
+        lambda number: "|",
+        lambda index, value: " " + _single_line(format_value(value)).replace("|", "\\|") + " |",
+        lambda number: "\n",
+    )
+
+
+def _jsonl(rows, columns, buffer):
+    # Keys are encoded once per column rather than once per field
+    keys = [(", " if index else "") + json.dumps(str(column)) + ": " for index, column in enumerate(columns)]
+    return _emit_rows(
+        rows, buffer, [],
+        lambda number: "{",
+        lambda index, value: keys[index] + json.dumps(value, default=_json_value),
+        lambda number: "}\n",
+    )
+
+
+def _table(rows, columns, buffer):
+    """Aligned text table. Widths depend on the shown rows, so this runs in two linear passes."""
+    separator = " | "
+    header_cells = [_single_line(str(column)) for column in columns]
+    # Pass 1: format cells until even the unpadded rows would exceed the budget
+    cell_rows = []
+    size = sum(len(cell) for cell in header_cells) + len(separator) * (len(columns) - 1) + 1
+    for row in rows.rows:
+        cells = [_single_line(format_value(value)) for value in row]
+        size += sum(len(cell) for cell in cells) + len(separator) * (len(cells) - 1) + 1
+        if not buffer.fits(size):
+            break
+        cell_rows.append(cells)
+
+    # Pass 2: padded lines all have the same length, so the number of rows that fit is direct
+    count = len(cell_rows)
+    while count:
+        widths = [len(cell) for cell in header_cells]
+        for cells in cell_rows[:count]:
+            for i, cell in enumerate(cells):
+                if len(cell) > widths[i]:
+                    widths[i] = len(cell)
+        line_size = sum(widths) + len(separator) * (len(widths) - 1) + 1
+        fitting = count if buffer.budget is None else (buffer.budget - buffer.size) // line_size - 2
+        if fitting >= count:
+            break
+        count = max(0, fitting)
+    if not count:
+        return 0
+
+    def _line(cells):
+        return separator.join(cell.ljust(widths[i]) for i, cell in enumerate(cells)).rstrip() + "\n"
+
+    pieces = [_line(header_cells), "-+-".join("-" * width for width in widths) + "\n"]
+    pieces.extend(_line(cells) for cells in cell_rows[:count])
+    buffer.commit(pieces, sum(len(piece) for piece in pieces))
+    return count
+
+
+_FORMATTERS = {
+    "vertical": _vertical,
+    "table": _table,
+    "csv": _csv,
+    "markdown": _markdown,
+    "jsonl": _jsonl,
+}
+
+
+def format_rows(rows, output_format: str = "vertical", max_chars: int = None) -> FormattedRows:
+    """Format rows (a RowSet, or dicts sharing the same keys) in one of OUTPUT_FORMATS.
+
+    Output is collected in a list and joined once, and the character budget is
+    checked after every field, so formatting stops at the first field that would
+    not fit. Only whole rows are emitted; max_chars=None means no limit.
+    """
+    formatter = _FORMATTERS.get(output_format)
+    if formatter is None:
+        raise ValueError(f"Unknown output format '{output_format}'. Use one of: {', '.join(OUTPUT_FORMATS)}")
+    if not isinstance(rows, RowSet):
+        rows = list(rows)
+        rows = RowSet(rows[0].keys() if rows else (), [tuple(row.values()) for row in rows])
+    columns = rows.columns
+    buffer = _Buffer(max_chars)
+    emitted = formatter(rows, columns, buffer) if rows else 0
+    text = "".join(buffer.parts)
+    return FormattedRows(text, emitted, len(text), len(text.encode("utf-8")))
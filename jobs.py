@@ -0,0 +1,211 @@
+"""
+Background jobs: long-running queries run by a bounded pool of workers, results spilled to disk
+"""
+import heapq
+import itertools
+import json
+import os
+import sys
+import time
+from datetime import date, datetime, time as dt_time
+from itertools import islice
+
+import anyio
+
+from rowset import RowSet
+
+# Statuses of a job; the last three are final
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+
+def json_default(value):
+    """Serialize the values json cannot: dates and times as ISO 8601, anything else (Decimal...) as text"""
+    if isinstance(value, (datetime, date, dt_time)):
+        return value.isoformat()
+    return str(value)
+
+
+class ResultFile:
+    """Result rows of a job as JSON lines, with the file offset of every stride-th row.
+
+    The first line is a JSON array of the column names (also kept in columns);
+    each further line is a JSON array of one row's values, in the same order.
+    Rows are written and read in batches, so memory does not grow with the
+    result; reading from row n seeks to the nearest recorded offset.
+    """
+
+    def __init__(self, path: str, stride: int = 1000):
+        self.path = path
+        self.stride = stride
+        self.columns = []
+        self.rows = 0
+        self._offsets = [0]  # offset of row 0, stride, 2 * stride, ...
+
+    def start(self, f, columns: list):
+        """Write the header line of column names to f, the new file opened for writing in binary mode"""
+        self.columns = list(columns)
+        f.write(json.dumps(self.columns).encode("utf-8") + b"\n")
+        self._offsets = [f.tell()]
+
+    def append(self, f, rows):
+        """Write rows (sequences of values) to f, the file opened for writing in binary mode"""
+        for row in rows:
+            if self.rows and self.rows % self.stride == 0:
+                self._offsets.append(f.tell())
+            f.write(json.dumps(row, default=json_default).encode("utf-8") + b"\n")
+            self.rows += 1
+
+    def read(self, offset: int, limit: int) -> RowSet:
+        """Return up to limit rows starting at row offset"""
+        if offset >= self.rows or limit <= 0:
+            return RowSet(self.columns)
+        block = min(offset // self.stride, len(self._offsets) - 1)
+        with open(self.path, "rb") as f:
+            f.seek(self._offsets[block])
+            lines = islice(f, offset - block * self.stride, offset - block * self.stride + limit)
+            return RowSet(self.columns, [tuple(json.loads(line)) for line in lines])
+
+    def remove(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+class Job:
+    """A query submitted to the JobScheduler and its progress"""
+
+    def __init__(self, job_id: str, conn_id: str, sql: str, params, priority: int, run):
+        self.id = job_id
+        self.conn_id = conn_id
+        self.sql = sql
+        self.params = params
+        self.priority = priority
+        self.run = run  # async callable(job) doing the work
+        self.status = QUEUED
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.rows = 0  # rows fetched so far; updated from the worker thread
+        self.columns = None
+        self.result = None  # ResultFile once rows are written
+        self.error = None
+        self.cancel_requested = False
+        self._scope = None
+
+    def elapsed(self) -> float:
+        """Seconds the job has been running (or ran)"""
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+    def summary(self) -> dict:
+        return {
+            "job": self.id,
+            "db": self.conn_id,
+            "status": self.status,
+            "priority": self.priority,
+            "rows": self.rows,
+            "seconds": round(self.elapsed(), 2),
+            "sql": self.sql[:60],
+        }
+
+
+class JobScheduler:
+    """Runs jobs on max_workers worker tasks, lowest priority value first, then in submission order.
+
+    The workers run inside run(), which has to be running (e.g. in the server's
+    lifespan) for jobs to start. Up to history finished jobs are kept; older ones
+    are forgotten and their result files deleted.
+    """
+
+    def __init__(self, max_workers: int = 2, history: int = 50):
+        self.max_workers = max(1, max_workers)
+        self.history = history
+        self.jobs = {}  # job id -> Job, in submission order
+        self._queue = []  # heap of (priority, seq, job)
+        self._pending = None
+        self._seq = itertools.count(1)
+
+    @property
+    def running(self) -> bool:
+        return self._pending is not None
+
+    async def run(self):
+        """Run the workers until cancelled"""
+        self._pending = anyio.Semaphore(0)
+        try:
+            async with anyio.create_task_group() as tg:
+                for _ in range(self.max_workers):
+                    tg.start_soon(self._worker)
+        finally:
+            self._pending = None
+            for job in self.jobs.values():
+                if job.status == QUEUED:
+                    job.status, job.finished = CANCELLED, time.time()
+
+    def submit(self, conn_id: str, sql: str, params, priority: int, run) -> Job:
+        """Queue a job; run(job) is awaited by a worker and may update job.rows"""
+        if not self.running:
+            raise RuntimeError("The job scheduler is not running")
+        seq = next(self._seq)
+        job = Job(f"job-{seq}", conn_id, sql, params, priority, run)
+        self.jobs[job.id] = job
+        heapq.heappush(self._queue, (priority, seq, job))
+        self._pending.release()
+        return job
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued or running job; returns False if it had already finished"""
+        job = self.jobs[job_id]
+        if job.status == QUEUED:
+            job.status, job.finished = CANCELLED, time.time()
+            return True
+        if job.status == RUNNING:
+            job.cancel_requested = True
+            job._scope.cancel()
+            return True
+        return False
+
+    def cancel_all(self, conn_id: str):
+        """Cancel every unfinished job of a connection"""
+        for job in list(self.jobs.values()):
+            if job.conn_id == conn_id and job.status not in FINISHED:
+                self.cancel(job.id)
+
+    def stats(self) -> dict:
+        counts = {status: 0 for status in (QUEUED, RUNNING, DONE, FAILED, CANCELLED)}
+        for job in self.jobs.values():
+            counts[job.status] += 1
+        return {"workers": self.max_workers, **counts}
+
+    async def _worker(self):
+        while True:
+            await self._pending.acquire()
+            _, _, job = heapq.heappop(self._queue)
+            if job.status != QUEUED:
+                continue  # cancelled while queued
+            job.status, job.started = RUNNING, time.time()
+            with anyio.CancelScope() as scope:
+                job._scope = scope
+                try:
+                    await job.run(job)
+                    job.status = DONE
+                except Exception as e:
+                    job.status, job.error = FAILED, str(e) or type(e).__name__
+                    print(f"Job {job.id} failed: {job.error}", file=sys.stderr)
+            if scope.cancelled_caught or (job.cancel_requested and job.status != DONE):
+                job.status = CANCELLED
+            if job.status != DONE and job.result is not None:
+                job.result.remove()
+                job.result = None
+            job.finished, job._scope = time.time(), None
+            self._forget_old()
+
+    def _forget_old(self):
+        finished = [job for job in self.jobs.values() if job.status in FINISHED]
+        for job in finished[:max(0, len(finished) - self.history)]:
+            if job.result is not None:
+                job.result.remove()
+            del self.jobs[job.id]
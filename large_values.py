@@ -0,0 +1,119 @@
+"""
+Large-object (Memo and OLE Object) columns: detection, placeholders and lazy select lists
+"""
+import hashlib
+
+from rowset import row_values
+
+# The largest Access TEXT and BINARY columns; bigger or unbounded ones are Memo / OLE Object
+MAX_TEXT_SIZE = 255
+MAX_BINARY_SIZE = 510
+
+
+def is_large_column(column_type: str, size) -> bool:
+    """Whether a column (as described by Backend.table_columns) can hold large values"""
+    if column_type in ("binary", "bytearray"):
+        return not size or size > MAX_BINARY_SIZE
+    if column_type in ("text", "str"):
+        return not size or size > MAX_TEXT_SIZE
+    return False
+
+
+def large_columns(description) -> set:
+    """Indexes of the result columns that can hold large values, from cursor.description.
+
+    pyodbc reports the Python type and internal size of each column. sqlite3
+    reports no types, so every column of a SQLite result is checked value by value.
+    """
+    indexes = set()
+    for index, column in enumerate(description):
+        type_code, size = column[1], column[3]
+        if type_code is None or (
+            type_code in (bytes, bytearray) and is_large_column("binary", size)
+        ) or (type_code is str and is_large_column("text", size)):
+            indexes.add(index)
+    return indexes
+
+
+def placeholder(length: int, binary: bool, digest: str = None) -> str:
+    """Text shown instead of a large value: with its hash if it was read, else marked as not read"""
+    text = f"<{'binary' if binary else 'text'} {length} {'bytes' if binary else 'chars'}"
+    return text + (f" sha256:{digest}>" if digest else ", not read>")
+
+
+def compact_value(value, max_chars: int):
+    """Replace a binary value, or text longer than max_chars, by a placeholder with its length and hash"""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        value = bytes(value)
+        return placeholder(len(value), True, hashlib.sha256(value).hexdigest()[:12])
+    if isinstance(value, str) and len(value) > max_chars:
+        return placeholder(len(value), False, hashlib.sha256(value.encode("utf-8")).hexdigest()[:12])
+    return value
+
+
+def row_converter(description, max_chars: int):
+    """Return a function turning a driver row into a tuple of values with large values replaced.
+
+    Results without large-object columns use row_values unchanged.
+    """
+    large = large_columns(description)
+    if not large:
+        return row_values
+
+    def _convert(row):
+        return tuple(
+            compact_value(value, max_chars) if index in large
+            else str(value) if isinstance(value, (bytes, bytearray)) else value
+            for index, value in enumerate(row)
+        )
+    return _convert
+
+
+def lazy_select(columns: list, backend, quote, max_chars: int):
+    """Build the select list of SELECT * over columns (from Backend.table_columns) that
+    leaves large values in the database.
+
+    Text in large-object columns is only selected when it has at most max_chars
+    characters, and binary values not at all; for both their length is selected,
+    and the row converter shows a placeholder with the length instead (but no hash,
+    as the value is never read). Returns
+    (select list, converter), or (None, None) if the table has no such columns.
+    """
+    items = []
+    kinds = []  # per column: None (plain), "text" or "binary"
+    for column in columns:
+        name = quote(column["name"])
+        if "size" not in column or not is_large_column(column.get("type"), column["size"]):
+            items.append(name)
+            kinds.append(None)
+        elif column.get("type") in ("binary", "bytearray"):
+            items.append(backend.length_sql(name, binary=True))
+            kinds.append("binary")
+        else:
+            items.append(backend.short_value_sql(name, max_chars))
+            items.append(backend.length_sql(name))
+            kinds.append("text")
+    if not any(kinds):
+        return None, None
+
+    def _convert(row):
+        values = []
+        position = 0
+        for kind in kinds:
+            if kind is None:
+                value = row[position]
+                values.append(str(value) if isinstance(value, (bytes, bytearray)) else value)
+                position += 1
+            elif kind == "binary":
+                length = row[position]
+                values.append(None if length is None else placeholder(int(length), True))
+                position += 1
+            else:
+                value, length = row[position], row[position + 1]
+                if value is None and length is not None and length > max_chars:
+                    value = placeholder(int(length), False)
+                values.append(value)
+                position += 2
+        return tuple(values)
+
+    return ", ".join(items), _convert
@@ -0,0 +1,269 @@
+"""
+Hot-path metrics for the MCP tools: latency, rows and bytes kept in fixed-memory histograms
+"""
+import contextvars
+import functools
+import heapq
+import inspect
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+import anyio
+
+# Bucket upper bounds. Seconds double from 0.5ms to ~65s; rows and bytes grow 4x from 1 to ~1e9.
+SECONDS_BUCKETS = tuple(0.0005 * 2 ** i for i in range(18))
+COUNT_BUCKETS = tuple(4 ** i for i in range(16))
+
+# Tool responses starting with one of these are counted as errors
+_ERROR_PREFIXES = ("Error", "Database Error", "SQL Error")
+
+# Per-call statistics of the tool call being served, shared with its worker threads
+_current_call = contextvars.ContextVar("mcp_access_call", default=None)
+
+
+class Histogram:
+    """Counts of observations per bucket, plus their count, sum and maximum"""
+
+    __slots__ = ("bounds", "counts", "count", "sum", "max")
+
+    def __init__(self, bounds: tuple):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # The last bucket is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        index = 0
+        # Buckets are few, so a linear scan beats bisect's call overhead
+        for bound in self.bounds:
+            if value <= bound:
+                break
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile as the upper bound of the bucket containing it"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+class _Call:
+    __slots__ = ("tool", "db", "rows")
+
+    def __init__(self, tool: str, db: str):
+        self.tool = tool
+        self.db = db
+        self.rows = 0
+
+
+class Metrics:
+    """Registry of histograms and error counters labelled by tool, database and stage.
+
+    Memory is bounded: every histogram has a fixed number of buckets, and once
+    max_series label combinations exist new databases are folded into db="other".
+    Observations may come from the event loop and from worker threads.
+
+    Recorded per tool call (labels tool, db):
+        tool_seconds: total latency
+        stage_seconds (plus label stage): queue (waiting for a worker thread slot),
+            pool_wait (waiting for a pooled connection), execute, fetch, format,
+            and metadata/connect for other blocking driver calls
+        rows: rows fetched from the driver
+        bytes: UTF-8 bytes of the response
+    """
+
+    def __init__(self, max_series: int = 1000, slow_queries: int = 10):
+        self.max_series = max_series
+        self.slow_queries = slow_queries
+        self._histograms = {}  # (name, labels) -> Histogram
+        self._errors = {}  # labels -> count
+        self._slowest = []  # min-heap of (seconds, db, sql) for the slowest queries
+        self._lock = threading.Lock()
+        self._writer = None
+        self.started = time.time()
+
+    def _observe(self, name: str, labels: tuple, value: float, bounds: tuple):
+        key = (name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                if len(self._histograms) >= self.max_series:
+                    key = (name, tuple((label, "other" if label == "db" else text) for label, text in labels))
+                    histogram = self._histograms.get(key)
+                if histogram is None:
+                    histogram = self._histograms[key] = Histogram(bounds)
+            histogram.observe(value)
+
+    def observe_stage(self, stage: str, seconds: float):
+        """Record time spent in a stage of the current tool call (ignored outside tool calls)"""
+        call = _current_call.get()
+        if call is not None:
+            self._observe("stage_seconds", (("tool", call.tool), ("db", call.db), ("stage", stage)),
+                          seconds, SECONDS_BUCKETS)
+
+    def add_rows(self, rows: int):
+        """Count rows fetched from the driver by the current tool call"""
+        call = _current_call.get()
+        if call is not None:
+            call.rows += rows
+
+    def record_query(self, sql: str, seconds: float):
+        """Remember a query if it is among the slowest seen so far"""
+        call = _current_call.get()
+        item = (seconds, call.db if call is not None else "-", sql[:200])
+        with self._lock:
+            if len(self._slowest) < self.slow_queries:
+                heapq.heappush(self._slowest, item)
+            elif seconds > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, item)
+
+    @contextmanager
+    def timed(self, stage: str):
+        """Time a block as a stage of the current tool call"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_stage(stage, time.perf_counter() - started)
+
+    async def run_sync(self, func, stage: str = None, runner=None):
+        """Run a blocking callable in a worker thread, recording the wait for a thread.
+
+        If stage is given, the callable's run time is recorded under it; otherwise
+        the callable is expected to time its own stages with timed(). runner is an
+        async callable that runs a function in a thread (default anyio.to_thread.run_sync).
+        """
+        submitted = time.perf_counter()
+
+        def _run():
+            started = time.perf_counter()
+            self.observe_stage("queue", started - submitted)
+            try:
+                return func()
+            finally:
+                if stage:
+                    self.observe_stage(stage, time.perf_counter() - started)
+
+        # Run in a copy of the caller's context so the worker thread sees the current call
+        context = contextvars.copy_context()
+        if runner is None:
+            return await anyio.to_thread.run_sync(context.run, _run)
+        return await runner(lambda: context.run(_run))
+
+    def tool(self, func):
+        """Decorator recording latency, rows, bytes and errors of an async MCP tool"""
+        name = func.__name__
+        parameters = list(inspect.signature(func).parameters)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            arguments = dict(zip(parameters, args), **kwargs) if args else kwargs
+            db = arguments.get("conn_id") or os.path.basename(arguments.get("db_path") or "") or "-"
+            call = _Call(name, str(db))
+            labels = (("tool", name), ("db", call.db))
+            token = _current_call.set(call)
+            started = time.perf_counter()
+            failed = True
+            try:
+                result = await func(*args, **kwargs)
+                failed = isinstance(result, str) and result.startswith(_ERROR_PREFIXES)
+                if isinstance(result, str):
+                    self._observe("bytes", labels, len(result.encode("utf-8")), COUNT_BUCKETS)
+                return result
+            finally:
+                _current_call.reset(token)
+                self._observe("tool_seconds", labels, time.perf_counter() - started, SECONDS_BUCKETS)
+                self._observe("rows", labels, call.rows, COUNT_BUCKETS)
+                if failed:
+                    with self._lock:
+                        self._errors[labels] = self._errors.get(labels, 0) + 1
+
+        return wrapper
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._errors.clear()
+            self._slowest.clear()
+        self.started = time.time()
+
+    def snapshot(self) -> dict:
+        """Return histograms {(name, labels): (count, sum, max, p50, p95, p99)},
+        errors {labels: count} and the slowest queries [(seconds, db, sql)], slowest first"""
+        with self._lock:
+            histograms = {
+                key: (h.count, h.sum, h.max, h.quantile(0.5), h.quantile(0.95), h.quantile(0.99))
+                for key, h in self._histograms.items()
+            }
+            errors = dict(self._errors)
+            slowest = sorted(self._slowest, reverse=True)
+        return {"histograms": histograms, "errors": errors, "slowest": slowest}
+
+    def prometheus_text(self, prefix: str = "mcp_access") -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            by_name = {}
+            for (name, labels), histogram in self._histograms.items():
+                by_name.setdefault(name, []).append((labels, histogram))
+            for name in sorted(by_name):
+                metric = f"{prefix}_{name}"
+                lines.append(f"# TYPE {metric} histogram")
+                for labels, histogram in by_name[name]:
+                    label_text = ",".join(f'{label}="{_escape(value)}"' for label, value in labels)
+                    cumulative = 0
+                    for bound, count in zip(histogram.bounds, histogram.counts):
+                        cumulative += count
+                        le = format(bound, "g") if isinstance(bound, float) else bound
+                        lines.append(f'{metric}_bucket{{{label_text},le="{le}"}} {cumulative}')
+                    lines.append(f'{metric}_bucket{{{label_text},le="+Inf"}} {histogram.count}')
+                    lines.append(f"{metric}_sum{{{label_text}}} {histogram.sum:g}")
+                    lines.append(f"{metric}_count{{{label_text}}} {histogram.count}")
+            if self._errors:
+                lines.append(f"# TYPE {prefix}_errors_total counter")
+                for labels, count in self._errors.items():
+                    label_text = ",".join(f'{label}="{_escape(value)}"' for label, value in labels)
+                    lines.append(f"{prefix}_errors_total{{{label_text}}} {count}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str):
+        """Write prometheus_text() to a file (e.g. for node_exporter's textfile collector)"""
+        try:
+            # Write to a temporary file first so scrapers never read a partial file
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                f.write(self.prometheus_text())
+            os.replace(path + ".tmp", path)
+        except OSError as e:
+            print(f"Could not write metrics file {path}: {e}", file=sys.stderr)
+
+    def start_writer(self, path: str, interval: float = 15.0):
+        """Write the Prometheus file every interval seconds from a daemon thread"""
+        if self._writer is not None:
+            return
+
+        def _loop():
+            while True:
+                time.sleep(interval)
+                self.write_prometheus(path)
+
+        self._writer = threading.Thread(target=_loop, name="metrics-writer", daemon=True)
+        self._writer.start()
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
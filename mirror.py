@@ -0,0 +1,277 @@
+"""
+Local SQLite mirrors of MS Access tables, kept current by incremental syncs
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+from datetime import date, datetime, time as dt_time
+from decimal import Decimal
+
+import anyio
+
+# Datetime columns with names like these are taken to record when a row last changed
+_TIMESTAMP_NAME_PATTERN = re.compile(r"modif|updat|chang|edit|timestamp|last_?saved", re.IGNORECASE)
+
+# Column affinity in the mirror for each friendly column type; text compares
+# case-insensitively there, as it does in Access
+_COLUMN_TYPES = {
+    "integer": "INTEGER",
+    "float": "REAL",
+    "Decimal": "REAL",
+    "boolean": "INTEGER",
+    "binary": "BLOB",
+    "bytearray": "BLOB",
+    "datetime": "TEXT",
+    "date": "TEXT",
+    "text": "TEXT COLLATE NOCASE",
+}
+
+_LITERAL_PATTERN = re.compile(r"'(?:[^']|'')*'")
+_LIKE_PATTERN = re.compile(r"\bLIKE\s*'((?:[^']|'')*)'", re.IGNORECASE)
+_IDENTIFIER_PATTERN = re.compile(r"\[([^\]]+)\]|([A-Za-z_][\w]*)")
+
+# Constructs that SQLite would either reject or, worse, evaluate differently from
+# Access without an error: & is bitwise AND, + adds text as numbers (Access
+# concatenates), / on integers truncates, # dates and "strings" have other
+# meanings, DATE()/TIME() return text, and True/Yes/On are 1 where Access (and
+# the mirror, see _mirror_value) stores -1. ON is only a boolean next to a
+# comparison, elsewhere it is part of a join.
+_ACCESS_ONLY_PATTERN = re.compile(
+    r'[&+#"\\^!/]|\b(TOP|DISTINCTROW|TRANSFORM|PIVOT|DATE\s*\(|TIME\s*\()'
+    r'|\b(TRUE|FALSE|YES|NO)\b|[=<>]\s*(ON|OFF)\b|\b(ON|OFF)\s*[=<>]',
+    re.IGNORECASE,
+)
+
+
+def mirror_compatible(sql_query: str) -> bool:
+    """Check whether a query means the same in SQLite as in Access SQL.
+
+    This is deliberately conservative: queries using Access-only syntax, or syntax
+    whose meaning differs, run against Access. (Unknown functions simply fail in
+    SQLite, and the caller falls back to Access then.)
+    """
+    for pattern in _LIKE_PATTERN.findall(sql_query):
+        # Access wildcards are * ? # [ ; SQLite only knows % and _
+        if any(ch in pattern for ch in "*?#["):
+            return False
+    return not _ACCESS_ONLY_PATTERN.search(_LITERAL_PATTERN.sub("''", sql_query))
+
+
+def referenced_tables(sql_query: str, table_names) -> set:
+    """Return the names from table_names that appear as identifiers in a query"""
+    by_lower = {name.lower(): name for name in table_names}
+    found = set()
+    for bracketed, word in _IDENTIFIER_PATTERN.findall(_LITERAL_PATTERN.sub("''", sql_query)):
+        name = by_lower.get((bracketed or word).lower())
+        if name is not None:
+            found.add(name)
+    return found
+
+
+def choose_sync_mode(schema: dict) -> tuple:
+    """Pick how a table can be synced incrementally, from its get_extended_schema() result.
+
+    Returns ("timestamp", column) for a last-modified datetime column on a table with
+    a primary key (rows are upserted), ("key", column) for a single integer
+    (AutoNumber) primary key (new rows are appended), or ("full", None). Key syncs
+    only see new rows, not changed ones (see Mirror.sync_table).
+    """
+    primary_keys = schema.get("primary_keys") or []
+    if primary_keys:
+        for column in schema["columns"]:
+            if column.get("type") == "datetime" and _TIMESTAMP_NAME_PATTERN.search(column["name"]):
+                return "timestamp", column["name"]
+    if len(primary_keys) == 1:
+        for column in schema["columns"]:
+            if column["name"] == primary_keys[0] and column.get("type") == "integer":
+                return "key", column["name"]
+    return "full", None
+
+
+def _mirror_value(value):
+    if isinstance(value, bool):
+        return -1 if value else 0  # Access stores True as -1
+    if isinstance(value, (datetime, date, dt_time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if value is None or isinstance(value, (int, float, str, bytes)):
+        return value
+    if isinstance(value, (bytearray, memoryview)):
+        return bytes(value)
+    return str(value)
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+class Mirror:
+    """A local SQLite copy of selected tables of one database file.
+
+    Each mirrored table is recorded in a _mirror_tables table with its sync mode,
+    high-water mark, the column list and the signature (mtime/size) of the source
+    file at the last sync. A table is fresh while the source file still has that
+    signature, or for max_age seconds after the sync if max_age is set. Key syncs
+    append new rows but miss updated ones, so they record no signature: such a
+    table is only fresh within max_age, until it is copied in full again.
+    """
+
+    def __init__(self, db_path: str, mirror_dir: str):
+        self.db_path = db_path
+        digest = hashlib.sha256(db_path.lower().encode()).hexdigest()[:16]
+        self.path = os.path.join(mirror_dir, f"{os.path.basename(db_path)}.{digest}.mirror.sqlite")
+        self.tables = {}  # lower-case table name -> metadata dict
+        # One sync at a time per mirror file
+        self.lock = anyio.Lock()
+
+    def load(self):
+        """Read the metadata of the mirrored tables, if the mirror file exists"""
+        if not os.path.exists(self.path):
+            return
+        mirror = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+        try:
+            rows = mirror.execute(
+                "SELECT table_name, mode, sync_column, high_water, columns, signature, synced_at, row_count"
+                " FROM _mirror_tables"
+            ).fetchall()
+        except sqlite3.Error:
+            return
+        finally:
+            mirror.close()
+        self.tables = {
+            row[0].lower(): {
+                "table": row[0],
+                "mode": row[1],
+                "column": row[2],
+                "high_water": json.loads(row[3]),
+                "columns": json.loads(row[4]),
+                "signature": tuple(json.loads(row[5])) if row[5] else None,
+                "synced_at": row[6],
+                "rows": row[7],
+            }
+            for row in rows
+        }
+
+    def is_fresh(self, table_names, signature, max_age: float = 0) -> bool:
+        """Check that all of table_names are mirrored and up to date with the source file"""
+        if not table_names:
+            return False
+        now = time.time()
+        for table_name in table_names:
+            info = self.tables.get(table_name.lower())
+            if info is None:
+                return False
+            if signature is not None and info["signature"] == signature:
+                continue
+            if max_age and now - datetime.fromisoformat(info["synced_at"]).timestamp() <= max_age:
+                continue
+            return False
+        return True
+
+    def sync_table(self, cursor, table_name: str, schema: dict, signature, full_refresh: bool = False,
+                   batch_size: int = 1000) -> dict:
+        """Copy new and changed rows of a table from the source cursor into the mirror.
+
+        Blocking; runs on the source connection's worker thread. Each sync is one
+        transaction in the mirror, so readers never see a half-synced table.
+        Incremental syncs cannot see deleted rows, so the table is copied in full
+        when its row count no longer matches the source (or its columns changed).
+        """
+        started = time.perf_counter()
+        mode, sync_column = choose_sync_mode(schema)
+        columns = [[column["name"], column.get("type")] for column in schema["columns"]]
+        info = self.tables.get(table_name.lower())
+        full = (full_refresh or mode == "full" or info is None or info["columns"] != columns
+                or info["mode"] != mode or info["column"] != sync_column)
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        mirror = sqlite3.connect(self.path, isolation_level=None)
+        try:
+            mirror.execute("PRAGMA journal_mode=WAL")
+            mirror.execute(
+                "CREATE TABLE IF NOT EXISTS _mirror_tables (table_name TEXT PRIMARY KEY COLLATE NOCASE,"
+                " mode TEXT, sync_column TEXT, high_water TEXT, columns TEXT, signature TEXT,"
+                " synced_at TEXT, row_count INTEGER)"
+            )
+            while True:
+                mirror.execute("BEGIN IMMEDIATE")
+                try:
+                    copied = self._copy(cursor, mirror, table_name, schema, columns, mode, sync_column,
+                                        None if full else info["high_water"], batch_size)
+                    row_count = mirror.execute(f"SELECT COUNT(*) FROM {_quote(table_name)}").fetchone()[0]
+                    if not full:
+                        cursor.execute(f"SELECT COUNT(*) FROM [{table_name}]")
+                        if cursor.fetchone()[0] != row_count:
+                            # Rows were deleted (or changed without a newer timestamp)
+                            mirror.execute("ROLLBACK")
+                            full = True
+                            continue
+                    high_water = None
+                    if sync_column is not None:
+                        high_water = mirror.execute(
+                            f"SELECT MAX({_quote(sync_column)}) FROM {_quote(table_name)}"
+                        ).fetchone()[0]
+                    synced_at = datetime.now().isoformat(timespec="seconds")
+                    # Only a full copy or a timestamp sync makes the table match this version of the file
+                    trusted = signature if full or mode == "timestamp" else None
+                    mirror.execute(
+                        "INSERT OR REPLACE INTO _mirror_tables VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (table_name, mode, sync_column, json.dumps(high_water), json.dumps(columns),
+                         json.dumps(list(trusted)) if trusted else None, synced_at, row_count),
+                    )
+                    mirror.execute("COMMIT")
+                    break
+                except BaseException:
+                    if mirror.in_transaction:
+                        mirror.execute("ROLLBACK")
+                    raise
+        finally:
+            mirror.close()
+
+        self.tables[table_name.lower()] = {
+            "table": table_name, "mode": mode, "column": sync_column, "high_water": high_water,
+            "columns": columns, "signature": tuple(trusted) if trusted else None,
+            "synced_at": synced_at, "rows": row_count,
+        }
+        return {
+            "table": table_name,
+            "mode": mode,
+            "full_copy": full,
+            "rows_copied": copied,
+            "rows": row_count,
+            "seconds": time.perf_counter() - started,
+        }
+
+    def _copy(self, cursor, mirror, table_name, schema, columns, mode, sync_column, high_water, batch_size):
+        """Copy rows from the source into the mirror table; returns the number of rows copied"""
+        quoted_table = _quote(table_name)
+        if high_water is None:
+            key = ", ".join(_quote(name) for name in schema.get("primary_keys") or [])
+            definitions = [f"{_quote(name)} {_COLUMN_TYPES.get(column_type, '')}".rstrip()
+                           for name, column_type in columns]
+            if key:
+                definitions.append(f"PRIMARY KEY ({key})")
+            mirror.execute(f"DROP TABLE IF EXISTS {quoted_table}")
+            mirror.execute(f"CREATE TABLE {quoted_table} ({', '.join(definitions)})")
+            cursor.execute(f"SELECT * FROM [{table_name}]")
+        elif mode == "timestamp":
+            # >= so rows changed within the same clock tick as the last sync are not missed
+            cursor.execute(f"SELECT * FROM [{table_name}] WHERE [{sync_column}] >= ?",
+                           [datetime.fromisoformat(high_water)])
+        else:
+            cursor.execute(f"SELECT * FROM [{table_name}] WHERE [{sync_column}] > ?", [high_water])
+
+        names = [column[0] for column in cursor.description]
+        insert_sql = (f"INSERT OR REPLACE INTO {quoted_table} ({', '.join(_quote(name) for name in names)})"
+                      f" VALUES ({', '.join('?' for _ in names)})")
+        copied = 0
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                return copied
+            mirror.executemany(insert_sql, [[_mirror_value(value) for value in row] for row in batch])
+            copied += len(batch)
@@ -0,0 +1,163 @@
+"""
+Paging through MS Access tables: keyset pagination and held-open cursors
+"""
+import base64
+import json
+import sys
+import time
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+import anyio
+
+from executor import PRIORITY_METADATA
+
+
+class PageTokenError(Exception):
+    """Raised for malformed, foreign or expired page tokens"""
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"$d": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"$dec": str(value)}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if "$dt" in value:
+            return datetime.fromisoformat(value["$dt"])
+        if "$d" in value:
+            return date.fromisoformat(value["$d"])
+        if "$dec" in value:
+            return Decimal(value["$dec"])
+    return value
+
+
+def encode_page_token(state: dict) -> str:
+    """Encode paging state as an opaque, URL-safe token"""
+    state = dict(state)
+    if "values" in state:
+        state["values"] = [_encode_value(value) for value in state["values"]]
+    raw = json.dumps(state, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_page_token(token: str) -> dict:
+    """Decode a token produced by encode_page_token"""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        state = json.loads(raw)
+    except Exception:
+        raise PageTokenError("Invalid page token.")
+    if not isinstance(state, dict) or state.get("mode") not in ("keyset", "cursor"):
+        raise PageTokenError("Invalid page token.")
+    if "values" in state:
+        state["values"] = [_decode_value(value) for value in state["values"]]
+    return state
+
+
+def keyset_predicate(key_columns: list, quote) -> tuple:
+    """Build a WHERE clause selecting rows after a key, for a (composite) ordered key.
+
+    For keys (a, b) this is "(a > ?) OR (a = ? AND b > ?)". Returns the clause and,
+    for each placeholder, the index of the key value to bind to it.
+    """
+    clauses = []
+    value_indexes = []
+    for i, column in enumerate(key_columns):
+        parts = [f"{quote(previous)} = ?" for previous in key_columns[:i]]
+        parts.append(f"{quote(column)} > ?")
+        clauses.append("(" + " AND ".join(parts) + ")")
+        value_indexes.extend(range(i + 1))
+    return " OR ".join(clauses), value_indexes
+
+
+class HeldCursors:
+    """Registry of open cursors kept between page requests for tables without a key.
+
+    Each held cursor owns a dedicated connection (not a pooled one) so that a
+    paging session never starves the pool. Cursors are closed when exhausted,
+    after ttl seconds without a request, or when max_cursors is exceeded (oldest first).
+    If an executor is given, the connections must have been opened through it and
+    are closed on their own worker thread.
+    """
+
+    def __init__(self, ttl: float = 300.0, max_cursors: int = 4, executor=None):
+        self.ttl = ttl
+        self.max_cursors = max_cursors
+        self.executor = executor
+        self._entries = {}  # cursor_id -> entry dict
+
+    def __len__(self):
+        return len(self._entries)
+
+    async def add(self, connection, cursor, columns: list, pending: list, table_name: str) -> str:
+        """Register an open cursor and return its id.
+
+        columns are the cursor's column names. pending holds the rows fetched but not
+        yet returned, as value tuples that share columns as their header (see RowSet).
+        """
+        await self.expire()
+        while len(self._entries) >= self.max_cursors:
+            oldest = min(self._entries, key=lambda key: self._entries[key]["expires_at"])
+            await self.close(oldest)
+        cursor_id = uuid.uuid4().hex
+        self._entries[cursor_id] = {
+            "connection": connection,
+            "cursor": cursor,
+            "columns": columns,
+            "pending": pending,
+            "table_name": table_name,
+            "expires_at": time.monotonic() + self.ttl,
+            # Serializes page requests that reuse the same token concurrently
+            "lock": anyio.Lock(),
+        }
+        return cursor_id
+
+    async def get(self, cursor_id: str) -> dict:
+        """Return a held cursor entry and extend its lifetime"""
+        await self.expire()
+        entry = self._entries.get(cursor_id)
+        if entry is None:
+            raise PageTokenError("Page token has expired. Start again from the first page.")
+        entry["expires_at"] = time.monotonic() + self.ttl
+        return entry
+
+    async def expire(self):
+        """Close cursors whose ttl has passed"""
+        now = time.monotonic()
+        for cursor_id in [key for key, entry in self._entries.items() if entry["expires_at"] < now]:
+            await self.close(cursor_id)
+
+    async def close(self, cursor_id: str):
+        entry = self._entries.pop(cursor_id, None)
+        if entry is None:
+            return
+
+        connection = entry["connection"]
+        try:
+            if self.executor is None:
+                def _close():
+                    try:
+                        entry["cursor"].close()
+                    finally:
+                        connection.close()
+
+                await anyio.to_thread.run_sync(_close)
+            else:
+                try:
+                    await self.executor.run(connection, entry["cursor"].close, PRIORITY_METADATA)
+                finally:
+                    await self.executor.close(connection)
+        except Exception as e:
+            print(f"Error closing held cursor: {e}", file=sys.stderr)
+
+    async def close_all(self):
+        for cursor_id in list(self._entries):
+            await self.close(cursor_id)
@@ -0,0 +1,116 @@
+"""
+Query result caching for MS Access databases
+"""
+import re
+import sys
+import time
+from collections import OrderedDict
+
+from rowset import RowSet
+
+# String literals ('...' or "...") and bracketed identifiers are kept verbatim
+_LITERAL_PATTERN = re.compile(r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|\[[^\]]*\])")
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def normalize_sql(sql_query: str) -> str:
+    """Normalize SQL text for use in a cache key.
+
+    Collapses whitespace and lowercases everything outside string literals and
+    bracketed identifiers, and drops a trailing semicolon. Access SQL keywords and
+    identifiers are case-insensitive, so this never merges different queries.
+    """
+    parts = _LITERAL_PATTERN.split(sql_query.strip().rstrip(";").strip())
+    normalized = []
+    for i, part in enumerate(parts):
+        if i % 2:  # captured literal
+            normalized.append(part)
+        else:
+            normalized.append(_WHITESPACE_PATTERN.sub(" ", part).lower())
+    return "".join(normalized)
+
+
+def estimate_size(value) -> int:
+    """Roughly estimate the memory used by a cached value in bytes"""
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    if isinstance(value, RowSet):
+        return sys.getsizeof(value) + estimate_size(value.columns) + estimate_size(value.rows)
+    return sys.getsizeof(value)
+
+
+class ResultCache:
+    """LRU cache of query results with a time-to-live and a memory cap.
+
+    Keys start with the absolute database path so that invalidate() can drop
+    every entry of one database; callers also include the file signature so that
+    entries for an older version of the file are never returned.
+
+    Args:
+        max_bytes: Estimated memory cap for all entries; 0 disables the cache
+        ttl: Seconds an entry stays valid
+    """
+
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024, ttl: float = 300.0):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (value, size, expires_at)
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def get(self, key):
+        """Return the cached value for key, or None on a miss"""
+        if not self.enabled or key is None:
+            return None
+        entry = self._entries.get(key)
+        if entry is None or entry[2] < time.monotonic():
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, value):
+        """Cache a value, evicting least recently used entries to stay under max_bytes"""
+        if not self.enabled or key is None:
+            return
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (value, size, time.monotonic() + self.ttl)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+
+    def invalidate(self, db_path: str = None):
+        """Drop all entries, or only those of one database"""
+        if db_path is None:
+            self._entries.clear()
+            self._bytes = 0
+            return
+        for key in [key for key in self._entries if key[0] == db_path]:
+            self._remove(key)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
@@ -0,0 +1,53 @@
+"""
+Compact result sets: one shared header of column names and a tuple of values per row
+"""
+
+
+def row_values(row) -> tuple:
+    """Values of a driver row as a tuple, binary values as text (like the rest of the output)"""
+    return tuple(str(value) if isinstance(value, (bytes, bytearray)) else value for value in row)
+
+
+class RowSet:
+    """Rows of a query result stored as value tuples under a single tuple of column names.
+
+    A dict per row repeats every column name in every row; here the names are
+    kept once, which makes wide results several times smaller to hold, cache and
+    format. A RowSet acts as a sequence of rows: len(), truthiness and slicing
+    (which returns a RowSet sharing the header) work on it, while indexing or
+    iterating yields dicts, built on demand, for the few places that need one.
+    """
+
+    __slots__ = ("columns", "rows")
+
+    def __init__(self, columns, rows: list = None):
+        self.columns = tuple(columns)
+        self.rows = rows if rows is not None else []
+
+    @classmethod
+    def from_cursor(cls, cursor) -> "RowSet":
+        """An empty RowSet with the columns of an executed cursor"""
+        return cls(column[0] for column in cursor.description)
+
+    def extend(self, rows, convert=row_values):
+        """Append driver rows (or tuples of values), converted to tuples by convert"""
+        self.rows.extend(map(convert, rows))
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __bool__(self) -> bool:
+        return bool(self.rows)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return RowSet(self.columns, self.rows[index])
+        return dict(zip(self.columns, self.rows[index]))
+
+    def __iter__(self):
+        columns = self.columns
+        for values in self.rows:
+            yield dict(zip(columns, values))
+
+    def __repr__(self) -> str:
+        return f"RowSet({len(self.columns)} columns, {len(self.rows)} rows)"
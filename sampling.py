@@ -0,0 +1,87 @@
+"""
+Random samples of large tables in bounded memory: key-range probes and reservoir sampling
+"""
+import math
+import sys
+from itertools import islice
+
+# Keys per IN (...) list in a key-range probe
+KEY_PROBE_BATCH = 200
+# Below this share of used keys in the key range, probing wastes too many queries
+MIN_KEY_DENSITY = 0.05
+
+
+def reservoir_sample(rows, n: int, rng) -> list:
+    """Draw a uniform sample of n items from an iterable of unknown length.
+
+    Uses Li's Algorithm L: only n items are kept, and once the reservoir is
+    full the number of items to pass over before the next replacement is drawn
+    directly, so most items cost nothing but being read.
+    """
+    rows = iter(rows)
+    reservoir = list(islice(rows, n))
+    if len(reservoir) < n or n <= 0:
+        return reservoir
+    w = math.exp(_log_random(rng) / n)
+    while True:
+        skip = math.floor(_log_random(rng) / math.log(1 - w))
+        item = next(islice(rows, skip, None), None)
+        if item is None:
+            return reservoir
+        reservoir[rng.randrange(n)] = item
+        w *= math.exp(_log_random(rng) / n)
+
+
+def _log_random(rng) -> float:
+    # log of a uniform draw from (0, 1); random() can return exactly 0
+    return math.log(rng.random() or sys.float_info.min)
+
+
+def key_range_sample(fetch, low: int, high: int, count: int, n: int, rng, max_rounds: int = 6) -> list:
+    """Sample n rows of a table with an integer key by probing random key values.
+
+    fetch(keys) returns the rows whose key is in keys. Candidate keys are drawn
+    uniformly without replacement from [low, high], oversampled by the estimated
+    share of unused keys (count / key range), so the rows found are a uniform
+    sample of the existing rows. Returns fewer than n rows if the rounds run out
+    (e.g. the key range is very sparse in places).
+    """
+    span = high - low + 1
+    density = count / span if span > 0 else 1.0
+    tried = set()
+    sample = []
+    for attempt in range(max_rounds):
+        needed = n - len(sample)
+        untried = span - len(tried)
+        if needed <= 0 or untried <= 0:
+            break
+        # Oversample more on each retry, as the density estimate was too optimistic
+        want = min(untried, math.ceil(needed / density * 1.25 * 2 ** attempt) + 8)
+        candidates = _draw_keys(low, high, want, tried, rng)
+        found = []
+        for start in range(0, len(candidates), KEY_PROBE_BATCH):
+            found.extend(fetch(candidates[start:start + KEY_PROBE_BATCH]))
+        # Any subset of the hits is still uniform; keep only as many as needed
+        if len(found) > needed:
+            found = rng.sample(found, needed)
+        sample.extend(found)
+    return sample
+
+
+def _draw_keys(low: int, high: int, k: int, exclude: set, rng) -> list:
+    """Draw k distinct integers from [low, high] that are not in exclude, adding them to it"""
+    span = high - low + 1
+    if k >= (span - len(exclude)) // 2:
+        # Dense draw: enumerate what is left
+        remaining = [key for key in range(low, high + 1) if key not in exclude]
+        keys = rng.sample(remaining, min(k, len(remaining)))
+    else:
+        keys = []
+        while len(keys) < k:
+            key = rng.randint(low, high)
+            if key not in exclude:
+                exclude.add(key)
+                keys.append(key)
+        return keys
+    exclude.update(keys)
+    return keys
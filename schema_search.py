@@ -0,0 +1,84 @@
+"""
+Fuzzy search over table, column and linked-table source names with an in-memory trigram index
+"""
+import heapq
+import re
+
+_WORD_PATTERN = re.compile(r"[A-Za-z0-9]+")
+# Word parts of CamelCase and letter/digit runs: "tblCustOrd2019" -> tbl, Cust, Ord, 2019
+_PART_PATTERN = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|[0-9]+")
+
+
+def trigrams(text: str) -> set:
+    """Return the trigrams of a name, pg_trgm style.
+
+    Each word is lower-cased and padded with two spaces in front and one behind,
+    so short words and word starts get trigrams of their own. CamelCase parts and
+    digit runs count as words too, in addition to the words they form.
+    """
+    grams = set()
+    for word in _WORD_PATTERN.findall(text):
+        parts = _PART_PATTERN.findall(word)
+        for part in [word] + (parts if len(parts) > 1 else []):
+            padded = f"  {part.lower()} "
+            grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    """Inverted index from trigrams to named schema entries, ranked by similarity.
+
+    Entries are (kind, table, column, text) where text is the name that is
+    matched: a table, a column of table, or the source name of a linked table.
+    """
+
+    def __init__(self):
+        self.entries = []
+        self._sizes = []  # number of trigrams per entry
+        self._postings = {}  # trigram -> [entry index]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, kind: str, table: str, column: str = None, text: str = None):
+        text = text or column or table
+        grams = trigrams(text)
+        index = len(self.entries)
+        self.entries.append((kind, table, column, text))
+        self._sizes.append(len(grams))
+        for gram in grams:
+            self._postings.setdefault(gram, []).append(index)
+
+    def search(self, query: str, limit: int = 20, kinds=None, min_score: float = 0.3) -> list:
+        """Return up to limit (score, kind, table, column, text), best first.
+
+        The score mixes how much of the query's trigrams a name contains with the
+        trigram similarity of the two, so typos and abbreviations still match.
+        Exact matches score 1; names containing the query as a substring rank
+        above names that merely share trigrams with it.
+        """
+        grams = trigrams(query)
+        if not grams:
+            return []
+        shared = {}
+        for gram in grams:
+            for index in self._postings.get(gram, ()):
+                shared[index] = shared.get(index, 0) + 1
+
+        needle = query.strip().lower()
+        scored = []
+        for index, count in shared.items():
+            kind, table, column, text = self.entries[index]
+            if kinds is not None and kind not in kinds:
+                continue
+            coverage = count / len(grams)
+            similarity = count / (len(grams) + self._sizes[index] - count)
+            score = 0.7 * coverage + 0.3 * similarity
+            lowered = text.lower()
+            if lowered == needle:
+                score = 1.0
+            elif needle and needle in lowered:
+                score = max(score, 0.6 + 0.35 * len(needle) / len(lowered))
+            if score >= min_score:
+                scored.append((round(score, 3), kind, table, column, text))
+        return heapq.nlargest(limit, scored, key=lambda item: (item[0], -len(item[4])))
@@ -0,0 +1,122 @@
+"""
+Schema snapshots of MS Access databases, cached in memory and persisted as JSON
+"""
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime
+
+from catalog_cache import file_signature
+
+
+class SchemaStore:
+    """Per-database cache of table schemas (columns, primary keys, indexes) and column profiles.
+
+    Schemas are valid for one version (mtime/size) of the database file. A complete
+    crawl of all tables is written to snapshot_dir so that a later server start can
+    reload it instead of crawling again, as long as the file has not changed.
+    """
+
+    def __init__(self, snapshot_dir: str = None):
+        self.snapshot_dir = snapshot_dir
+        self._databases = {}  # db_path -> {"signature", "tables", "complete"}
+
+    def snapshot_path(self, db_path: str) -> str:
+        """Path of the snapshot file for a database"""
+        digest = hashlib.sha256(db_path.lower().encode()).hexdigest()[:16]
+        return os.path.join(self.snapshot_dir, f"{os.path.basename(db_path)}.{digest}.schema.json")
+
+    def _entry(self, db_path: str) -> dict:
+        """Return the cache entry for the current version of the file, resetting stale ones"""
+        signature = file_signature(db_path)
+        entry = self._databases.get(db_path)
+        if entry is None or signature is None or entry["signature"] != signature:
+            entry = {"signature": signature, "tables": {}, "profiles": {}, "complete": False}
+            self._databases[db_path] = entry
+        return entry
+
+    def get_table(self, db_path: str, table_name: str):
+        """Return the cached schema of a table, or None"""
+        return self._entry(db_path)["tables"].get(table_name)
+
+    def put_table(self, db_path: str, table_name: str, schema: dict, signature):
+        """Cache the schema of one table, read while the file had the given signature"""
+        entry = self._entry(db_path)
+        if signature is not None and entry["signature"] == signature:
+            entry["tables"][table_name] = schema
+
+    def get_profile(self, db_path: str, table_name: str):
+        """Return the cached column profile of a table, or None"""
+        return self._entry(db_path)["profiles"].get(table_name)
+
+    def put_profile(self, db_path: str, table_name: str, profile: dict, signature):
+        """Cache the column profile of one table, computed while the file had the given signature"""
+        entry = self._entry(db_path)
+        if signature is not None and entry["signature"] == signature:
+            entry["profiles"][table_name] = profile
+
+    def get_database(self, db_path: str):
+        """Return {table: schema} if all tables of the current file version are known, else None"""
+        entry = self._entry(db_path)
+        if entry["complete"]:
+            return entry["tables"]
+        if self.load(db_path):
+            return entry["tables"]
+        return None
+
+    def put_database(self, db_path: str, tables: dict, signature) -> str:
+        """Cache a complete crawl and persist it; returns the snapshot path (or None)"""
+        entry = self._entry(db_path)
+        if signature is None or entry["signature"] != signature:
+            # The file changed during the crawl; the result is already stale
+            return None
+        entry["tables"] = dict(tables)
+        entry["complete"] = True
+        return self.save(db_path)
+
+    def invalidate(self, db_path: str):
+        self._databases.pop(db_path, None)
+
+    def load(self, db_path: str) -> bool:
+        """Load a persisted snapshot if it matches the current file version"""
+        if not self.snapshot_dir:
+            return False
+        path = self.snapshot_path(db_path)
+        if not os.path.exists(path):
+            return False
+        try:
+            with open(path, encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable schema snapshot {path}: {e}", file=sys.stderr)
+            return False
+        entry = self._entry(db_path)
+        if entry["signature"] is None or tuple(snapshot.get("signature") or ()) != entry["signature"]:
+            return False
+        entry["tables"] = snapshot["tables"]
+        entry["complete"] = True
+        return True
+
+    def save(self, db_path: str) -> str:
+        """Write the complete schema of a database to its snapshot file"""
+        if not self.snapshot_dir:
+            return None
+        entry = self._databases[db_path]
+        snapshot = {
+            "db_path": db_path,
+            "signature": list(entry["signature"]),
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "tables": entry["tables"],
+        }
+        path = self.snapshot_path(db_path)
+        try:
+            os.makedirs(self.snapshot_dir, exist_ok=True)
+            # Write to a temporary file first so a crash never leaves a truncated snapshot
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, separators=(",", ":"), default=str)
+            os.replace(path + ".tmp", path)
+        except OSError as e:
+            print(f"Could not write schema snapshot {path}: {e}", file=sys.stderr)
+            return None
+        return path
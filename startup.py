@@ -0,0 +1,48 @@
+"""
+Databases opened when the server starts, from a JSON config file or an environment variable
+"""
+import json
+import os
+
+
+def load_startup_databases(config_path: str = None, databases: str = None) -> list:
+    """Return the databases to open at startup as [{"path", "writable", "describe"}].
+
+    config_path names a JSON file of the form
+        {"databases": ["C:\\data\\a.mdb", {"path": "C:\\data\\b.mdb", "writable": true, "describe": true}]}
+    where writable opens the database in shared writable mode and describe also
+    loads (or crawls) the schema of every table. databases is a list of paths
+    separated by os.pathsep, opened ReadOnly. Entries from both are combined;
+    only the first entry for each file name is kept, since the file name is the
+    conn_id. Raises ValueError if the config file cannot be used.
+    """
+    entries = []
+    if config_path:
+        try:
+            with open(config_path, encoding="utf-8") as f:
+                config = json.load(f)
+        except (OSError, ValueError) as e:
+            raise ValueError(f"Cannot read startup config {config_path}: {e}")
+        items = config.get("databases", []) if isinstance(config, dict) else None
+        if not isinstance(items, list):
+            raise ValueError(f"Startup config {config_path} must be an object with a \"databases\" list")
+        for item in items:
+            if isinstance(item, str):
+                item = {"path": item}
+            if not isinstance(item, dict) or not item.get("path"):
+                raise ValueError(f"Invalid database entry in {config_path}: {item!r}")
+            entries.append({
+                "path": item["path"],
+                "writable": bool(item.get("writable", False)),
+                "describe": bool(item.get("describe", False)),
+            })
+    if databases:
+        entries += [
+            {"path": path.strip(), "writable": False, "describe": False}
+            for path in databases.split(os.pathsep) if path.strip()
+        ]
+
+    unique = {}
+    for entry in entries:
+        unique.setdefault(os.path.basename(entry["path"]), entry)
+    return list(unique.values())
@@ -0,0 +1,55 @@
+"""
+Per-connection LRU of cursors holding prepared statements
+"""
+from collections import OrderedDict
+
+
+class StatementCache:
+    """Open cursors of one connection keyed by statement, least recently used evicted first.
+
+    pyodbc prepares a parameterized statement on its cursor and skips SQLPrepare
+    when the same cursor executes the same SQL text again, so keeping a cursor per
+    statement shape lets repeated queries bind new values without being parsed
+    again. A cursor is checked out while it runs; running the same statement twice
+    at once simply opens a second cursor. Only used from the connection's worker
+    thread.
+    """
+
+    def __init__(self, max_size: int = 32):
+        self.max_size = max_size
+        self._cursors = OrderedDict()  # key -> cursor, most recently used last
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._cursors)
+
+    def checkout(self, key, open_cursor):
+        """Return the cached cursor for key, or a new one from open_cursor()"""
+        cursor = self._cursors.pop(key, None)
+        if cursor is None:
+            self.misses += 1
+            return open_cursor()
+        self.hits += 1
+        return cursor
+
+    def checkin(self, key, cursor):
+        """Keep cursor for the next use of key, closing the least recently used beyond max_size"""
+        previous = self._cursors.pop(key, None)
+        if previous is not None:
+            previous.close()
+        self._cursors[key] = cursor
+        while len(self._cursors) > self.max_size:
+            _, evicted = self._cursors.popitem(last=False)
+            self.evictions += 1
+            evicted.close()
+
+    def close(self):
+        """Close every cached cursor"""
+        while self._cursors:
+            _, cursor = self._cursors.popitem()
+            try:
+                cursor.close()
+            except Exception:
+                pass
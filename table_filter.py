@@ -0,0 +1,129 @@
+"""
+Column selection, filters and ordering for query_table_tool, validated against the table schema
+"""
+from typing import NamedTuple
+
+from value_search import typed_values
+
+# Comparison operators and the number of values each takes (None: a list of one or more)
+OPERATORS = {
+    "=": 1, "<>": 1, "<": 1, "<=": 1, ">": 1, ">=": 1,
+    "like": 1, "not like": 1,
+    "in": None, "not in": None,
+    "between": 2,
+    "is null": 0, "is not null": 0,
+}
+# Access cannot sort on OLE Object columns
+_UNORDERED_TYPES = ("binary", "bytearray")
+
+
+class TableQuery(NamedTuple):
+    """The parts of SELECT <columns> FROM table <where> <order_by>"""
+    columns: list   # schema entries of the selected columns, in the requested order
+    projected: bool  # whether columns is a selection rather than all columns
+    where: str      # "WHERE ..." or ""
+    params: list    # values for the ? placeholders of where
+    order_by: str   # "ORDER BY ..." or ""
+
+
+def _lookup(by_name: dict, name, what: str) -> dict:
+    if not isinstance(name, str) or name.strip("[]").lower() not in by_name:
+        known = ", ".join(column["name"] for column in by_name.values())
+        raise ValueError(f"Unknown column {name!r} in {what}. Columns: {known}")
+    return by_name[name.strip("[]").lower()]
+
+
+def _parameter(column: dict, value):
+    """Convert a filter value given as text to the type of the column (numbers, dates)"""
+    if value is None:
+        raise ValueError(f"Use the 'is null' operator to compare {column['name']} with null.")
+    if isinstance(value, (list, dict)):
+        raise ValueError(f"Expected a single value for {column['name']}, not {value!r}.")
+    if not isinstance(value, str) or column.get("type") in (None, "text", "str"):
+        return value
+    if column["type"] == "boolean":
+        if value.strip().lower() not in ("true", "false", "1", "0", "yes", "no"):
+            raise ValueError(f"Value {value!r} does not fit column {column['name']} (boolean).")
+        return value.strip().lower() in ("true", "1", "yes")
+    typed = typed_values(value)
+    if column["type"] in typed:
+        return typed[column["type"]]
+    if column["type"] in ("integer", "float", "Decimal", "datetime", "date"):
+        raise ValueError(f"Value {value!r} does not fit column {column['name']} ({column['type']}).")
+    return value
+
+
+def build_table_query(schema_columns: list, quote, columns: list = None, where: list = None,
+                      order_by: list = None, tiebreak: list = None) -> TableQuery:
+    """Validate a selection of columns, filters and an ordering against a table's columns.
+
+    schema_columns are the table's columns as reported by Backend.table_columns.
+    where is a list of {"column", "op", "value"} conditions, combined with AND;
+    op is one of OPERATORS (default "="), "in"/"not in" take a list of values and
+    "between" a list of two. Values are passed as parameters, text being converted
+    to the column's type where that is a number or a date. order_by is a list of
+    column names, each optionally followed by ASC or DESC. Columns of tiebreak
+    (the primary key) not already in order_by are appended, so TOP n returns
+    exactly n rows in a repeatable order. Raises ValueError for anything invalid.
+    """
+    by_name = {column["name"].lower(): column for column in schema_columns}
+
+    selected = list(schema_columns)
+    if columns:
+        selected = [_lookup(by_name, name, "columns") for name in columns]
+        if len({column["name"] for column in selected}) < len(selected):
+            raise ValueError("A column is selected more than once.")
+
+    conditions = []
+    params = []
+    for condition in where or []:
+        if not isinstance(condition, dict) or "column" not in condition:
+            raise ValueError(f"Each where condition must be an object like "
+                             f"{{\"column\": \"City\", \"op\": \"=\", \"value\": \"Paris\"}}, not {condition!r}.")
+        column = _lookup(by_name, condition["column"], "where")
+        op = str(condition.get("op", "=")).strip().lower()
+        if op == "!=":
+            op = "<>"
+        if op not in OPERATORS:
+            raise ValueError(f"Unknown operator {condition.get('op')!r}. Use one of: {', '.join(OPERATORS)}")
+        arity = OPERATORS[op]
+        name = quote(column["name"])
+        value = condition.get("value")
+        if arity == 0:
+            conditions.append(f"{name} {op.upper()}")
+        elif arity is None or arity == 2:
+            if not isinstance(value, list) or not value or (arity == 2 and len(value) != 2):
+                expected = "a list of two values" if arity == 2 else "a non-empty list of values"
+                raise ValueError(f"'{op}' on {column['name']} takes {expected}.")
+            if arity == 2:
+                conditions.append(f"{name} BETWEEN ? AND ?")
+            else:
+                conditions.append(f"{name} {op.upper()} ({', '.join('?' * len(value))})")
+            params.extend(_parameter(column, item) for item in value)
+        else:
+            like = op.endswith("like")
+            conditions.append(f"{name} {op.upper()} ?")
+            params.append(str(value) if like and value is not None else _parameter(column, value))
+
+    terms = []
+    ordered = set()
+    for item in order_by or []:
+        parts = str(item).strip().rsplit(None, 1)
+        direction = ""
+        if len(parts) == 2 and parts[1].upper() in ("ASC", "DESC"):
+            item, direction = parts[0], parts[1].upper()
+        column = _lookup(by_name, item, "order_by")
+        if column.get("type") in _UNORDERED_TYPES:
+            raise ValueError(f"Cannot order by {column['name']} ({column['type']}).")
+        terms.append(quote(column["name"]) + (f" {direction}" if direction else ""))
+        ordered.add(column["name"])
+    if terms:
+        terms += [quote(name) for name in tiebreak or [] if name not in ordered]
+
+    return TableQuery(
+        columns=selected,
+        projected=bool(columns),
+        where=f"WHERE {' AND '.join(conditions)}" if conditions else "",
+        params=params,
+        order_by=f"ORDER BY {', '.join(terms)}" if terms else "",
+    )
@@ -0,0 +1,74 @@
+"""
+Shared fixtures: SQLite databases (through SQLiteBackend) opened with the MCP tools
+"""
+import os
+import sqlite3
+import tempfile
+
+import pytest
+
+# Keep schema snapshots, mirrors, exports and job results of the tests out of the
+# user's directories; Access reads these when it is imported
+_scratch = tempfile.mkdtemp(prefix="mcp_access_tests_")
+for _name in ("SCHEMA_SNAPSHOT_PATH", "MIRROR_PATH", "EXPORT_PATH", "JOBS_PATH"):
+    os.environ[_name] = os.path.join(_scratch, _name.lower())
+for _name in ("CLAUDE_LOCAL_FILES_PATH", "ACCESS_STARTUP_CONFIG", "ACCESS_STARTUP_DATABASES", "METRICS_FILE"):
+    os.environ.pop(_name, None)
+
+import Access  # noqa: E402
+
+CUSTOMERS = [(i, f"Customer {i}", "Paris" if i % 3 == 0 else "Lyon", i % 2 == 0) for i in range(1, 41)]
+ORDERS = [(i, 1 + i % 40, round(10.5 * i, 2), f"2024-01-{1 + i % 28:02d} 12:00:00") for i in range(1, 201)]
+
+
+def create_database(path) -> str:
+    """Create a small sales database: Customers (AutoNumber key), Orders (last-modified column), Notes (no key)"""
+    connection = sqlite3.connect(path)
+    connection.executescript(
+        """
+        CREATE TABLE Customers (CustomerID INTEGER PRIMARY KEY, Name TEXT(50), City TEXT(50), Active BOOLEAN);
+        CREATE TABLE Orders (OrderID INTEGER PRIMARY KEY, CustomerID INTEGER, Amount REAL, Modified DATETIME);
+        CREATE TABLE Notes (Body TEXT(100));
+        """
+    )
+    connection.executemany("INSERT INTO Customers VALUES (?, ?, ?, ?)", CUSTOMERS)
+    connection.executemany("INSERT INTO Orders VALUES (?, ?, ?, ?)", ORDERS)
+    connection.executemany("INSERT INTO Notes VALUES (?)", [("first",), ("second",)])
+    connection.commit()
+    connection.close()
+    return str(path)
+
+
+def write(path, sql: str, params=()):
+    """Change the database file from outside the server, as another Access user would"""
+    connection = sqlite3.connect(path)
+    connection.execute(sql, params)
+    connection.commit()
+    connection.close()
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return create_database(tmp_path / "sales.db")
+
+
+@pytest.fixture
+async def open_db(db_path):
+    """Connect a database with the connect tool (pass writable=True for write access).
+
+    Every connection is closed with the disconnect tool after the test.
+    """
+    async def _open(writable: bool = False, path: str = db_path) -> str:
+        message = await Access.connect(path, writable=writable)
+        assert message.startswith("Successfully connected"), message
+        return os.path.basename(path)
+
+    yield _open
+    for conn_id in list(Access.connections):
+        await Access.disconnect(conn_id)
+    Access.result_cache.invalidate()
@@ -0,0 +1,52 @@
+"""
+execute_batch_tool: many statements or parameter sets in one call, writes ordered between reads
+"""
+import pytest
+
+import Access
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_statements_report_in_order(open_db):
+    conn_id = await open_db()
+    output = await Access.execute_batch_tool(conn_id, statements=[
+        "SELECT COUNT(*) AS n FROM Customers",
+        "SELECT Name FROM Customers WHERE CustomerID = 3",
+        "SELECT * FROM NoSuchTable",
+    ], output_format="csv")
+    sections = output.split("--- Statement ")[1:]
+    assert [section.split(":", 1)[0] for section in sections] == ["1", "2", "3"]
+    assert "n\n40" in sections[0]
+    assert "Customer 3" in sections[1]
+    assert "SQL Error" in sections[2]
+
+
+async def test_parameter_sets(open_db):
+    conn_id = await open_db()
+    output = await Access.execute_batch_tool(
+        conn_id, sql_query="SELECT Name FROM Customers WHERE CustomerID = ?",
+        param_sets=[[5], [6], [7]], output_format="csv",
+    )
+    for customer_id in (5, 6, 7):
+        assert f"with params [{customer_id}]\nName\nCustomer {customer_id}" in output
+
+
+async def test_writes_separate_the_reads_around_them(open_db):
+    conn_id = await open_db(writable=True)
+    output = await Access.execute_batch_tool(conn_id, statements=[
+        "SELECT COUNT(*) AS n FROM Notes",
+        "INSERT INTO Notes VALUES ('third')",
+        "SELECT COUNT(*) AS n FROM Notes",
+    ], output_format="csv")
+    first, write, second = output.split("--- Statement ")[1:]
+    assert "n\n2" in first
+    assert "Rows affected: 1" in write
+    assert "n\n3" in second
+
+
+async def test_invalid_batches(open_db):
+    conn_id = await open_db()
+    assert "ReadOnly" in await Access.execute_batch_tool(conn_id, statements=["DELETE FROM Notes"])
+    assert "not both" in await Access.execute_batch_tool(conn_id, statements=["SELECT 1"], sql_query="SELECT ?")
+    assert "No statements" in await Access.execute_batch_tool(conn_id)
@@ -0,0 +1,54 @@
+"""
+bulk_insert_tool: rows from JSON, CSV or NDJSON inserted in committed batches
+"""
+import json
+
+import pytest
+
+import Access
+
+pytestmark = pytest.mark.anyio
+
+
+async def count_notes(conn_id: str) -> str:
+    return await Access.execute_sql_tool(conn_id, "SELECT COUNT(*) AS n FROM Notes", output_format="csv")
+
+
+async def test_insert_formats(open_db, tmp_path):
+    conn_id = await open_db(writable=True)
+    rows = json.dumps([{"Body": f"json {i}"} for i in range(25)])
+    assert "Inserted 25 rows into 'Notes'" in await Access.bulk_insert_tool(conn_id, "Notes", data=rows, batch_size=10)
+
+    assert "Inserted 2 rows" in await Access.bulk_insert_tool(conn_id, "Notes", data="Body\ncsv 1\ncsv 2\n",
+                                                              data_format="csv")
+    path = tmp_path / "notes.ndjson"
+    path.write_text('{"Body": "ndjson 1"}\n{"Body": "ndjson 2"}\n{"Body": "ndjson 3"}\n')
+    assert "Inserted 3 rows" in await Access.bulk_insert_tool(conn_id, "Notes", file_path=str(path))
+    assert "n\n32" in await count_notes(conn_id)
+
+
+async def test_earlier_batches_stay_committed(open_db):
+    conn_id = await open_db(writable=True)
+    rows = [[100 + i, f"New {i}", "Nice", True] for i in range(5)] + [[1, "Duplicate", "Nice", False]]
+    output = await Access.bulk_insert_tool(conn_id, "Customers", data=json.dumps(rows), batch_size=2,
+                                           columns=["CustomerID", "Name", "City", "Active"])
+    assert "UNIQUE constraint failed" in output
+    assert "4 rows were committed before the error" in output
+    assert "n\n44" in await Access.execute_sql_tool(conn_id, "SELECT COUNT(*) AS n FROM Customers",
+                                                   output_format="csv")
+
+
+async def test_inserted_rows_invalidate_cached_results(open_db):
+    conn_id = await open_db(writable=True)
+    assert "n\n2" in await count_notes(conn_id)
+    await Access.bulk_insert_tool(conn_id, "Notes", data='[{"Body": "x"}]')
+    assert "n\n3" in await count_notes(conn_id)
+
+
+async def test_invalid_calls(open_db):
+    conn_id = await open_db()
+    assert "ReadOnly" in await Access.bulk_insert_tool(conn_id, "Notes", data='[{"Body": "x"}]')
+    await Access.disconnect(conn_id)
+    conn_id = await open_db(writable=True)
+    assert "exactly one of data or file_path" in await Access.bulk_insert_tool(conn_id, "Notes")
+    assert "No rows to insert" in await Access.bulk_insert_tool(conn_id, "Notes", data="[]")
@@ -0,0 +1,54 @@
+"""
+Result, catalog and schema caches: reads are cached until a write makes them stale
+"""
+import pytest
+
+import Access
+from conftest import write
+
+pytestmark = pytest.mark.anyio
+
+TOTAL = "SELECT SUM(Amount) AS total FROM Orders WHERE CustomerID = ?"
+
+
+async def test_repeated_read_is_served_from_cache(open_db):
+    conn_id = await open_db()
+    first = await Access.execute_sql_tool(conn_id, TOTAL, params=[5])
+    hits = Access.result_cache.stats()["hits"]
+    assert await Access.execute_sql_tool(conn_id, TOTAL, params=[5]) == first
+    assert Access.result_cache.stats()["hits"] == hits + 1
+
+
+async def test_write_through_tool_invalidates_results(open_db):
+    conn_id = await open_db(writable=True)
+    assert "Name: Customer 7" in await Access.execute_sql_tool(conn_id, "SELECT Name FROM Customers WHERE CustomerID = 7")
+    await Access.execute_sql_tool(conn_id, "UPDATE Customers SET Name = 'Renamed' WHERE CustomerID = 7")
+    assert "Name: Renamed" in await Access.execute_sql_tool(conn_id, "SELECT Name FROM Customers WHERE CustomerID = 7")
+
+
+async def test_write_by_other_user_invalidates_results(open_db, db_path):
+    conn_id = await open_db()
+    before = await Access.query_table_tool(conn_id, "Notes", limit=10)
+    write(db_path, "INSERT INTO Notes VALUES ('third')")
+    after = await Access.query_table_tool(conn_id, "Notes", limit=10)
+    assert "third" not in before
+    assert "third" in after
+
+
+async def test_ddl_invalidates_catalog_and_schema(open_db):
+    conn_id = await open_db(writable=True)
+    assert "Invoices" not in await Access.list_tables_tool(conn_id)
+    assert "Region" not in await Access.get_table_schema_tool(conn_id, "Customers")
+
+    await Access.execute_sql_tool(conn_id, "CREATE TABLE Invoices (InvoiceID INTEGER PRIMARY KEY)")
+    await Access.execute_sql_tool(conn_id, "ALTER TABLE Customers ADD COLUMN Region TEXT(20)")
+
+    assert "Invoices" in await Access.list_tables_tool(conn_id)
+    assert "Region" in await Access.get_table_schema_tool(conn_id, "Customers")
+
+
+async def test_catalog_follows_changes_by_other_users(open_db, db_path):
+    conn_id = await open_db()
+    assert "Archive" not in await Access.list_tables_tool(conn_id)
+    write(db_path, "CREATE TABLE Archive (ID INTEGER PRIMARY KEY)")
+    assert "Archive" in await Access.list_tables_tool(conn_id)
@@ -0,0 +1,120 @@
+"""
+Connection pool: connections are returned, rolled back or discarded after errors
+"""
+import contextlib
+import sqlite3
+
+import anyio
+import pytest
+
+import Access
+from connection_pool import ConnectionPool, PoolClosedError, PoolExhaustedError
+
+pytestmark = pytest.mark.anyio
+
+
+def sqlite_pool(db_path, **options) -> ConnectionPool:
+    async def _connect():
+        return sqlite3.connect(db_path, check_same_thread=False)
+    return ConnectionPool(_connect, **options)
+
+
+async def test_connection_is_returned_after_error(db_path):
+    pool = sqlite_pool(db_path, min_size=1, max_size=2)
+    await pool.open()
+    with pytest.raises(sqlite3.OperationalError):
+        async with pool.connection() as connection:
+            connection.execute("SELECT * FROM NoSuchTable")
+    assert pool.stats()["in_use"] == 0
+    async with pool.connection() as again:
+        assert again is connection
+        assert again.execute("SELECT COUNT(*) FROM Customers").fetchone()[0] == 40
+    await pool.close()
+
+
+async def test_failed_checkout_rolls_back(db_path):
+    pool = sqlite_pool(db_path, min_size=1, max_size=1)
+    with pytest.raises(RuntimeError):
+        async with pool.connection() as connection:
+            connection.execute("DELETE FROM Customers")
+            raise RuntimeError("tool failed half-way")
+    async with pool.connection() as connection:
+        assert connection.execute("SELECT COUNT(*) FROM Customers").fetchone()[0] == 40
+    await pool.close()
+
+
+async def test_broken_connection_is_discarded(db_path):
+    pool = sqlite_pool(db_path, min_size=0, max_size=1)
+    with pytest.raises(sqlite3.ProgrammingError):
+        async with pool.connection() as connection:
+            connection.close()
+            connection.execute("SELECT 1")
+    assert pool.stats()["size"] == 0
+    async with pool.connection() as replacement:
+        assert replacement is not connection
+        replacement.execute("SELECT 1")
+    await pool.close()
+
+
+async def test_checkout_waits_for_a_free_connection(db_path):
+    pool = sqlite_pool(db_path, min_size=0, max_size=1, acquire_timeout=0.2)
+    async with pool.connection():
+        with pytest.raises(PoolExhaustedError, match="All 1 pooled connections"):
+            async with pool.connection():
+                pass
+    async with pool.connection():
+        pass
+    await pool.close()
+    with pytest.raises(PoolClosedError):
+        async with pool.connection():
+            pass
+
+
+async def test_tool_errors_leave_the_pool_usable(open_db):
+    conn_id = await open_db(writable=True)
+    pool = Access.connections[conn_id]['pool']
+    for _ in range(pool.max_size + 2):
+        assert (await Access.execute_sql_tool(conn_id, "SELECT * FROM NoSuchTable")).startswith("SQL Error")
+        assert "Error" in await Access.execute_sql_tool(conn_id, "INSERT INTO Customers VALUES (1, 'x', 'y', 0)")
+    assert pool.stats()["in_use"] == 0
+    assert "Rows affected: 1" in await Access.execute_sql_tool(
+        conn_id, "INSERT INTO Customers VALUES (41, 'New', 'Nice', 1)"
+    )
+
+
+async def test_exhausted_pool_is_not_reported_as_query_timeout(open_db, monkeypatch):
+    conn_id = await open_db()
+    pool = Access.connections[conn_id]['pool']
+    monkeypatch.setattr(pool, "acquire_timeout", 0.1)
+    async with contextlib.AsyncExitStack() as stack:
+        for _ in range(pool.max_size):
+            await stack.enter_async_context(pool.connection())
+        output = await Access.execute_sql_tool(conn_id, "SELECT COUNT(*) FROM Customers")
+    assert f"All {pool.max_size} pooled connections stayed in use" in output
+    assert "timeout" not in output.lower()
+    assert "COUNT(*): 40" in await Access.execute_sql_tool(conn_id, "SELECT COUNT(*) FROM Customers")
+
+
+async def test_concurrent_first_use_opens_one_pool(db_path):
+    workers = Access.executor.stats()["workers"]
+    pools = []
+
+    async def _open():
+        pools.append(await Access.get_pool(db_path))
+
+    async with anyio.create_task_group() as tg:
+        for _ in range(6):
+            tg.start_soon(_open)
+    assert len(pools) == 6
+    assert len({id(pool) for pool in pools}) == 1
+    assert Access.executor.stats()["workers"] == workers + pools[0].stats()["size"]
+    await Access.close_pool(pools[0])
+    assert Access.executor.stats()["workers"] == workers
+
+
+async def test_failed_open_is_not_registered(tmp_path):
+    workers = Access.executor.stats()["workers"]
+    with pytest.raises(sqlite3.OperationalError):
+        await Access.get_pool(str(tmp_path / "missing.db"))
+    assert not any(path.startswith(str(tmp_path)) for path, _ in Access.pools)
+    assert Access.executor.stats()["workers"] == workers
@@ -0,0 +1,104 @@
+"""
+DBExecutor: one worker thread per connection, bounded concurrency admitted by priority
+"""
+import threading
+import time
+
+import anyio
+import pytest
+
+from executor import PRIORITY_METADATA, PRIORITY_QUERY, DBExecutor, PriorityLimiter
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeConnection:
+    def __init__(self):
+        self.thread = threading.get_ident()
+        self.closed_on = None
+
+    def close(self):
+        self.closed_on = threading.get_ident()
+
+
+class Resource:
+    closed = False
+
+    def close(self):
+        self.closed = True
+
+
+async def test_waiters_are_served_by_priority():
+    limiter = PriorityLimiter(1)
+    await limiter.acquire()
+    order = []
+
+    async def _wait(name, priority):
+        await limiter.acquire(priority)
+        order.append(name)
+        limiter.release()
+
+    async def _give_up(scope):
+        with scope:
+            await _wait("cancelled", PRIORITY_METADATA)
+
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(_wait, "query 1", PRIORITY_QUERY)
+        await anyio.sleep(0.01)
+        give_up = anyio.CancelScope()
+        tg.start_soon(_give_up, give_up)
+        tg.start_soon(_wait, "metadata", PRIORITY_METADATA)
+        await anyio.sleep(0.01)
+        give_up.cancel()
+        tg.start_soon(_wait, "query 2", PRIORITY_QUERY)
+        await anyio.sleep(0.01)
+        assert limiter.waiting() == {PRIORITY_QUERY: 2, PRIORITY_METADATA: 1}
+        limiter.release()
+    assert order == ["metadata", "query 1", "query 2"]
+    assert limiter.borrowed_tokens == 0
+
+
+async def test_calls_run_on_the_connections_own_thread():
+    executor = DBExecutor(max_concurrency=4)
+    first = await executor.connect(FakeConnection)
+    second = await executor.connect(FakeConnection)
+    assert first.thread != second.thread != threading.get_ident()
+    for _ in range(3):
+        assert await executor.run(first, threading.get_ident) == first.thread
+        assert await executor.run(second, threading.get_ident) == second.thread
+
+    resource = executor.local(first)["statements"] = Resource()
+    assert executor.locals("statements") == [resource]
+    await executor.close(first)
+    assert resource.closed and first.closed_on == first.thread
+    with pytest.raises(RuntimeError, match="not opened through this executor"):
+        await executor.run(first, threading.get_ident)
+    with pytest.raises(ZeroDivisionError):
+        await executor.run(second, lambda: 1 / 0)
+    await executor.close(second)
+    assert executor.stats()["workers"] == 0
+
+
+async def test_concurrency_is_bounded():
+    executor = DBExecutor(max_concurrency=2)
+    connections = [await executor.connect(FakeConnection) for _ in range(5)]
+    lock = threading.Lock()
+    running = [0, 0]  # now, most at once
+
+    def _work():
+        with lock:
+            running[0] += 1
+            running[1] = max(running)
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+
+    async with anyio.create_task_group() as tg:
+        for connection in connections:
+            tg.start_soon(executor.run, connection, _work)
+        await anyio.sleep(0.005)
+        stats = executor.stats()
+        assert stats["running"] == 2 and stats["waiting_query"] == 3
+    assert running == [0, 2]
+    for connection in connections:
+        await executor.close(connection)
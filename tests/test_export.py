@@ -0,0 +1,113 @@
+"""
+Exports: tables and queries streamed to CSV, NDJSON or Parquet files, with checksums and a manifest
+"""
+import csv
+import hashlib
+import json
+import os
+import re
+
+import pytest
+
+import Access
+from conftest import CUSTOMERS, ORDERS
+
+pytestmark = pytest.mark.anyio
+
+
+def sha256_of(path) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def exported_path(output: str) -> str:
+    return re.search(r"Exported \d+ rows to (.+?) \(", output).group(1)
+
+
+async def test_csv_export_of_a_table(open_db):
+    conn_id = await open_db()
+    output = await Access.export_tool(conn_id, "Customers")
+    path = exported_path(output)
+    assert path == os.path.join(Access.EXPORT_PATH, "sales", "Customers.csv")
+    assert output.startswith("Exported 40 rows to ")
+    assert output.endswith(f"SHA-256: {sha256_of(path)}")
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["CustomerID", "Name", "City", "Active"]
+    assert [(int(i), name, city) for i, name, city, _ in rows[1:]] == [row[:3] for row in CUSTOMERS]
+    assert not os.path.exists(path + ".partial")
+
+
+async def test_ndjson_export_of_a_query(open_db, tmp_path):
+    conn_id = await open_db()
+    path = tmp_path / "orders.ndjson"
+    output = await Access.export_tool(conn_id, sql_query="SELECT OrderID, Amount, Modified FROM Orders WHERE OrderID"
+                                      " <= ?", params=[3], file_path=str(path), export_format="ndjson")
+    assert output.startswith(f"Exported 3 rows to {path} ")
+    assert [json.loads(line) for line in path.read_text().splitlines()] == [
+        {"OrderID": order_id, "Amount": amount, "Modified": modified} for order_id, _, amount, modified in ORDERS[:3]
+    ]
+
+
+async def test_parquet_columns_are_typed_from_their_first_values(open_db, tmp_path, monkeypatch):
+    parquet = pytest.importorskip("pyarrow.parquet")
+    monkeypatch.setattr(Access, "FETCH_BATCH_SIZE", 10)
+    conn_id = await open_db()
+    path = tmp_path / "orders.parquet"
+    # The first batch holds only Nulls in Amount
+    output = await Access.export_tool(
+        conn_id, sql_query="SELECT OrderID, CASE WHEN OrderID > 15 THEN Amount END AS Amount FROM Orders",
+        file_path=str(path), export_format="parquet",
+    )
+    assert output.endswith(f"SHA-256: {sha256_of(path)}")
+    table = parquet.read_table(path)
+    assert str(table.schema.field("Amount").type) == "double"
+    assert table.column("Amount").to_pylist() == [None] * 15 + [amount for _, _, amount, _ in ORDERS[15:]]
+
+
+async def test_failed_export_leaves_no_file(open_db, tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    monkeypatch.setattr(Access, "FETCH_BATCH_SIZE", 10)
+    conn_id = await open_db()
+    path = tmp_path / "exports" / "mixed.parquet"
+    path.parent.mkdir()
+    output = await Access.export_tool(
+        conn_id, sql_query="SELECT CASE WHEN OrderID <= 50 THEN OrderID ELSE 'text' END AS Value FROM Orders",
+        file_path=str(path), export_format="parquet",
+    )
+    assert "Column 'Value' has a value that is not int64" in output
+    assert os.listdir(path.parent) == []
+
+
+async def test_database_export_and_manifest(open_db, tmp_path):
+    conn_id = await open_db()
+    output = await Access.export_database_tool(conn_id, directory=str(tmp_path), export_format="ndjson")
+    assert output.startswith(f"Exported 3 of 3 tables of {conn_id} to {tmp_path}")
+    with open(tmp_path / "manifest.json", encoding="utf-8") as f:
+        manifest = json.load(f)
+    assert manifest["format"] == "ndjson"
+    assert manifest["database"] == Access.connections[conn_id]['db_path']
+    entries = {entry["table"]: entry for entry in manifest["tables"]}
+    assert {table: entry["rows"] for table, entry in entries.items()} == {"Customers": 40, "Orders": 200, "Notes": 2}
+    for entry in entries.values():
+        path = tmp_path / entry["file"]
+        assert entry["bytes"] == path.stat().st_size
+        assert entry["sha256"] == sha256_of(path)
+        assert len(path.read_text().splitlines()) == entry["rows"]
+
+    output = await Access.export_database_tool(conn_id, tables=["[Notes]"])
+    with open(os.path.join(Access.EXPORT_PATH, "sales", "manifest.json"), encoding="utf-8") as f:
+        assert [entry["table"] for entry in json.load(f)["tables"]] == ["Notes"]
+    assert "Exported 1 of 1 tables" in output
+
+
+async def test_invalid_exports(open_db):
+    conn_id = await open_db()
+    assert "Only SELECT queries" in await Access.export_tool(conn_id, sql_query="DELETE FROM Notes")
+    assert "exactly one of table_name or sql_query" in await Access.export_tool(conn_id)
+    assert "Unknown export_format 'xlsx'" in await Access.export_tool(conn_id, "Notes", export_format="xlsx")
+    assert "Table(s) not found in sales.db: Invoices" in await Access.export_database_tool(conn_id,
+                                                                                          tables=["Invoices"])
+    assert (await Access.export_tool(conn_id, "NoSuchTable")).startswith("SQL Error: no such table")
+    path = os.path.join(Access.EXPORT_PATH, "sales", "NoSuchTable.csv")
+    assert not os.path.exists(path) and not os.path.exists(path + ".partial")
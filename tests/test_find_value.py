@@ -0,0 +1,54 @@
+"""
+find_value_tool: concurrent probes of every table that fits the value, stopping at max_hits
+"""
+import csv
+import io
+from collections import Counter
+
+import pytest
+
+import Access
+
+pytestmark = pytest.mark.anyio
+
+
+def parse_hits(output: str) -> tuple:
+    summary, _, body = output.partition("\n\n")
+    return summary, list(csv.DictReader(io.StringIO(body)))
+
+
+async def test_text_and_number_values(open_db):
+    conn_id = await open_db()
+    summary, hits = parse_hits(await Access.find_value_tool(conn_id, "Customer 7", output_format="csv"))
+    assert summary.startswith("1 matching rows for 'Customer 7'")
+    assert (hits[0]["table"], hits[0]["column"]) == ("Customers", "Name")
+    assert hits[0]["row"].startswith("CustomerID=7; Name=Customer 7")
+
+    summary, hits = parse_hits(await Access.find_value_tool(conn_id, "7", max_hits=50, output_format="csv"))
+    # CustomerID 7, OrderID 7, and the five orders of customer 7
+    assert Counter((hit["table"], hit["column"]) for hit in hits) == {
+        ("Customers", "CustomerID"): 1, ("Orders", "OrderID"): 1, ("Orders", "CustomerID"): 5,
+    }
+
+
+async def test_contains_stops_at_max_hits(open_db):
+    conn_id = await open_db()
+    summary, hits = parse_hits(await Access.find_value_tool(conn_id, "ustomer 1", contains=True, max_hits=50,
+                                                            output_format="csv"))
+    assert len(hits) == 11 and "more matches may exist" not in summary
+
+    summary, hits = parse_hits(await Access.find_value_tool(conn_id, "ustomer 1", contains=True, max_hits=3,
+                                                            output_format="csv"))
+    assert len(hits) == 3
+    assert "Stopped after max_hits=3 rows; more matches may exist." in summary
+
+
+async def test_tables_filter(open_db):
+    conn_id = await open_db()
+    summary, hits = parse_hits(await Access.find_value_tool(conn_id, "7", tables=["[Orders]"], max_hits=50,
+                                                            output_format="csv"))
+    assert {hit["table"] for hit in hits} == {"Orders"}
+    assert "of 1 tables" in summary
+    assert "Table(s) not found: Invoices" in await Access.find_value_tool(conn_id, "7", tables=["Invoices"])
+    assert "No rows containing 'nowhere' found." in await Access.find_value_tool(conn_id, "nowhere")
+    assert "must not be empty" in await Access.find_value_tool(conn_id, "  ")
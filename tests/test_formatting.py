@@ -0,0 +1,74 @@
+"""
+format_rows: every layout of OUTPUT_FORMATS, and a character budget that only admits whole rows
+"""
+import json
+from datetime import datetime
+
+import pytest
+
+from formatting import OUTPUT_FORMATS, format_rows
+from rowset import RowSet
+
+ROWS = RowSet(("ID", "Name", "Seen"), [
+    (1, "plain", datetime(2024, 1, 2, 3, 4, 5)),
+    (2, 'a, "quoted"\nline', None),
+    (3, "pipe | cell", datetime(2024, 2, 1)),
+])
+
+
+def test_layouts():
+    assert format_rows(ROWS, "vertical").text.startswith(
+        "1. row\nID: 1\nName: plain\nSeen: 2024-01-02T03:04:05\n\n2. row\nID: 2\n"
+    )
+    assert format_rows(ROWS, "csv").text == (
+        'ID,Name,Seen\n1,plain,2024-01-02T03:04:05\n2,"a, ""quoted""\nline",\n3,pipe | cell,2024-02-01T00:00:00\n'
+    )
+    assert format_rows(ROWS, "markdown").text.splitlines() == [
+        "| ID | Name | Seen |",
+        "| --- | --- | --- |",
+        "| 1 | plain | 2024-01-02T03:04:05 |",
+        '| 2 | a, "quoted"\\nline | NULL |',
+        "| 3 | pipe \\| cell | 2024-02-01T00:00:00 |",
+    ]
+    assert [json.loads(line) for line in format_rows(ROWS, "jsonl").text.splitlines()] == [
+        {"ID": 1, "Name": "plain", "Seen": "2024-01-02T03:04:05"},
+        {"ID": 2, "Name": 'a, "quoted"\nline', "Seen": None},
+        {"ID": 3, "Name": "pipe | cell", "Seen": "2024-02-01T00:00:00"},
+    ]
+    assert format_rows(ROWS, "table").text.splitlines() == [
+        "ID | Name              | Seen",
+        "---+-------------------+--------------------",
+        "1  | plain             | 2024-01-02T03:04:05",
+        '2  | a, "quoted"\\nline | NULL',
+        "3  | pipe | cell       | 2024-02-01T00:00:00",
+    ]
+
+
+def test_dict_rows_are_accepted():
+    rows = [{"ID": 1, "Name": "x"}, {"ID": 2, "Name": "y"}]
+    assert format_rows(rows, "csv").text == "ID,Name\n1,x\n2,y\n"
+    assert format_rows([], "csv").text == ""
+
+
+@pytest.mark.parametrize("output_format", OUTPUT_FORMATS)
+def test_budget_admits_only_whole_rows(output_format):
+    rows = RowSet(("ID", "Text"), [(i, "x" * (i % 7)) for i in range(200)])
+    full = format_rows(rows, output_format)
+    assert full.rows == 200
+    assert full.chars == len(full.text) and full.bytes == len(full.text.encode("utf-8"))
+    for budget in (0, 10, 57, 300, 1000, full.chars - 1, full.chars):
+        limited = format_rows(rows, output_format, max_chars=budget)
+        assert limited.chars <= budget
+        assert limited.rows < 200 or budget == full.chars
+        if output_format != "table":
+            # Widths of the table layout depend on the rows shown, so only other layouts are prefixes
+            assert full.text.startswith(limited.text)
+        if limited.rows and output_format != "table":
+            # One more row would not have fit (the table layout estimates padded lines conservatively)
+            more = format_rows(RowSet(rows.columns, rows.rows[:limited.rows + 1]), output_format)
+            assert limited.rows == 200 or more.chars > budget
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError, match="Unknown output format 'xml'"):
+        format_rows(ROWS, "xml")
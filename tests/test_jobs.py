@@ -0,0 +1,130 @@
+"""
+Background jobs: run by priority, cancellable, with result files holding a header of column names
+and one array of values per row
+"""
+import json
+import re
+
+import anyio
+import pytest
+
+import Access
+from conftest import ORDERS
+from jobs import JobScheduler, ResultFile
+from test_timeouts import ENDLESS_QUERY
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def job_workers():
+    """Run the job scheduler's workers, as the server's lifespan does"""
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(Access.jobs.run)
+        await anyio.sleep(0)
+        yield Access.jobs
+        tg.cancel_scope.cancel()
+
+
+async def wait_for(job_id: str) -> str:
+    with anyio.fail_after(10):
+        while True:
+            status = await Access.job_status_tool(job_id)
+            if ": running" not in status and ": queued" not in status:
+                return status
+            await anyio.sleep(0.01)
+
+
+async def test_jobs_run_by_priority_and_can_be_cancelled():
+    scheduler = JobScheduler(max_workers=1, history=2)
+    with pytest.raises(RuntimeError, match="not running"):
+        scheduler.submit("sales.db", "SELECT 1", None, 1, None)
+
+    order = []
+    release = anyio.Event()
+
+    async def _run(job):
+        order.append(job.sql)
+        if job.sql == "blocking":
+            await release.wait()
+        if job.sql == "failing":
+            raise ValueError("no such table")
+
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(scheduler.run)
+        await anyio.sleep(0)
+        blocking = scheduler.submit("sales.db", "blocking", None, 1, _run)
+        await anyio.sleep(0.01)
+        later = scheduler.submit("sales.db", "later", None, 1, _run)
+        dropped = scheduler.submit("sales.db", "dropped", None, 1, _run)
+        urgent = scheduler.submit("sales.db", "urgent", None, 0, _run)
+        failing = scheduler.submit("sales.db", "failing", None, 1, _run)
+        assert scheduler.cancel(dropped.id) and dropped.status == "cancelled"
+        release.set()
+        with anyio.fail_after(5):
+            while failing.status in ("queued", "running"):
+                await anyio.sleep(0.01)
+
+        assert order == ["blocking", "urgent", "later", "failing"]
+        assert (blocking.status, urgent.status, later.status) == ("done", "done", "done")
+        assert (failing.status, failing.error) == ("failed", "no such table")
+        assert not scheduler.cancel(urgent.id)
+        # Only the two last submitted of the finished jobs are kept
+        assert list(scheduler.jobs) == [urgent.id, failing.id]
+
+        release = anyio.Event()
+        stuck = scheduler.submit("sales.db", "blocking", None, 1, _run)
+        queued = scheduler.submit("sales.db", "queued", None, 1, _run)
+        await anyio.sleep(0.01)
+        assert stuck.status == "running" and queued.status == "queued"
+        assert scheduler.cancel(stuck.id)
+        await anyio.sleep(0.01)
+        assert (stuck.status, queued.status) == ("cancelled", "done")
+        tg.cancel_scope.cancel()
+
+
+async def test_cancel_running_query_job(open_db, job_workers):
+    conn_id = await open_db()
+    submitted = await Access.submit_query_tool(conn_id, ENDLESS_QUERY)
+    job_id = re.search(r"job-\d+", submitted).group(0)
+    with anyio.fail_after(5):
+        while ": running" not in await Access.job_status_tool(job_id):
+            await anyio.sleep(0.01)
+    assert "Cancelling job" in await Access.job_status_tool(job_id, cancel=True)
+    assert ": cancelled" in await wait_for(job_id)
+    assert "already finished (cancelled)" in await Access.job_status_tool(job_id, cancel=True)
+    assert "COUNT(*): 40" in await Access.execute_sql_tool(conn_id, "SELECT COUNT(*) FROM Customers")
+
+
+def test_result_file_reads_from_any_row(tmp_path):
+    result = ResultFile(str(tmp_path / "rows.jsonl"), stride=3)
+    with open(result.path, "wb") as f:
+        result.start(f, ["ID", "Name"])
+        result.append(f, [(i, f"row {i}") for i in range(10)])
+    assert result.rows == 10
+    for offset in (0, 2, 3, 7, 9):
+        rows = result.read(offset, 2)
+        assert rows.columns == ("ID", "Name")
+        assert rows.rows == [(i, f"row {i}") for i in range(offset, min(offset + 2, 10))]
+    assert not result.read(10, 5)
+
+
+async def test_job_result_file_format(open_db, job_workers):
+    conn_id = await open_db()
+    submitted = await Access.submit_query_tool(
+        conn_id, "SELECT OrderID, Amount, Modified FROM Orders WHERE OrderID <= ? ORDER BY OrderID", params=[150]
+    )
+    job_id = re.search(r"job-\d+", submitted).group(0)
+    status = await wait_for(job_id)
+    assert ": done" in status and "Rows fetched: 150" in status
+    assert "first line is an array of the column names" in status
+
+    path = re.search(r"Result file: (\S+)", status).group(1)
+    with open(path, encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f]
+    assert lines[0] == ["OrderID", "Amount", "Modified"]
+    assert lines[1:] == [[order_id, amount, modified] for order_id, _, amount, modified in ORDERS[:150]]
+
+    page = await Access.fetch_job_result_tool(job_id, offset=148, limit=5, output_format="csv")
+    assert page.startswith("OrderID,Amount,Modified\n149,")
+    assert "Rows 149-150 of 150." in page
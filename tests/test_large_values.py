@@ -0,0 +1,63 @@
+"""
+Memo and OLE Object cells: placeholders instead of the values, read a range at a time with read_cell_tool
+"""
+import hashlib
+
+import pytest
+
+import Access
+from conftest import write
+
+pytestmark = pytest.mark.anyio
+
+BODY = "".join(f"{i:05d}" for i in range(2000))  # 10000 characters, each 5 encoding its position
+DATA = bytes(range(256)) * 4
+
+
+@pytest.fixture
+def docs_db(db_path):
+    write(db_path, "CREATE TABLE Docs (DocID INTEGER PRIMARY KEY, Title TEXT(50), Body LONGTEXT, Data LONGBINARY)")
+    write(db_path, "INSERT INTO Docs VALUES (1, 'long', ?, ?)", (BODY, DATA))
+    write(db_path, "INSERT INTO Docs VALUES (2, 'short', 'brief', NULL)")
+    return db_path
+
+
+async def test_query_tools_show_placeholders(open_db, docs_db):
+    conn_id = await open_db(path=docs_db)
+    output = await Access.query_table_tool(conn_id, "Docs", output_format="csv")
+    assert "1,long,\"<text 10000 chars, not read>\",\"<binary 1024 bytes, not read>\"" in output
+    assert "2,short,brief," in output
+
+    output = await Access.execute_sql_tool(conn_id, "SELECT Body, Data FROM Docs WHERE DocID = 1")
+    digest = hashlib.sha256(DATA).hexdigest()[:12]
+    assert f"Data: <binary 1024 bytes sha256:{digest}>" in output
+    assert "Body: <text 10000 chars sha256:" in output
+
+
+async def test_read_cell_ranges(open_db, docs_db):
+    conn_id = await open_db(path=docs_db)
+    output = await Access.read_cell_tool(conn_id, "Docs", "Body", {"DocID": 1}, offset=5000, length=15)
+    header, text, next_call = output.split("\n\n")
+    assert header == "Docs.Body where DocID=1: characters 5000-5014 of 10000"
+    assert text == "010000100101002"
+    assert next_call == "Next: read_cell_tool(..., offset=5015)"
+
+    output = await Access.read_cell_tool(conn_id, "Docs", "Body", {"DocID": 1}, offset=9995, length=100)
+    assert output.endswith("characters 9995-9999 of 10000\n\n01999")
+    assert "nothing at offset 20000" in await Access.read_cell_tool(conn_id, "Docs", "Body", {"DocID": 1},
+                                                                   offset=20000)
+
+    output = await Access.read_cell_tool(conn_id, "Docs", "Data", {"DocID": 1}, offset=254, length=4)
+    assert output.startswith("Docs.Data where DocID=1: bytes 254-257 of 1024 (hex)\n\nfeff0001")
+    output = await Access.read_cell_tool(conn_id, "Docs", "Data", {"DocID": 1}, length=3, binary_format="base64")
+    assert output.endswith("(base64)\n\nAAEC\n\nNext: read_cell_tool(..., offset=3)")
+    assert "is NULL" in await Access.read_cell_tool(conn_id, "Docs", "Data", {"DocID": 2})
+
+
+async def test_invalid_cells(open_db, docs_db):
+    conn_id = await open_db(path=docs_db)
+    assert "Column(s) not found in 'Docs': Summary" in await Access.read_cell_tool(
+        conn_id, "Docs", "Summary", {"DocID": 1})
+    assert "key must name at least one column" in await Access.read_cell_tool(conn_id, "Docs", "Body", {})
+    assert "Unknown binary_format 'raw'" in await Access.read_cell_tool(conn_id, "Docs", "Data", {"DocID": 1},
+                                                                       binary_format="raw")
@@ -0,0 +1,75 @@
+"""
+Concurrent load: many tool calls against two databases, sharing the pools and caches
+"""
+import random
+
+import anyio
+import pytest
+
+import Access
+from conftest import CUSTOMERS, ORDERS, create_database
+
+pytestmark = pytest.mark.anyio
+
+CALLS = 200
+
+
+async def test_concurrent_tool_calls(open_db, tmp_path):
+    workers = Access.executor.stats()["workers"]
+    read_id = await open_db()
+    write_id = await open_db(writable=True, path=create_database(tmp_path / "ledger.db"))
+    rng = random.Random(7)
+    failures = []
+    inserted = []
+
+    async def _check(description: str, call, expected: str):
+        output = await call
+        if expected not in output:
+            failures.append(f"{description}: expected {expected!r} in {output[:300]!r}")
+
+    async def _insert(order_id: int):
+        output = await Access.execute_sql_tool(
+            write_id, "INSERT INTO Orders (OrderID, CustomerID, Amount) VALUES (?, ?, ?)", params=[order_id, 1, 1.0]
+        )
+        if "Rows affected: 1" not in output:
+            failures.append(f"insert {order_id}: {output}")
+        inserted.append(order_id)
+
+    async with anyio.create_task_group() as tg:
+        for i in range(CALLS):
+            customer_id, name, city, _ = CUSTOMERS[rng.randrange(len(CUSTOMERS))]
+            kind = i % 6
+            if kind == 0:
+                tg.start_soon(_check, "query_table_tool", Access.query_table_tool(
+                    read_id, "Customers", where=[{"column": "CustomerID", "value": customer_id}]), name)
+            elif kind == 1:
+                total = sum(amount for _, owner, amount, _ in ORDERS if owner == customer_id)
+                tg.start_soon(_check, "execute_sql_tool", Access.execute_sql_tool(
+                    read_id, "SELECT SUM(Amount) AS total FROM Orders WHERE CustomerID = ?",
+                    params=[customer_id]), f"total: {total:g}")
+            elif kind == 2:
+                tg.start_soon(_check, "execute_batch_tool", Access.execute_batch_tool(
+                    read_id, statements=["SELECT COUNT(*) AS n FROM Orders",
+                                         f"SELECT City FROM Customers WHERE CustomerID = {customer_id}"]), city)
+            elif kind == 3:
+                tg.start_soon(_check, "list_tables_tool", Access.list_tables_tool(read_id), "Orders")
+            elif kind == 4:
+                tg.start_soon(_check, "get_table_schema_tool",
+                              Access.get_table_schema_tool(read_id, "Orders"), "Amount")
+            else:
+                tg.start_soon(_insert, 1000 + i)
+
+    assert not failures, "\n".join(failures[:5])
+    count = await Access.execute_sql_tool(write_id, "SELECT COUNT(*) AS n FROM Orders")
+    assert f"n: {len(ORDERS) + len(inserted)}" in count
+
+    pools = [Access.connections[conn_id]['pool'] for conn_id in (read_id, write_id)]
+    for pool in pools:
+        assert pool.stats()["in_use"] == 0
+        assert pool.stats()["size"] <= Access.POOL_MAX_SIZE
+    assert Access.executor.stats()["running"] == 0
+    # One worker thread per pooled connection (the mirror is not used here), none leaked
+    assert Access.executor.stats()["workers"] == workers + sum(pool.stats()["size"] for pool in pools)
+    for conn_id in (read_id, write_id):
+        await Access.disconnect(conn_id)
+    assert Access.executor.stats()["workers"] == workers
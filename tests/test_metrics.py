@@ -0,0 +1,80 @@
+"""
+Metrics: per-tool latency, row, byte and error statistics, and their report in server_stats
+"""
+import pytest
+
+import Access
+from metrics import COUNT_BUCKETS, Histogram, Metrics
+
+pytestmark = pytest.mark.anyio
+
+
+def test_histogram_quantiles_are_bucket_bounds():
+    histogram = Histogram(COUNT_BUCKETS)
+    for value in [1] * 50 + [10] * 45 + [1000] * 5:
+        histogram.observe(value)
+    assert (histogram.count, histogram.sum, histogram.max) == (100, 5500, 1000)
+    assert histogram.quantile(0.5) == 1
+    assert histogram.quantile(0.95) == 16
+    assert histogram.quantile(0.99) == 1000  # capped at the largest value seen
+    assert Histogram(COUNT_BUCKETS).quantile(0.5) == 0.0
+
+
+async def test_tool_calls_are_recorded():
+    metrics = Metrics()
+
+    @metrics.tool
+    async def lookup_tool(conn_id: str, fail: bool = False) -> str:
+        await metrics.run_sync(lambda: metrics.add_rows(7), stage="fetch")
+        return "Error: failed" if fail else "found"
+
+    assert await lookup_tool("sales.db") == "found"
+    await lookup_tool("sales.db", fail=True)
+    await lookup_tool(conn_id="other.db")
+
+    histograms = metrics.snapshot()["histograms"]
+    labels = (("tool", "lookup_tool"), ("db", "sales.db"))
+    assert histograms[("tool_seconds", labels)][0] == 2
+    assert histograms[("rows", labels)][1] == 14
+    assert histograms[("bytes", labels)][1] == len("found") + len("Error: failed")
+    assert ("stage_seconds", labels + (("stage", "fetch"),)) in histograms
+    assert ("stage_seconds", labels + (("stage", "queue"),)) in histograms
+    assert metrics.snapshot()["errors"] == {labels: 1}
+
+    text = metrics.prometheus_text()
+    assert 'mcp_access_rows_count{tool="lookup_tool",db="other.db"} 1' in text
+    assert 'mcp_access_errors_total{tool="lookup_tool",db="sales.db"} 1' in text
+
+    metrics.reset()
+    assert metrics.snapshot()["histograms"] == {}
+
+
+async def test_series_are_bounded():
+    metrics = Metrics(max_series=3)
+
+    @metrics.tool
+    async def ping(conn_id: str) -> str:
+        return "pong"
+
+    for i in range(10):
+        await ping(f"db{i}.db")
+    series = metrics.snapshot()["histograms"]
+    assert {dict(labels)["db"] for _, labels in series} == {"db0.db", "other"}
+    assert series[("tool_seconds", (("tool", "ping"), ("db", "other")))][0] == 9
+
+
+async def test_server_stats(open_db):
+    conn_id = await open_db()
+    Access.metrics.reset()
+    await Access.execute_sql_tool(conn_id, "SELECT * FROM Orders WHERE OrderID <= 5")
+    await Access.execute_sql_tool(conn_id, "SELECT * FROM NoSuchTable")
+
+    output = await Access.server_stats(conn_id)
+    calls = output.split("TOOL CALLS:\n", 1)[1].split("\nSTAGES:", 1)[0]
+    header, _, row = calls.splitlines()[:3]
+    fields = dict(zip([cell.strip() for cell in header.split("|")], [cell.strip() for cell in row.split("|")]))
+    assert fields["tool"] == "execute_sql_tool" and fields["db"] == conn_id
+    assert (fields["calls"], fields["errors"], fields["rows"]) == ("2", "1", "5")
+    assert "SELECT * FROM Orders WHERE OrderID <= 5" in output.split("SLOWEST QUERIES:", 1)[1]
+    assert "Statistics have been reset." in await Access.server_stats(reset=True)
+    assert "TOOL CALLS:\n(none)" in await Access.server_stats(conn_id)
@@ -0,0 +1,142 @@
+"""
+Local mirrors: each sync mode copies the right rows, and stale or incompatible queries skip the mirror
+"""
+import sqlite3
+
+import pytest
+
+import Access
+from conftest import write
+from mirror import Mirror, choose_sync_mode, mirror_compatible
+
+pytestmark = pytest.mark.anyio
+
+MIRRORED = "(Served from the local mirror"
+
+
+async def query(conn_id: str, sql_query: str) -> str:
+    return await Access.execute_sql_tool(conn_id, sql_query, output_format="csv")
+
+
+async def test_sync_modes(open_db):
+    conn_id = await open_db()
+    schemas = {name: await Access.get_cached_schema(conn_id, name) for name in ("Customers", "Orders", "Notes")}
+    assert choose_sync_mode(schemas["Customers"]) == ("key", "CustomerID")
+    assert choose_sync_mode(schemas["Orders"]) == ("timestamp", "Modified")
+    assert choose_sync_mode(schemas["Notes"]) == ("full", None)
+
+
+async def test_mirror_answers_like_the_database(open_db):
+    conn_id = await open_db()
+    sql_query = "SELECT City, COUNT(*) AS n, SUM(Amount) AS total FROM Customers INNER JOIN Orders" \
+                " ON Customers.CustomerID = Orders.CustomerID GROUP BY City ORDER BY City"
+    direct = await Access.execute_sql_tool(conn_id, sql_query, output_format="csv", use_mirror=False)
+    output = await Access.mirror_tool(conn_id, ["Customers", "Orders"])
+    assert "Customers: copied in full, 40 rows copied" in output
+    assert "Orders: copied in full, 200 rows copied" in output
+
+    mirrored = await query(conn_id, sql_query)
+    assert MIRRORED in mirrored
+    assert mirrored.startswith(direct)
+
+
+async def test_key_sync_appends_rows_but_is_not_trusted(open_db, db_path):
+    conn_id = await open_db()
+    await Access.mirror_tool(conn_id, ["Customers"])
+    write(db_path, "INSERT INTO Customers VALUES (41, 'Customer 41', 'Nice', 1)")
+    write(db_path, "UPDATE Customers SET Name = 'Changed' WHERE CustomerID = 1")
+
+    output = await Access.mirror_tool(conn_id, ["Customers"])
+    assert "Customers: synced by key, 1 rows copied, 41 rows in mirror" in output
+    # The sync could not see the update, so queries go to the database
+    result = await query(conn_id, "SELECT Name FROM Customers WHERE CustomerID = 1")
+    assert "Changed" in result and MIRRORED not in result
+
+    output = await Access.mirror_tool(conn_id, ["Customers"], full_refresh=True)
+    assert "Customers: copied in full, 41 rows copied" in output
+    result = await query(conn_id, "SELECT CustomerID, Name FROM Customers WHERE CustomerID = 1")
+    assert "Changed" in result and MIRRORED in result
+
+
+async def test_timestamp_sync_copies_changed_rows(open_db, db_path):
+    conn_id = await open_db()
+    await Access.mirror_tool(conn_id, ["Orders"])
+    write(db_path, "UPDATE Orders SET Amount = 999, Modified = '2024-02-15 08:00:00' WHERE OrderID = 3")
+
+    output = await Access.mirror_tool(conn_id, ["Orders"])
+    assert "Orders: synced by timestamp" in output
+    assert "200 rows in mirror" in output
+    result = await query(conn_id, "SELECT Amount FROM Orders WHERE OrderID = 3")
+    assert "999" in result and MIRRORED in result
+
+
+async def test_deleted_rows_force_full_copy(open_db, db_path):
+    conn_id = await open_db()
+    await Access.mirror_tool(conn_id, ["Orders"])
+    write(db_path, "DELETE FROM Orders WHERE OrderID > 150")
+
+    output = await Access.mirror_tool(conn_id, ["Orders"])
+    assert "Orders: copied in full, 150 rows copied, 150 rows in mirror" in output
+    assert "n\n150" in await query(conn_id, "SELECT COUNT(*) AS n FROM Orders")
+
+
+async def test_changed_file_makes_mirror_stale(open_db, db_path):
+    conn_id = await open_db()
+    await Access.mirror_tool(conn_id, ["Notes"])
+    assert MIRRORED in await query(conn_id, "SELECT COUNT(*) AS n FROM Notes")
+    write(db_path, "INSERT INTO Notes VALUES ('third')")
+
+    result = await query(conn_id, "SELECT COUNT(*) AS n FROM Notes")
+    assert "n\n3" in result and MIRRORED not in result
+    assert "| no" in await Access.mirror_tool(conn_id)
+
+
+async def test_access_only_syntax_skips_mirror(open_db):
+    conn_id = await open_db()
+    await Access.mirror_tool(conn_id, ["Customers"])
+    assert MIRRORED in await query(conn_id, "SELECT Name FROM Customers WHERE CustomerID = 2")
+    for sql_query in ("SELECT Name + ' x' AS s FROM Customers", "SELECT Name & ' x' AS s FROM Customers",
+                      "SELECT CustomerID / 2 AS half FROM Customers", "SELECT TOP 1 Name FROM Customers",
+                      "SELECT Name FROM Customers WHERE Name LIKE 'Cust*'"):
+        assert not mirror_compatible(sql_query), sql_query
+        assert MIRRORED not in await query(conn_id, sql_query)
+    assert mirror_compatible("SELECT Name FROM Customers WHERE Name = 'a + b'")
+
+
+async def test_boolean_keywords_give_database_results(open_db):
+    conn_id = await open_db()
+    await Access.mirror_tool(conn_id, ["Customers"])
+    for sql_query in ("SELECT COUNT(*) AS n FROM Customers WHERE Active = True",
+                      "SELECT COUNT(*) AS n FROM Customers WHERE Active = No",
+                      "SELECT COUNT(*) AS n FROM Customers WHERE Active <> Off"):
+        direct = await Access.execute_sql_tool(conn_id, sql_query, output_format="csv", use_mirror=False)
+        result = await query(conn_id, sql_query)
+        assert MIRRORED not in result, sql_query
+        assert result == direct
+    # Joins on ... ON ... are not mistaken for the boolean On
+    assert mirror_compatible("SELECT * FROM Customers INNER JOIN Orders ON Customers.CustomerID = Orders.CustomerID")
+
+
+def test_booleans_are_mirrored_as_access_stores_them(db_path, tmp_path, monkeypatch):
+    # Read Yes/No columns as bool, as pyodbc does; sqlite3.converters is process-wide,
+    # so the converter is removed again after the test
+    monkeypatch.setitem(sqlite3.converters, "BOOLEAN", lambda value: value != b"0")
+    source = sqlite3.connect(db_path, detect_types=sqlite3.PARSE_DECLTYPES)
+    schema = {
+        "columns": [{"name": "CustomerID", "type": "integer"}, {"name": "Name", "type": "text"},
+                    {"name": "City", "type": "text"}, {"name": "Active", "type": "boolean"}],
+        "primary_keys": ["CustomerID"],
+    }
+    mirror = Mirror(db_path, str(tmp_path / "mirrors"))
+    try:
+        assert isinstance(source.execute("SELECT Active FROM Customers").fetchone()[0], bool)
+        mirror.sync_table(source.cursor(), "Customers", schema, signature=None)
+    finally:
+        source.close()
+
+    copy = sqlite3.connect(mirror.path)
+    try:
+        counts = dict(copy.execute("SELECT Active, COUNT(*) FROM Customers GROUP BY Active"))
+    finally:
+        copy.close()
+    assert counts == {-1: 20, 0: 20}
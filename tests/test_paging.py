@@ -0,0 +1,96 @@
+"""
+query_table_page_tool: keyset pages for keyed tables, held cursors for the rest
+"""
+import re
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+import Access
+from pagination import decode_page_token, encode_page_token, keyset_predicate
+
+pytestmark = pytest.mark.anyio
+
+
+def next_token(output: str):
+    match = re.search(r"Next page token: (\S+)", output)
+    return match.group(1) if match else None
+
+
+async def read_all_pages(conn_id: str, table_name: str, page_size: int) -> tuple:
+    """Page through a table; return the data lines and the tokens used"""
+    lines, tokens, token = [], [], None
+    while True:
+        output = await Access.query_table_page_tool(conn_id, table_name, page_size, token, output_format="csv")
+        assert not output.startswith("Error"), output
+        body = output.split("\n\n")[0].splitlines()
+        lines.extend(body[1:])
+        token = next_token(output)
+        if token is None:
+            assert output.endswith("(Last page)")
+            return lines, tokens
+        tokens.append(token)
+
+
+def test_tokens_round_trip_dates():
+    state = {"mode": "keyset", "table": "Orders", "keys": ["Modified", "OrderID"],
+             "values": [datetime(2024, 1, 5, 12, 0), Decimal("10.50")]}
+    assert decode_page_token(encode_page_token(state)) == state
+
+
+def test_keyset_predicate_for_composite_key():
+    predicate, indexes = keyset_predicate(["a", "b"], lambda name: f"[{name}]")
+    assert predicate == "([a] > ?) OR ([a] = ? AND [b] > ?)"
+    assert indexes == [0, 0, 1]
+
+
+async def test_keyed_table_is_paged_by_key(open_db):
+    conn_id = await open_db()
+    lines, tokens = await read_all_pages(conn_id, "Orders", 30)
+    assert [int(line.split(",")[0]) for line in lines] == list(range(1, 201))
+    assert len(tokens) == 6
+    state = decode_page_token(tokens[-1])
+    assert state["mode"] == "keyset" and state["keys"] == ["OrderID"] and state["values"] == [180]
+
+
+async def test_keyset_pages_see_rows_inserted_after_the_token(open_db):
+    conn_id = await open_db(writable=True)
+    first = await Access.query_table_page_tool(conn_id, "Customers", 39, output_format="csv")
+    assert "Customer 39" in first
+    await Access.execute_sql_tool(conn_id, "INSERT INTO Customers VALUES (41, 'Late', 'Nice', 1)")
+    second = await Access.query_table_page_tool(conn_id, "Customers", 39, next_token(first), output_format="csv")
+    assert "40,Customer 40" in second and "41,Late" in second and second.endswith("(Last page)")
+
+
+async def test_table_without_key_uses_a_held_cursor(open_db):
+    conn_id = await open_db(writable=True)
+    await Access.execute_sql_tool(conn_id, "DELETE FROM Notes")
+    for i in range(7):
+        await Access.execute_sql_tool(conn_id, f"INSERT INTO Notes VALUES ('note {i}')")
+
+    held = Access.connections[conn_id]['held_cursors']
+    output = await Access.query_table_page_tool(conn_id, "Notes", 3, output_format="csv")
+    token = next_token(output)
+    assert decode_page_token(token)["mode"] == "cursor"
+    assert len(held) == 1
+
+    lines, _ = await read_all_pages(conn_id, "Notes", 3)
+    assert lines == [f"note {i}" for i in range(7)]
+    # The fully read cursor is closed; the first one stays until it expires
+    assert len(held) == 1
+
+    second = await Access.query_table_page_tool(conn_id, "Notes", 3, token, output_format="csv")
+    assert "note 3" in second
+    stale = await Access.query_table_page_tool(conn_id, "Notes", 3, token, output_format="csv")
+    assert "does not match the current position" in stale
+
+
+async def test_bad_tokens(open_db):
+    conn_id = await open_db()
+    assert "Invalid page token" in await Access.query_table_page_tool(conn_id, "Orders", page_token="not-a-token")
+    first = await Access.query_table_page_tool(conn_id, "Orders", 5)
+    assert "belongs to table 'Orders'" in await Access.query_table_page_tool(conn_id, "Customers",
+                                                                            page_token=next_token(first))
+    expired = encode_page_token({"mode": "cursor", "table": "Notes", "id": "gone", "page": 1})
+    assert "has expired" in await Access.query_table_page_tool(conn_id, "Notes", page_token=expired)
@@ -0,0 +1,57 @@
+"""
+profile_table_tool: every column profiled by one aggregate scan, cached until the file changes
+"""
+import csv
+import io
+
+import pytest
+
+import Access
+from conftest import write
+
+pytestmark = pytest.mark.anyio
+
+
+def parse_profile(output: str) -> tuple:
+    header, body = output.split("\n\n", 1)
+    return header, {row["column"]: row for row in csv.DictReader(io.StringIO(body))}
+
+
+async def test_profile_columns(open_db):
+    conn_id = await open_db()
+    header, columns = parse_profile(await Access.profile_table_tool(conn_id, "Customers", output_format="csv"))
+    assert header.startswith("Profile of 'Customers': 40 rows (computed in ")
+    assert header.endswith("from the database)")
+    customer_id = columns["CustomerID"]
+    assert (customer_id["non_null"], customer_id["distinct"], customer_id["min"], customer_id["max"],
+            customer_id["mean"]) == ("40", "40", "1", "40", "20.5")
+    assert (columns["City"]["distinct"], columns["City"]["min"], columns["City"]["max"]) == ("2", "Lyon", "Paris")
+    assert columns["City"]["mean"] == ""
+
+
+async def test_nulls_and_caching(open_db, db_path):
+    conn_id = await open_db()
+    write(db_path, "INSERT INTO Notes VALUES (NULL)")
+    header, columns = parse_profile(await Access.profile_table_tool(conn_id, "Notes", output_format="csv"))
+    assert "3 rows" in header
+    assert (columns["Body"]["non_null"], columns["Body"]["null_pct"]) == ("2", "33.3")
+
+    assert "(cached from the database)" in await Access.profile_table_tool(conn_id, "Notes")
+    write(db_path, "INSERT INTO Notes VALUES ('third')")
+    assert "4 rows (computed in " in await Access.profile_table_tool(conn_id, "Notes")
+
+
+async def test_without_count_distinct_only_keys_are_distinct(open_db, db_path, monkeypatch):
+    conn_id = await open_db()
+    monkeypatch.setattr(Access.backend_for_path(db_path), "supports_count_distinct", False)
+    _, columns = parse_profile(await Access.profile_table_tool(conn_id, "Customers", output_format="csv"))
+    assert columns["CustomerID"]["distinct"] == "40"
+    assert columns["City"]["distinct"] == "n/a"
+
+
+async def test_fresh_mirror_is_profiled(open_db):
+    conn_id = await open_db()
+    await Access.mirror_tool(conn_id, ["Orders"])
+    header, columns = parse_profile(await Access.profile_table_tool(conn_id, "Orders", output_format="csv"))
+    assert header.endswith("from the mirror)")
+    assert (columns["OrderID"]["min"], columns["OrderID"]["max"]) == ("1", "200")
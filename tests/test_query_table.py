@@ -0,0 +1,71 @@
+"""
+query_table_tool: columns, where and order_by validated against the schema and pushed down as SQL
+"""
+import pytest
+
+import Access
+from table_filter import build_table_query
+
+pytestmark = pytest.mark.anyio
+
+COLUMNS = [
+    {"name": "OrderID", "type": "integer"},
+    {"name": "Amount", "type": "float"},
+    {"name": "Modified", "type": "datetime"},
+    {"name": "Note", "type": "text"},
+]
+
+
+def data_lines(output: str) -> list:
+    return output.split("\n\n")[0].splitlines()
+
+
+def test_conditions_become_parameters():
+    query = build_table_query(
+        COLUMNS, lambda name: f"[{name}]", columns=["amount", "[OrderID]"],
+        where=[{"column": "OrderID", "op": "between", "value": ["5", "9"]},
+               {"column": "Note", "op": "!=", "value": "x"},
+               {"column": "Amount", "op": "is not null"},
+               {"column": "Modified", "op": "in", "value": ["2024-01-05"]}],
+        order_by=["Amount desc"], tiebreak=["OrderID"],
+    )
+    assert [column["name"] for column in query.columns] == ["Amount", "OrderID"] and query.projected
+    assert query.where == ("WHERE [OrderID] BETWEEN ? AND ? AND [Note] <> ? AND [Amount] IS NOT NULL"
+                           " AND [Modified] IN (?)")
+    assert query.params[:3] == [5, 9, "x"]
+    assert str(query.params[3]).startswith("2024-01-05")
+    assert query.order_by == "ORDER BY [Amount] DESC, [OrderID]"
+
+
+async def test_projection_filter_and_order(open_db):
+    conn_id = await open_db()
+    output = await Access.query_table_tool(
+        conn_id, "Customers", limit=3, output_format="csv", columns=["Name", "City"],
+        where=[{"column": "City", "value": "Paris"}, {"column": "CustomerID", "op": ">", "value": "20"}],
+        order_by=["CustomerID DESC"],
+    )
+    assert data_lines(output) == ["Name,City", "Customer 39,Paris", "Customer 36,Paris", "Customer 33,Paris"]
+
+    output = await Access.query_table_tool(conn_id, "Orders", limit=4, output_format="csv", columns=["OrderID"],
+                                           where=[{"column": "CustomerID", "op": "in", "value": [2, "3"]}])
+    assert data_lines(output) == ["OrderID", "1", "2", "41", "42"]
+
+
+@pytest.mark.parametrize("arguments, message", [
+    ({"columns": ["Region"]}, "Unknown column 'Region' in columns. Columns: CustomerID, Name, City, Active"),
+    ({"columns": ["Name", "name"]}, "A column is selected more than once."),
+    ({"where": [{"column": "Region", "value": "x"}]}, "Unknown column 'Region' in where."),
+    ({"where": ["City = 'Paris'"]}, "Each where condition must be an object"),
+    ({"where": [{"column": "City", "op": "~", "value": "x"}]}, "Unknown operator '~'."),
+    ({"where": [{"column": "CustomerID", "value": "seven"}]}, "Value 'seven' does not fit column CustomerID"),
+    ({"where": [{"column": "City", "value": None}]}, "Use the 'is null' operator"),
+    ({"where": [{"column": "CustomerID", "op": "between", "value": [1]}]}, "takes a list of two values"),
+    ({"where": [{"column": "CustomerID", "op": "in", "value": []}]}, "takes a non-empty list of values"),
+    ({"where": [{"column": "Active", "value": "maybe"}]}, "does not fit column Active (boolean)"),
+    ({"order_by": ["Region"]}, "Unknown column 'Region' in order_by."),
+])
+async def test_invalid_arguments(open_db, arguments, message):
+    conn_id = await open_db()
+    output = await Access.query_table_tool(conn_id, "Customers", **arguments)
+    assert output.startswith("Error")
+    assert message in output
@@ -0,0 +1,42 @@
+"""
+RowSet: one header of column names shared by value tuples, read as dicts where needed
+"""
+import sqlite3
+
+import pytest
+
+import Access
+from rowset import RowSet
+
+pytestmark = pytest.mark.anyio
+
+
+def test_sequence_of_rows():
+    rows = RowSet(["ID", "Name"], [(1, "a"), (2, "b"), (3, "c")])
+    assert rows.columns == ("ID", "Name")
+    assert len(rows) == 3 and rows and not RowSet(["ID"])
+    assert rows[1] == {"ID": 2, "Name": "b"}
+    assert list(rows) == [{"ID": 1, "Name": "a"}, {"ID": 2, "Name": "b"}, {"ID": 3, "Name": "c"}]
+    tail = rows[1:]
+    assert isinstance(tail, RowSet) and tail.columns is rows.columns and tail.rows == [(2, "b"), (3, "c")]
+    assert repr(rows) == "RowSet(2 columns, 3 rows)"
+
+
+def test_rows_from_a_cursor():
+    connection = sqlite3.connect(":memory:")
+    cursor = connection.execute("SELECT 1 AS ID, x'6869' AS Data, NULL AS Missing")
+    rows = RowSet.from_cursor(cursor)
+    rows.extend(cursor.fetchall())
+    assert rows.columns == ("ID", "Data", "Missing")
+    assert rows.rows == [(1, "b'hi'", None)]
+    connection.close()
+
+
+async def test_query_results_are_rowsets(open_db):
+    conn_id = await open_db()
+    pool = Access.connections[conn_id]['pool']
+    async with pool.connection() as connection:
+        result = await Access.execute_sql(connection, "SELECT CustomerID, Name FROM Customers WHERE CustomerID <= 2")
+    assert isinstance(result["data"], RowSet)
+    assert result["data"].columns == ("CustomerID", "Name")
+    assert result["data"].rows == [(1, "Customer 1"), (2, "Customer 2")]
@@ -0,0 +1,80 @@
+"""
+Random samples: uniform, reproducible by seed, and read without fetching the whole table
+"""
+import random
+from collections import Counter
+
+import pytest
+
+import Access
+from conftest import write
+from sampling import key_range_sample, reservoir_sample
+
+pytestmark = pytest.mark.anyio
+
+
+def sample_lines(output: str) -> list:
+    return output.split("\n\n")[0].splitlines()[1:]
+
+
+def test_reservoir_sample_is_uniform():
+    counts = Counter()
+    for seed in range(2000):
+        sample = reservoir_sample(iter(range(100)), 10, random.Random(seed))
+        assert len(set(sample)) == 10
+        counts.update(sample)
+    # Each item is expected 200 times
+    assert min(counts.values()) > 140 and max(counts.values()) < 260
+    assert reservoir_sample(range(5), 10, random.Random(1)) == [0, 1, 2, 3, 4]
+    assert reservoir_sample(range(100), 10, random.Random(7)) == reservoir_sample(range(100), 10, random.Random(7))
+
+
+def test_key_range_sample_finds_existing_rows():
+    existing = set(range(1, 10000, 7))
+    probes = []
+
+    def fetch(keys):
+        probes.append(len(keys))
+        return [key for key in keys if key in existing]
+
+    sample = key_range_sample(fetch, 1, 9997, len(existing), 50, random.Random(3))
+    assert len(sample) == 50 and len(set(sample)) == 50 and set(sample) <= existing
+    assert sum(probes) < 1000
+
+
+@pytest.mark.parametrize("table_name, limit, note", [
+    ("Orders", 20, "by key-range sampling; seed=11)"),
+    ("Notes", 1, "by reservoir sampling; seed=11)"),
+    ("Customers", 50, "The table has only 40 rows; all are shown"),
+])
+async def test_sampling_methods(open_db, monkeypatch, table_name, limit, note):
+    monkeypatch.setattr(Access, "DISPLAY_ROWS", 100)
+    conn_id = await open_db()
+    output = await Access.query_table_tool(conn_id, table_name, limit=limit, sample=True, seed=11,
+                                           output_format="csv")
+    assert note in output
+    lines = sample_lines(output)
+    assert len(lines) == min(limit, {"Orders": 200, "Notes": 2, "Customers": 40}[table_name])
+    assert len(set(lines)) == len(lines)
+
+
+async def test_same_seed_same_sample(open_db, db_path):
+    write(db_path, "CREATE TABLE Lines (OrderID INTEGER, LineNo INTEGER, Qty INTEGER, PRIMARY KEY (OrderID, LineNo))")
+    for order_id in range(1, 51):
+        for line_no in range(1, 4):
+            write(db_path, "INSERT INTO Lines VALUES (?, ?, ?)", (order_id, line_no, order_id * line_no))
+    conn_id = await open_db()
+
+    for table_name, method in (("Orders", "key-range"), ("Lines", "random-order")):
+        first = await Access.query_table_tool(conn_id, table_name, limit=10, sample=True, seed=5, output_format="csv")
+        assert f"by {method} sampling" in first
+        Access.result_cache.invalidate()
+        again = await Access.query_table_tool(conn_id, table_name, limit=10, sample=True, seed=5, output_format="csv")
+        other = await Access.query_table_tool(conn_id, table_name, limit=10, sample=True, seed=6, output_format="csv")
+        assert sample_lines(again) == sample_lines(first)
+        assert sample_lines(other) != sample_lines(first)
+
+
+async def test_sample_cannot_be_filtered(open_db):
+    conn_id = await open_db()
+    assert "cannot be combined" in await Access.query_table_tool(conn_id, "Orders", sample=True, where="Amount > 5")
@@ -0,0 +1,27 @@
+"""
+Full result sets saved for Claude: streamed to a JSON file named by its hash
+"""
+import hashlib
+import json
+import os
+
+import Access
+from rowset import RowSet
+
+
+def test_results_are_saved_as_json_named_by_hash(tmp_path, monkeypatch):
+    monkeypatch.setattr(Access, "CLAUDE_FILES_PATH", str(tmp_path))
+    rows = RowSet(("ID", "Name"), [(1, "a"), (2, "b")])
+    link = Access.save_results_for_claude(rows)
+    (path,) = tmp_path.iterdir()
+    text = path.read_text()
+    assert json.loads(text) == [{"ID": 1, "Name": "a"}, {"ID": 2, "Name": "b"}]
+    assert path.name == hashlib.sha256(text.encode()).hexdigest() + ".json"
+    assert path.name in link
+
+
+def test_failed_save_leaves_no_partial_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(Access, "CLAUDE_FILES_PATH", str(tmp_path))
+    rows = RowSet(("ID", "Value"), [(1, "fine"), (2, object())])
+    assert "Error saving results for Claude" in Access.save_results_for_claude(rows)
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,43 @@
+"""
+search_schema_tool: trigram search over table and column names that tolerates typos and abbreviations
+"""
+import pytest
+
+import Access
+from conftest import write
+from schema_search import TrigramIndex, trigrams
+
+pytestmark = pytest.mark.anyio
+
+
+def test_trigrams_split_camel_case():
+    assert trigrams("ab") == {"  a", " ab", "ab "}
+    assert {"  c", " cu", "cus", "ust"} < trigrams("tblCustOrd2019")
+    assert " 20" in trigrams("tblCustOrd2019")
+
+
+def test_ranking():
+    index = TrigramIndex()
+    for table in ("Customers", "CustomerAddresses", "Orders", "tblCustOrd"):
+        index.add("table", table)
+    index.add("column", "Orders", "CustomerID")
+
+    matches = index.search("customers")
+    assert matches[0][:3] == (1.0, "table", "Customers")
+    assert [match[4] for match in matches[1:3]] == ["CustomerID", "CustomerAddresses"]
+    assert index.search("Custmers")[0][2] == "Customers"
+    assert index.search("CustOrd")[0][4] == "tblCustOrd"
+    assert [match[1] for match in index.search("customer", kinds={"column"})] == ["column"]
+    assert index.search("zzz") == [] and index.search("--") == []
+
+
+async def test_search_schema_tool(open_db, db_path):
+    conn_id = await open_db()
+    output = await Access.search_schema_tool(conn_id, "modifed")
+    assert "column | Orders | Modified" in output.splitlines()[4]
+
+    assert "| Customers |" in (await Access.search_schema_tool(conn_id, "cust", include_columns=False))
+    assert "No tables or columns matching 'xyzzy'" in await Access.search_schema_tool(conn_id, "xyzzy")
+
+    write(db_path, "CREATE TABLE Invoices (InvoiceID INTEGER PRIMARY KEY, Total REAL)")
+    assert "column | Invoices | InvoiceID" in await Access.search_schema_tool(conn_id, "invoiceid")
@@ -0,0 +1,50 @@
+"""
+describe_database_tool: a concurrent crawl of every table, reused from a snapshot until the file changes
+"""
+import json
+
+import pytest
+
+import Access
+from conftest import write
+from schema_snapshot import SchemaStore
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_crawl_then_snapshot(open_db):
+    conn_id = await open_db()
+    first = await Access.describe_database_tool(conn_id)
+    assert first.startswith(f"Schema of {conn_id}: 3 tables (from crawl in ")
+    assert "Customers([PK] CustomerID " in first
+    assert "Notes(Body " in first
+
+    second = await Access.describe_database_tool(conn_id)
+    assert "(from schema snapshot)" in second
+    assert second.splitlines()[2:] == first.splitlines()[2:]
+    assert "(from crawl in " in await Access.describe_database_tool(conn_id, refresh=True)
+
+
+async def test_snapshot_survives_restart_until_file_changes(open_db, db_path, monkeypatch):
+    conn_id = await open_db()
+    output = await Access.describe_database_tool(conn_id)
+    snapshot_path = output.split("Snapshot file: ", 1)[1].splitlines()[0]
+    with open(snapshot_path, encoding="utf-8") as f:
+        assert sorted(json.load(f)["tables"]) == ["Customers", "Notes", "Orders"]
+
+    # A new store reads the snapshot a previous server process left behind
+    monkeypatch.setattr(Access, "schema_store", SchemaStore(Access.schema_store.snapshot_dir))
+    assert "(from schema snapshot)" in await Access.describe_database_tool(conn_id)
+
+    write(db_path, "CREATE TABLE Archive (ID INTEGER PRIMARY KEY)")
+    output = await Access.describe_database_tool(conn_id)
+    assert ": 4 tables (from crawl in " in output
+    assert "Archive([PK] ID " in output
+
+
+async def test_output_is_limited_unless_full(open_db, monkeypatch):
+    conn_id = await open_db()
+    monkeypatch.setattr(Access, "EXECUTE_QUERY_MAX_CHARS", 150)
+    output = await Access.describe_database_tool(conn_id)
+    assert "more tables. Set full=True" in output
+    assert "Orders(" in await Access.describe_database_tool(conn_id, full=True)
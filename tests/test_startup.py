@@ -0,0 +1,63 @@
+"""
+Startup databases: read from a config file or the environment, opened in the background
+"""
+import json
+import os
+
+import anyio
+import pytest
+
+import Access
+from conftest import create_database
+from startup import load_startup_databases
+
+pytestmark = pytest.mark.anyio
+
+
+def test_config_and_environment_are_combined(tmp_path):
+    config = tmp_path / "startup.json"
+    config.write_text(json.dumps({"databases": [
+        str(tmp_path / "a.db"),
+        {"path": str(tmp_path / "b.db"), "writable": True, "describe": True},
+    ]}))
+    databases = os.pathsep.join([str(tmp_path / "c.db"), " ", str(tmp_path / "other" / "a.db")])
+    assert load_startup_databases(str(config), databases) == [
+        {"path": str(tmp_path / "a.db"), "writable": False, "describe": False},
+        {"path": str(tmp_path / "b.db"), "writable": True, "describe": True},
+        {"path": str(tmp_path / "c.db"), "writable": False, "describe": False},
+    ]
+    assert load_startup_databases() == []
+
+
+@pytest.mark.parametrize("content, message", [
+    ("{not json", "Cannot read startup config"),
+    ('["a.db"]', 'must be an object with a "databases" list'),
+    ('{"databases": [{"writable": true}]}', "Invalid database entry"),
+])
+def test_invalid_config(tmp_path, content, message):
+    config = tmp_path / "startup.json"
+    config.write_text(content)
+    with pytest.raises(ValueError, match=message):
+        load_startup_databases(str(config))
+
+
+async def test_startup_databases_open_in_the_background(tmp_path, monkeypatch):
+    sales = create_database(tmp_path / "sales.db")
+    config = tmp_path / "startup.json"
+    config.write_text(json.dumps({"databases": [{"path": sales, "describe": True}]}))
+    monkeypatch.setattr(Access, "STARTUP_CONFIG", str(config))
+    monkeypatch.setattr(Access, "STARTUP_DATABASES", str(tmp_path / "missing.db"))
+
+    async with Access.server_lifespan(None):
+        # Tool calls made while the databases are still opening wait for them
+        assert set(Access.startup_connects) == {"sales.db", "missing.db"}
+        assert "Customers" in await Access.list_tables_tool("sales.db")
+        assert "not found" in await Access.list_tables_tool("missing.db")
+        assert not Access.startup_connects
+        try:
+            # The schema is described after the connection opens
+            with anyio.fail_after(5):
+                while Access.schema_store.get_database(os.path.abspath(sales)) is None:
+                    await anyio.sleep(0.01)
+        finally:
+            await Access.disconnect("sales.db")
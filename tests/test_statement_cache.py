@@ -0,0 +1,57 @@
+"""
+StatementCache and parameterized queries: values are bound, never spliced into the SQL
+"""
+import pytest
+
+import Access
+from statement_cache import StatementCache
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeCursor:
+    def __init__(self, name):
+        self.name = name
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_cursors_are_reused_and_evicted_lru():
+    cache = StatementCache(max_size=2)
+    a = cache.checkout("a", lambda: FakeCursor("a"))
+    cache.checkin("a", a)
+    assert cache.checkout("a", lambda: FakeCursor("new")) is a
+    # Checked out cursors are not shared: a concurrent run of "a" opens a second one
+    second = cache.checkout("a", lambda: FakeCursor("a2"))
+    assert second.name == "a2"
+    cache.checkin("a", a)
+    cache.checkin("a", second)
+    assert a.closed and len(cache) == 1
+
+    for key in ("b", "c"):
+        cache.checkin(key, cache.checkout(key, lambda: FakeCursor(key)))
+    assert second.closed and len(cache) == 2
+    assert (cache.hits, cache.misses, cache.evictions) == (1, 4, 1)
+
+    cached = [cache.checkout(key, lambda: None) for key in ("b", "c")]
+    for key, cursor in zip(("b", "c"), cached):
+        cache.checkin(key, cursor)
+    cache.close()
+    assert len(cache) == 0 and all(cursor.closed for cursor in cached)
+
+
+async def test_parameters_are_bound(open_db):
+    conn_id = await open_db(writable=True)
+    name = "O'Brien; DROP TABLE Customers"
+    assert "Rows affected: 1" in await Access.execute_sql_tool(
+        conn_id, "INSERT INTO Customers VALUES (?, ?, ?, ?)", params=[41, name, "Cork", True]
+    )
+    output = await Access.execute_sql_tool(conn_id, "SELECT Name FROM Customers WHERE City = ?", params=["Cork"],
+                                           output_format="csv")
+    assert f"Name\n{name}\n" in output
+    assert "n\n41" in await Access.execute_sql_tool(conn_id, "SELECT COUNT(*) AS n FROM Customers",
+                                                   output_format="csv")
+    assert "Error" in await Access.execute_sql_tool(conn_id, "SELECT * FROM Customers WHERE CustomerID = ?",
+                                                    params=[1, 2])
@@ -0,0 +1,61 @@
+"""
+Statement timeouts and cancellation: the driver call is interrupted and the connection reused
+"""
+import time
+
+import anyio
+import pytest
+
+import Access
+
+pytestmark = pytest.mark.anyio
+
+# Never finishes on its own; only an interrupt stops it
+ENDLESS_QUERY = "SELECT COUNT(*) FROM (WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n) SELECT x FROM n)"
+
+
+async def test_run_statement_timeout(db_path):
+    pool = await Access.get_pool(db_path)
+    try:
+        async with pool.connection() as connection:
+            started = time.monotonic()
+            with pytest.raises(TimeoutError):
+                await Access.run_statement(connection, lambda cursor: cursor.execute(ENDLESS_QUERY).fetchall(),
+                                           timeout=0.2)
+            assert time.monotonic() - started < 5
+            rows = await Access.run_statement(
+                connection, lambda cursor: cursor.execute("SELECT COUNT(*) FROM Orders").fetchall()
+            )
+            assert rows[0][0] == 200
+    finally:
+        await Access.close_pool(pool)
+
+
+async def test_tool_timeout_message(open_db):
+    conn_id = await open_db()
+    output = await Access.execute_sql_tool(conn_id, ENDLESS_QUERY, timeout=0.2)
+    assert output == Access.timeout_message(0.2)
+    assert Access.connections[conn_id]['pool'].stats()["in_use"] == 0
+    assert "COUNT(*): 200" in await Access.execute_sql_tool(conn_id, "SELECT COUNT(*) FROM Orders")
+
+
+async def test_cancelled_request_interrupts_query(open_db):
+    conn_id = await open_db()
+    pool = Access.connections[conn_id]['pool']
+    started = time.monotonic()
+    with anyio.move_on_after(0.2) as scope:
+        await Access.execute_sql_tool(conn_id, ENDLESS_QUERY, timeout=0)
+    assert scope.cancelled_caught
+    assert time.monotonic() - started < 5
+    assert pool.stats()["in_use"] == 0
+    assert Access.executor.stats()["running"] == 0
+    assert "COUNT(*): 40" in await Access.execute_sql_tool(conn_id, "SELECT COUNT(*) FROM Customers")
+
+
+async def test_timeout_in_batch_does_not_stop_other_statements(open_db):
+    conn_id = await open_db()
+    output = await Access.execute_batch_tool(
+        conn_id, statements=[ENDLESS_QUERY, "SELECT COUNT(*) FROM Customers"], timeout=0.3
+    )
+    assert Access.timeout_message(0.3) in output
+    assert "COUNT(*): 40" in output
@@ -0,0 +1,110 @@
+"""
+Planning of cross-table value searches: type-compatible columns, index probes first
+"""
+import re
+from datetime import date, datetime
+from decimal import Decimal
+from typing import NamedTuple
+
+_INTEGER_PATTERN = re.compile(r"^[+-]?\d+$")
+_DATE_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}([ T]\d{2}:\d{2}(:\d{2}(\.\d+)?)?)?$")
+
+# Column types compared against each interpretation of the value
+_INTEGER_TYPES = ("integer", "float", "Decimal")
+_FLOAT_TYPES = ("float", "Decimal")
+_DATE_TYPES = ("datetime", "date")
+_TEXT_TYPES = ("text", "str")
+
+
+class Probe(NamedTuple):
+    """One statement of a value search: rows of table where any of columns matches"""
+    table: str
+    columns: tuple  # column names, each compared with the parameter at the same position
+    params: tuple
+    indexed: bool   # a single indexed column (an index seek rather than a scan)
+
+
+def typed_values(value: str) -> dict:
+    """Interpret a search value for each family of column types.
+
+    Returns {column type: parameter}: text columns always get the string itself,
+    numeric and date columns only if the value parses as one.
+    """
+    value = value.strip()
+    typed = {column_type: value for column_type in _TEXT_TYPES}
+    if _INTEGER_PATTERN.match(value):
+        typed.update({column_type: int(value) for column_type in _INTEGER_TYPES})
+    else:
+        try:
+            number = float(value)
+        except ValueError:
+            number = None
+        if number is not None and number == number and abs(number) != float("inf"):
+            typed.update({column_type: number for column_type in _FLOAT_TYPES})
+    if _DATE_PATTERN.match(value):
+        try:
+            moment = datetime.fromisoformat(value.replace(" ", "T"))
+        except ValueError:
+            moment = None
+        if moment is not None:
+            typed.update({column_type: moment if len(value) > 10 else moment.date() for column_type in _DATE_TYPES})
+    return typed
+
+
+def plan_probes(tables: dict, value: str, contains: bool = False, indexed_only: bool = False) -> tuple:
+    """Plan the probes searching tables for value.
+
+    tables is {table: schema} as produced by describe_database. Every indexed,
+    type-compatible column gets a probe of its own; the other compatible columns
+    of a table are combined into one scan. With contains only text columns are
+    searched (for a substring). Returns (probes with index probes first, number
+    of columns searched).
+    """
+    typed = {"text": value} if contains else typed_values(value)
+    seeks, scans = [], []
+    columns_searched = 0
+    for table_name, schema in tables.items():
+        if "error" in schema:
+            continue
+        indexed = {index["column"] for index in schema.get("indexes", [])} | set(schema.get("primary_keys", []))
+        unindexed = []
+        for column in schema["columns"]:
+            column_type = column.get("type")
+            param = typed.get("text" if contains and column_type in _TEXT_TYPES else column_type)
+            if param is None:
+                continue
+            if contains:
+                param = f"%{param}%"
+            if column["name"] in indexed and not contains:
+                seeks.append(Probe(table_name, (column["name"],), (param,), True))
+                columns_searched += 1
+            elif not indexed_only:
+                unindexed.append((column["name"], param))
+        if unindexed:
+            names, params = zip(*unindexed)
+            scans.append(Probe(table_name, names, params, False))
+            columns_searched += len(names)
+    return seeks + scans, columns_searched
+
+
+def matching_columns(row: dict, probe: Probe, value: str, contains: bool = False) -> list:
+    """Return the columns of probe that matched in row (text compared case-insensitively)"""
+    needle = value.strip().casefold()
+    matched = []
+    for name, param in zip(probe.columns, probe.params):
+        cell = row.get(name)
+        if cell is None:
+            continue
+        if contains or isinstance(cell, str):
+            text = cell.casefold() if isinstance(cell, str) else str(cell).casefold()
+            if (needle in text) if contains else (text == needle):
+                matched.append(name)
+        elif isinstance(cell, (datetime, date)) and isinstance(param, (datetime, date)):
+            if cell == param or (isinstance(cell, datetime) and not isinstance(param, datetime)
+                                 and cell.date() == param and cell.time() == datetime.min.time()):
+                matched.append(name)
+        elif isinstance(cell, (int, float, Decimal)) and isinstance(param, (int, float)):
+            if cell == param:
+                matched.append(name)
+    # The database may compare in ways not reproduced here; never report a row without a column
+    return matched or list(probe.columns)